@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import queue
+from tkinter import messagebox
+
+import instrumentacion
+
+# Las consultas de la interfaz corren en un pool de hilos para que la ventana
+# no se congele. Tk no es seguro entre hilos: los resultados se dejan en una
+# cola y el hilo de Tk la revisa con root.after mientras haya trabajo pendiente.
+
+INTERVALO_REVISION = 50  # ms entre revisiones de la cola
+
+
+class EjecutorAcciones:
+    """Corre funciones del modelo fuera del hilo de Tk y entrega el resultado en él"""
+    def __init__(self, root, etiqueta, max_hilos=2):
+        self.root = root
+        self.etiqueta = etiqueta  # ttk.Label donde se muestra que hay trabajo en curso
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="accion")
+        self._terminados = queue.Queue()
+        self._generacion = 0
+        self._pendientes = 0
+        self._texto_previo = None
+        self._revision_programada = False
+
+    def ejecutar(self, trabajo, al_terminar=None, descripcion="Cargando", nombre=None,
+                 mensaje_error="Error", independiente=False, al_finalizar=None):
+        """Correr `trabajo()` en segundo plano y luego `al_terminar(resultado)` en el hilo de Tk.
+
+        Si antes de que termine se inicia otra acción, su resultado se descarta
+        (salvo con independiente=True, que tampoco reemplaza a la acción en curso).
+        Los errores se muestran siempre con messagebox. `al_finalizar()` corre en el
+        hilo de Tk en todos los casos (éxito, error o resultado descartado).
+        """
+        if not independiente:
+            self._generacion += 1
+        generacion = None if independiente else self._generacion
+        self._ocupado(descripcion)
+        nombre = nombre or getattr(trabajo, "__name__", "accion")
+        # El comando del menú (instrumentar) ya terminó cuando corre el trabajo:
+        # se lo retiene para que sus consultas se reporten bajo él
+        padre = instrumentacion.accion_actual()
+        if padre is not None:
+            instrumentacion.retener(padre)
+        # Contexto vacío: no hereda la conexión del hilo de Tk
+        futuro = self._pool.submit(contextvars.Context().run, self._correr, nombre, trabajo, padre)
+        futuro.add_done_callback(lambda f: self._terminado(f, padre, (generacion, f, al_terminar, mensaje_error, al_finalizar)))
+        return futuro
+
+    def cerrar(self):
+        """Descartar lo que no empezó y no esperar a lo que está corriendo"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _terminado(self, futuro, padre, entrega):
+        if padre is not None:
+            instrumentacion.soltar(padre)  # también si se canceló antes de empezar
+        self._terminados.put(entrega)
+
+    @staticmethod
+    def _correr(nombre, trabajo, padre):
+        if padre is None and not instrumentacion.INSTRUMENTACION_ACTIVA:
+            return trabajo()
+        with instrumentacion.accion(nombre, padre=padre):
+            return trabajo()
+
+    def _ocupado(self, descripcion):
+        if self._pendientes == 0:
+            self._texto_previo = self.etiqueta.cget("text")
+        self._pendientes += 1
+        self.etiqueta.config(text=f"{descripcion} (trabajando...)")
+        self.root.config(cursor="watch")
+        self._programar_revision()
+
+    def _programar_revision(self):
+        if not self._revision_programada:
+            self._revision_programada = True
+            self.root.after(INTERVALO_REVISION, self._revisar)
+
+    def _libre(self):
+        self._pendientes -= 1
+        if self._pendientes == 0:
+            self.etiqueta.config(text=self._texto_previo)
+            self.root.config(cursor="")
+
+    def _revisar(self):
+        """Entregar en el hilo de Tk los resultados que ya llegaron"""
+        self._revision_programada = False
+        while True:
+            try:
+                generacion, futuro, al_terminar, mensaje_error, al_finalizar = self._terminados.get_nowait()
+            except queue.Empty:
+                break
+            self._libre()
+            try:
+                self._entregar(futuro, generacion, al_terminar, mensaje_error)
+            finally:
+                if al_finalizar is not None:
+                    al_finalizar()
+        if self._pendientes > 0:
+            self._programar_revision()
+
+    def _entregar(self, futuro, generacion, al_terminar, mensaje_error):
+        if futuro.cancelled():
+            return
+        error = futuro.exception()
+        if error is not None:
+            messagebox.showerror("Error", f"{mensaje_error}:\n{error}")
+        elif generacion in (None, self._generacion) and al_terminar is not None:
+            try:
+                al_terminar(futuro.result())
+            except Exception as e:
+                messagebox.showerror("Error", f"{mensaje_error}:\n{e}")
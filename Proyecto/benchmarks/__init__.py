@@ -0,0 +1,2 @@
+# Pruebas de rendimiento contra una base de datos real.
+# Ejecutar desde Proyecto/, por ejemplo: python -m benchmarks.sentencias_preparadas
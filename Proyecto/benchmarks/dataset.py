@@ -0,0 +1,190 @@
+"""Generar un dataset sintético y determinista de gimnasio para los benchmarks.
+
+Uso (desde Proyecto/):
+    python -m benchmarks.dataset --escala pequena
+    python -m benchmarks.dataset --clientes 50000 --sesiones 2000000 --semilla 7
+    python -m benchmarks.dataset --escala completa --infile
+"""
+import argparse
+from datetime import datetime, timedelta
+import random
+import time
+
+import mysql.connector
+
+from db_connection import DB_CONFIG
+from mysql_env import create_tables, insertar_lote
+
+TAMANOS = {
+    "completa": {
+        "clientes": 50_000,
+        "entrenadores": 500,
+        "ejercicios": 5_000,
+        "planes": 20_000,
+        "ejercicios_por_plan": 6,
+        "sesiones": 2_000_000,
+    },
+    "mediana": {
+        "clientes": 5_000,
+        "entrenadores": 50,
+        "ejercicios": 500,
+        "planes": 2_000,
+        "ejercicios_por_plan": 6,
+        "sesiones": 200_000,
+    },
+    "pequena": {
+        "clientes": 500,
+        "entrenadores": 10,
+        "ejercicios": 50,
+        "planes": 200,
+        "ejercicios_por_plan": 5,
+        "sesiones": 5_000,
+    },
+}
+
+LOTE = 5_000  # filas por executemany (o LOAD DATA) y por commit
+FECHA_BASE = datetime(2024, 1, 1, 6, 0)  # fija para que el dataset sea reproducible
+DIAS = 730  # las sesiones se reparten en dos años alrededor de FECHA_BASE + DIAS / 2
+
+NIVELES = ["Principiante", "Intermedio", "Avanzado", "Experto"]
+ESPECIALIDADES = ["Hipertrofia", "Cardio", "Fuerza", "Funcional", "Movilidad", "Crossfit"]
+TIPOS_CARDIO = ["CORRER", "BICICLETA", "REMO", "ELIPTICA", "NATACION"]
+OBJETIVOS = ["Ganancia muscular", "Pérdida de peso", "Resistencia", "Fuerza máxima", "Salud general"]
+
+
+def _siguiente_id(conn, tabla, columna):
+    """Primer id libre; los ids se asignan en el cliente para enlazar padres e hijos"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COALESCE(MAX({columna}), 0) + 1 FROM {tabla}")
+    siguiente = cursor.fetchone()[0]
+    cursor.close()
+    return siguiente
+
+
+def _historial(conn, sesiones, lote=LOTE):
+    """Registrar en el historial las sesiones finalizadas, por rangos de id_sesion"""
+    total = 0
+    cursor = conn.cursor()
+    try:
+        for desde in range(sesiones.start, sesiones.stop, lote):
+            cursor.execute(
+                """INSERT INTO historial_sesiones (id_cliente, id_sesion, fecha_registro)
+                   SELECT id_cliente, id_sesion, fecha_hora + INTERVAL 1 HOUR
+                   FROM sesion_entrenamiento
+                   WHERE estado = 'FINALIZADA' AND id_sesion >= %s AND id_sesion < %s""",
+                (desde, min(desde + lote, sesiones.stop))
+            )
+            conn.commit()
+            total += cursor.rowcount
+    finally:
+        cursor.close()
+    return total
+
+
+def generar(conn, tamanos, semilla=42, lote=LOTE, infile=False):
+    """Cargar el dataset en la base conectada; retorna los rangos de ids generados"""
+    rnd = random.Random(semilla)
+    create_tables(conn)
+
+    primer_usuario = _siguiente_id(conn, "usuario", "id_usuario")
+    entrenadores = range(primer_usuario, primer_usuario + tamanos["entrenadores"])
+    clientes = range(entrenadores.stop, entrenadores.stop + tamanos["clientes"])
+    primer_ejercicio = _siguiente_id(conn, "ejercicio", "id_ejercicio")
+    ejercicios = range(primer_ejercicio, primer_ejercicio + tamanos["ejercicios"])
+    primer_plan = _siguiente_id(conn, "plan_entrenamiento", "id_plan")
+    planes = range(primer_plan, primer_plan + tamanos["planes"])
+    primera_sesion = _siguiente_id(conn, "sesion_entrenamiento", "id_sesion")
+    sesiones = range(primera_sesion, primera_sesion + tamanos["sesiones"])
+
+    # Fuerza para los ejercicios pares, cardio para los impares
+    tipos = {e: ("FUERZA" if e % 2 == 0 else "CARDIO") for e in ejercicios}
+
+    conteo = {}
+
+    def cargar(tabla, columnas, filas):
+        conteo[tabla] = insertar_lote(conn, tabla, columnas, filas, lote, infile)
+
+    # Usuarios: primero los entrenadores y luego los clientes, con ids consecutivos
+    cargar("usuario", ("id_usuario", "nombre", "email", "tipo"), [
+        *((i, f"Entrenador {i}", f"entrenador{i}@bench.gym", "ENTRENADOR") for i in entrenadores),
+        *((i, f"Cliente {i}", f"cliente{i}@bench.gym", "CLIENTE") for i in clientes),
+    ])
+    cargar("entrenador", ("id_usuario", "especialidad", "anos_experiencia"),
+           ((i, rnd.choice(ESPECIALIDADES), rnd.randint(0, 25)) for i in entrenadores))
+    cargar("cliente", ("id_usuario", "nivel_fitness"),
+           ((i, rnd.choice(NIVELES)) for i in clientes))
+    cargar("ejercicio", ("id_ejercicio", "nombre", "descripcion", "tipo"),
+           ((e, f"Ejercicio {e}", f"Descripción del ejercicio {e}", tipos[e]) for e in ejercicios))
+    cargar("ejercicio_fuerza", ("id_ejercicio", "repeticiones", "series", "peso_kg"),
+           ((e, rnd.randint(5, 15), rnd.randint(2, 5), round(rnd.uniform(5, 150), 2))
+            for e in ejercicios if tipos[e] == "FUERZA"))
+    cargar("ejercicio_cardio",
+           ("id_ejercicio", "duracion_minutos", "tipo_cardio", "nivel_resistencia", "ritmo_cardiaco_objetivo"),
+           ((e, rnd.randint(10, 60), rnd.choice(TIPOS_CARDIO), rnd.randint(1, 10), rnd.randint(110, 170))
+            for e in ejercicios if tipos[e] == "CARDIO"))
+    entrenador_de_plan = {p: rnd.choice(entrenadores) for p in planes}
+    cargar("plan_entrenamiento", ("id_plan", "nombre", "objetivo", "id_entrenador"),
+           ((p, f"Plan {p}", rnd.choice(OBJETIVOS), entrenador_de_plan[p]) for p in planes))
+    por_plan = min(tamanos["ejercicios_por_plan"], len(ejercicios))
+    cargar("plan_ejercicio", ("id_plan", "id_ejercicio", "orden"),
+           ((p, e, orden)
+            for p in planes
+            for orden, e in enumerate(rnd.sample(ejercicios, por_plan), start=1)))
+
+    corte = FECHA_BASE + timedelta(days=DIAS // 2)
+
+    def filas_sesiones():
+        for s in sesiones:
+            fecha = FECHA_BASE + timedelta(days=rnd.randrange(DIAS), hours=rnd.randrange(14))
+            plan = rnd.choice(planes)
+            cliente = rnd.choice(clientes)
+            if fecha >= corte:
+                estado, calificacion = "PROGRAMADA", 0
+            elif rnd.random() < 0.05:
+                estado, calificacion = "CANCELADA", 0
+            else:
+                estado, calificacion = "FINALIZADA", rnd.randint(0, 5)
+            yield (s, fecha, cliente, entrenador_de_plan[plan], plan, estado, calificacion)
+
+    cargar("sesion_entrenamiento",
+           ("id_sesion", "fecha_hora", "id_cliente", "id_entrenador", "id_plan", "estado", "calificacion"),
+           filas_sesiones())
+    conteo["historial_sesiones"] = _historial(conn, sesiones, lote)
+    return {
+        "filas": conteo,
+        "entrenadores": (entrenadores.start, entrenadores.stop),
+        "clientes": (clientes.start, clientes.stop),
+        "ejercicios": (ejercicios.start, ejercicios.stop),
+        "planes": (planes.start, planes.stop),
+        "sesiones": (sesiones.start, sesiones.stop),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escala", choices=sorted(TAMANOS), default="pequena")
+    for nombre in TAMANOS["completa"]:
+        parser.add_argument(f"--{nombre.replace('_', '-')}", dest=nombre, type=int,
+                            help=f"sobrescribe '{nombre}' de la escala elegida")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=LOTE)
+    parser.add_argument("--infile", action="store_true",
+                        help="cargar cada lote con LOAD DATA LOCAL INFILE (requiere local_infile en el servidor)")
+    args = parser.parse_args()
+
+    tamanos = dict(TAMANOS[args.escala])
+    tamanos.update({k: v for k, v in vars(args).items() if k in tamanos and v is not None})
+
+    conn = mysql.connector.connect(**DB_CONFIG, allow_local_infile=args.infile)
+    try:
+        inicio = time.perf_counter()
+        resultado = generar(conn, tamanos, args.semilla, args.lote, args.infile)
+        print(f"Dataset generado en {time.perf_counter() - inicio:.1f} s")
+        for tabla, filas in resultado["filas"].items():
+            print(f"  {tabla:22} {filas:>10}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
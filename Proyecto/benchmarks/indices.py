@@ -0,0 +1,146 @@
+"""EXPLAIN y tiempos de las consultas frecuentes, antes y después de los índices.
+
+Uso (desde Proyecto/, con el dataset de benchmarks.dataset cargado):
+    python -m benchmarks.indices                      # estado actual del esquema
+    python -m benchmarks.indices --antes-y-despues    # revierte la v1, mide, la aplica y vuelve a medir
+
+El reporte que acompaña a la migración 1 se guarda en benchmarks/resultados/:
+    python -m benchmarks.indices --antes-y-despues --salida benchmarks/resultados/indices_v1.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import migraciones
+from benchmarks.suite import _muestra
+from db_connection import lectura
+
+CONSULTAS = {
+    "sesiones_por_cliente": """
+        SELECT s.id_sesion, s.fecha_hora, s.id_cliente, s.id_entrenador, s.id_plan, s.estado, s.calificacion
+        FROM sesion_entrenamiento s WHERE s.id_cliente = %s ORDER BY s.fecha_hora DESC
+    """,
+    "sesiones_por_entrenador": """
+        SELECT s.id_sesion, s.fecha_hora, s.id_cliente, s.id_entrenador, s.id_plan, s.estado, s.calificacion
+        FROM sesion_entrenamiento s WHERE s.id_entrenador = %s ORDER BY s.fecha_hora DESC
+    """,
+    "historial_por_cliente": """
+        SELECT h.id_historial, h.id_cliente, h.id_sesion, h.fecha_registro,
+               s.fecha_hora, s.estado, s.calificacion
+        FROM historial_sesiones h
+        JOIN sesion_entrenamiento s ON h.id_sesion = s.id_sesion
+        WHERE h.id_cliente = %s
+        ORDER BY h.fecha_registro DESC
+    """,
+    "ejercicio_por_nombre": """
+        SELECT e.id_ejercicio, e.nombre, e.descripcion, e.tipo FROM ejercicio e WHERE e.nombre = %s LIMIT 1
+    """,
+    "planes_por_nombre": """
+        SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento ORDER BY nombre
+    """,
+    "usuarios_por_nombre": """
+        SELECT id_usuario, nombre, email, tipo FROM usuario ORDER BY nombre
+    """,
+}
+
+
+def _parametros():
+    """Parámetros reales tomados del dataset para cada consulta"""
+    id_cliente, id_entrenador = _muestra()
+    with lectura() as cursor:
+        cursor.execute("SELECT nombre FROM ejercicio ORDER BY id_ejercicio DESC LIMIT 1")
+        ejercicio = cursor.fetchone()
+    return {
+        "sesiones_por_cliente": (id_cliente,),
+        "sesiones_por_entrenador": (id_entrenador,),
+        "historial_por_cliente": (id_cliente,),
+        "ejercicio_por_nombre": (ejercicio["nombre"] if ejercicio else "",),
+        "planes_por_nombre": (),
+        "usuarios_por_nombre": (),
+    }
+
+
+TABLAS = ("sesion_entrenamiento", "historial_sesiones", "ejercicio", "plan_entrenamiento", "usuario")
+
+
+def _entorno():
+    """Versión del servidor y filas de cada tabla medida, para saber de dónde salen los números"""
+    with lectura(dictionary=False) as cursor:
+        cursor.execute("SELECT VERSION()")
+        version = cursor.fetchone()[0]
+        filas = {}
+        for tabla in TABLAS:
+            cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+            filas[tabla] = cursor.fetchone()[0]
+    return {"servidor": version, "filas": filas}
+
+
+def _indices():
+    """Índices de cada tabla medida: {tabla: {índice: [columnas]}}"""
+    marcadores = ", ".join(["%s"] * len(TABLAS))
+    with lectura(dictionary=False) as cursor:
+        cursor.execute(f"""
+            SELECT table_name, index_name, column_name FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name IN ({marcadores})
+            ORDER BY table_name, index_name, seq_in_index
+        """, TABLAS)
+        indices = {}
+        for tabla, indice, columna in cursor.fetchall():
+            indices.setdefault(tabla, {}).setdefault(indice, []).append(columna)
+    return indices
+
+
+def medir(repeticiones):
+    """EXPLAIN y mediana de tiempo (ms) de cada consulta con el esquema actual"""
+    parametros = _parametros()
+    resultado = {}
+    with lectura() as cursor:
+        for nombre, sql in CONSULTAS.items():
+            cursor.execute("EXPLAIN " + sql, parametros[nombre])
+            plan = [{k: v for k, v in fila.items() if v is not None} for fila in cursor.fetchall()]
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                cursor.execute(sql, parametros[nombre])
+                cursor.fetchall()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            resultado[nombre] = {"explain": plan, "mediana_ms": round(statistics.median(tiempos), 3)}
+    return {"indices": _indices(), "consultas": resultado}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--antes-y-despues", action="store_true",
+                        help="revertir la migración 1, medir, aplicarla y medir otra vez")
+    parser.add_argument("--salida", help="archivo JSON (por defecto, salida estándar)")
+    args = parser.parse_args()
+
+    reporte = {"entorno": _entorno()}
+    if args.antes_y_despues:
+        migraciones.revertir(1)
+        try:
+            print("Midiendo sin índices...", file=sys.stderr)
+            reporte["antes"] = medir(args.repeticiones)
+        finally:
+            # Aunque la medición falle, el esquema no queda sin los índices
+            migraciones.aplicar()
+        print("Midiendo con índices...", file=sys.stderr)
+        reporte["despues"] = medir(args.repeticiones)
+    else:
+        reporte["actual"] = medir(args.repeticiones)
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False, default=str)
+    if args.salida:
+        os.makedirs(os.path.dirname(args.salida) or ".", exist_ok=True)
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
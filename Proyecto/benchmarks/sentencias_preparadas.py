@@ -0,0 +1,79 @@
+"""Comparar protocolo de texto vs sentencias preparadas en las búsquedas por ID.
+
+Uso (desde Proyecto/, con la base de datos cargada):
+    python -m benchmarks.sentencias_preparadas --repeticiones 2000
+"""
+import argparse
+import itertools
+import time
+
+import db_connection
+from db_connection import configurar_pool, lectura
+
+
+def _ids(tabla, columna, limite):
+    """Tomar algunos ids existentes de una tabla"""
+    with lectura(dictionary=False) as cursor:
+        cursor.execute(f"SELECT {columna} FROM {tabla} ORDER BY {columna} LIMIT %s", (limite,))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _objetivos(limite):
+    """Búsquedas puntuales a medir: (nombre, función, ids)"""
+    from usuario import Usuario
+    from cliente import Cliente
+    from entrenador import Entrenador
+    from ejercicio_fuerza import EjercicioFuerza
+    from ejercicio_cardio import EjercicioCardio
+    from sesion_entrenamiento import SesionEntrenamiento
+
+    return [
+        ("Usuario.buscar_por_id", Usuario.buscar_por_id, _ids("usuario", "id_usuario", limite)),
+        ("Cliente.buscar_por_id", Cliente.buscar_por_id, _ids("cliente", "id_usuario", limite)),
+        ("Entrenador.buscar_por_id", Entrenador.buscar_por_id, _ids("entrenador", "id_usuario", limite)),
+        ("EjercicioFuerza.buscar_por_id", EjercicioFuerza.buscar_por_id,
+         _ids("ejercicio_fuerza", "id_ejercicio", limite)),
+        ("EjercicioCardio.buscar_por_id", EjercicioCardio.buscar_por_id,
+         _ids("ejercicio_cardio", "id_ejercicio", limite)),
+        ("SesionEntrenamiento.buscar_por_id", SesionEntrenamiento.buscar_por_id,
+         _ids("sesion_entrenamiento", "id_sesion", limite)),
+    ]
+
+
+def _medir(funcion, ids, repeticiones):
+    """Búsquedas por segundo llamando `funcion` sobre los ids en ronda"""
+    for id_objeto in ids:  # calentamiento: prepara las sentencias y llena el pool
+        funcion(id_objeto)
+    ronda = itertools.islice(itertools.cycle(ids), repeticiones)
+    inicio = time.perf_counter()
+    for id_objeto in ronda:
+        funcion(id_objeto)
+    return repeticiones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=2000, help="búsquedas por modo y entidad")
+    parser.add_argument("--ids", type=int, default=50, help="ids distintos a recorrer por entidad")
+    args = parser.parse_args()
+
+    # El pool se crea sin reinicio de sesión en ambos modos para que la comparación sea justa
+    configurar_pool(sentencias_preparadas=True)
+    objetivos = _objetivos(args.ids)
+
+    print(f"{'búsqueda':36} {'texto (op/s)':>14} {'binario (op/s)':>16} {'mejora':>8}")
+    for nombre, funcion, ids in objetivos:
+        if not ids:
+            print(f"{nombre:36} {'sin datos':>14}")
+            continue
+        configurar_pool(sentencias_preparadas=False)
+        texto = _medir(funcion, ids, args.repeticiones)
+        configurar_pool(sentencias_preparadas=True)
+        binario = _medir(funcion, ids, args.repeticiones)
+        print(f"{nombre:36} {texto:14.0f} {binario:16.0f} {binario / texto:7.2f}x")
+
+    print(f"\nPool: {db_connection.POOL_SIZE} conexiones, hasta {db_connection.MAX_SENTENCIAS} sentencias por conexión")
+
+
+if __name__ == "__main__":
+    main()
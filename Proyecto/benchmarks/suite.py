@@ -0,0 +1,164 @@
+"""Medir los puntos de entrada principales del modelo y reportar JSON.
+
+Uso (desde Proyecto/, con un dataset cargado por benchmarks.dataset):
+    python -m benchmarks.suite --repeticiones 20 --salida resultados.json
+    python -m benchmarks.suite --escenarios planes_listar_todos ejercicios_listar_todos
+"""
+import argparse
+import contextlib
+from datetime import datetime
+import io
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+from cache import invalidar
+from db_connection import lectura
+from instrumentacion import accion
+
+
+def _percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not valores:
+        return None
+    indice = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[indice]
+
+
+def _muestra():
+    """Elegir un cliente y un entrenador con sesiones para los escenarios puntuales"""
+    with lectura() as cursor:
+        cursor.execute("""
+            SELECT id_cliente, COUNT(*) AS n FROM sesion_entrenamiento
+            GROUP BY id_cliente ORDER BY n DESC, id_cliente LIMIT 1
+        """)
+        cliente = cursor.fetchone()
+        cursor.execute("""
+            SELECT id_entrenador, COUNT(*) AS n FROM sesion_entrenamiento
+            GROUP BY id_entrenador ORDER BY n DESC, id_entrenador LIMIT 1
+        """)
+        entrenador = cursor.fetchone()
+    if not cliente or not entrenador:
+        raise SystemExit("No hay sesiones cargadas; ejecute antes python -m benchmarks.dataset")
+    return cliente["id_cliente"], entrenador["id_entrenador"]
+
+
+def escenarios():
+    """Escenarios a medir: {nombre: función sin argumentos}"""
+    from cliente import Cliente
+    from entrenador import Entrenador
+    from ejercicio import Ejercicio
+    from plan_entrenamiento import PlanEntrenamiento
+    from sesion_entrenamiento import SesionEntrenamiento
+
+    id_cliente, id_entrenador = _muestra()
+    cliente = Cliente.buscar_por_id(id_cliente)
+    entrenador = Entrenador.buscar_por_id(id_entrenador)
+
+    def silencioso(funcion):
+        # Los dashboards imprimen; el texto no forma parte de la medición
+        def envoltura():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return funcion()
+        return envoltura
+
+    return {
+        "sesiones_listar_todas": SesionEntrenamiento.listar_todas,
+        "sesiones_listar_todas_perezoso": lambda: SesionEntrenamiento.listar_todas(perezoso=True),
+        "sesiones_buscar_por_cliente": lambda: SesionEntrenamiento.buscar_por_cliente(id_cliente),
+        "planes_listar_todos": PlanEntrenamiento.listar_todos,
+        "ejercicios_listar_todos": Ejercicio.listar_todos,
+        "dashboard_cliente": silencioso(cliente.mostrar_dashboard),
+        "dashboard_entrenador": silencioso(entrenador.mostrar_dashboard),
+        "entrenador_clientes_entrenados": entrenador.obtener_clientes_entrenados,
+    }
+
+
+def medir(funcion, repeticiones, usar_cache=False):
+    """Latencias, consultas por ejecución y memoria pico de un escenario"""
+    tiempos = []
+    acciones = []
+    for _ in range(repeticiones):
+        if not usar_cache:
+            invalidar()
+        with accion("benchmark") as registro:
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+        acciones.append(registro)
+
+    # La memoria se mide en una ejecución aparte: tracemalloc distorsiona los tiempos
+    if not usar_cache:
+        invalidar()
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tiempos.sort()
+    ultima = acciones[-1]
+    return {
+        "repeticiones": repeticiones,
+        "p50_ms": round(_percentil(tiempos, 50) * 1000, 3),
+        "p95_ms": round(_percentil(tiempos, 95) * 1000, 3),
+        "min_ms": round(tiempos[0] * 1000, 3),
+        "max_ms": round(tiempos[-1] * 1000, 3),
+        "consultas": len(ultima.consultas),
+        "conexiones": ultima.conexiones,
+        "filas": sum(max(c.filas, 0) for c in ultima.consultas),
+        "n_mas_1": ultima.n_mas_1(),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+
+
+def _filas_por_tabla():
+    """Tamaño del dataset medido, para poder comparar corridas"""
+    tablas = ["usuario", "cliente", "entrenador", "ejercicio", "plan_entrenamiento",
+              "plan_ejercicio", "sesion_entrenamiento", "historial_sesiones"]
+    with lectura(dictionary=False) as cursor:
+        conteo = {}
+        for tabla in tablas:
+            cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+            conteo[tabla] = cursor.fetchone()[0]
+    return conteo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--escenarios", nargs="*", help="medir solo estos escenarios")
+    parser.add_argument("--cache", action="store_true", help="no invalidar la caché de catálogo entre ejecuciones")
+    parser.add_argument("--salida", help="archivo JSON (por defecto, salida estándar)")
+    args = parser.parse_args()
+
+    todos = escenarios()
+    elegidos = args.escenarios or list(todos)
+    desconocidos = [n for n in elegidos if n not in todos]
+    if desconocidos:
+        parser.error(f"escenarios desconocidos: {', '.join(desconocidos)} (disponibles: {', '.join(todos)})")
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "cache": args.cache,
+        "dataset": _filas_por_tabla(),
+        "resultados": {},
+    }
+    for nombre in elegidos:
+        print(f"Midiendo {nombre}...", file=sys.stderr)
+        reporte["resultados"][nombre] = medir(todos[nombre], args.repeticiones, args.cache)
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
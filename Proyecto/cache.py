@@ -0,0 +1,91 @@
+from collections import OrderedDict
+import functools
+import os
+import threading
+import time
+
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", 256))
+CACHE_TTL = float(os.getenv("CACHE_TTL", 300))  # segundos
+
+
+class CacheCatalogo:
+    """Caché LRU con expiración para datos de catálogo que cambian poco"""
+
+    def __init__(self, max_entradas=CACHE_MAX_ENTRADAS, ttl=CACHE_TTL):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()  # clave -> (expira_en, valor)
+        self._lock = threading.Lock()
+        # Se incrementan en cada invalidación; la clave 0 la usa invalidar() sin espacios
+        self._generaciones = {}
+
+    def _generacion(self, espacio):
+        return self._generaciones.get(0, 0), self._generaciones.get(espacio, 0)
+
+    def obtener(self, clave, cargar):
+        """Retornar el valor en caché o cargarlo con `cargar()` y guardarlo"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[0] > ahora:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+            generacion = self._generacion(clave[0])
+
+        valor = cargar()
+
+        with self._lock:
+            if self._generacion(clave[0]) != generacion:
+                # Se invalidó mientras se cargaba: el valor puede ser anterior a la escritura
+                return valor
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+        return valor
+
+    def invalidar(self, *espacios):
+        """Descartar las entradas de los espacios indicados (o todas si no se indica ninguno)"""
+        with self._lock:
+            for espacio in espacios or (0,):
+                self._generaciones[espacio] = self._generaciones.get(espacio, 0) + 1
+            if not espacios:
+                self._datos.clear()
+                return
+            for clave in [c for c in self._datos if c[0] in espacios]:
+                del self._datos[clave]
+
+    def estadisticas(self):
+        """Contadores de aciertos y fallos"""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "entradas": len(self._datos),
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
+
+
+catalogo = CacheCatalogo()
+
+
+def cacheado(espacio):
+    """Decorador para métodos de clase de lectura: guarda el resultado en `catalogo`"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(cls, *args, **kwargs):
+            clave = (espacio, cls.__name__, funcion.__name__, args, tuple(sorted(kwargs.items())))
+            # Se retorna una copia para que el llamador no altere la lista guardada
+            return list(catalogo.obtener(clave, lambda: funcion(cls, *args, **kwargs)))
+        return envoltura
+    return decorador
+
+
+def invalidar(*espacios):
+    """Invalidar espacios del catálogo después de una escritura"""
+    catalogo.invalidar(*espacios)
@@ -0,0 +1,116 @@
+from db_connection import transaccion
+from cache import invalidar
+import identidad
+
+# Seguimiento de cambios por atributo: los atributos declarados como Columna
+# recuerdan su valor original cuando se reasignan, y guardar() escribe un solo
+# UPDATE por fila con las columnas que realmente cambiaron.
+
+
+class Columna:
+    """Atributo persistente en `tabla`; reasignarlo después de construir el objeto lo marca como cambiado"""
+
+    def __init__(self, tabla, columna=None):
+        self.tabla = tabla
+        self.columna = columna
+
+    def __set_name__(self, propietario, nombre):
+        self.nombre = nombre
+        self.privado = "_" + nombre
+        self.columna = self.columna or nombre
+
+    def __get__(self, objeto, tipo=None):
+        if objeto is None:
+            return self
+        try:
+            return objeto.__dict__[self.privado]
+        except KeyError:
+            raise AttributeError(self.nombre) from None
+
+    def __set__(self, objeto, valor):
+        datos = objeto.__dict__
+        if self.privado in datos:  # la primera asignación (constructor) no es un cambio
+            cambios = datos.setdefault("_cambios", {})
+            original = cambios.setdefault(self.nombre, datos[self.privado])
+            if original == valor:
+                del cambios[self.nombre]  # volvió a su valor original
+        datos[self.privado] = valor
+
+
+@identidad.base_generica
+class ConCambios:
+    """Base para modelos con atributos Columna.
+
+    Cada clase declara `_claves_tabla` ({tabla: columna clave}, la tabla
+    principal primero), `_atributo_id` y los espacios de caché a invalidar.
+    """
+    _claves_tabla = {}
+    _atributo_id = "id"
+    _espacios_cache = ()
+
+    def cambios(self):
+        """Atributos modificados desde la última vez que se guardó: {atributo: valor nuevo}"""
+        return {nombre: getattr(self, nombre) for nombre in self.__dict__.get("_cambios", {})}
+
+    def hay_cambios(self):
+        return bool(self.__dict__.get("_cambios"))
+
+    def descartar_cambios(self):
+        """Volver los atributos modificados a su valor original"""
+        for nombre, original in self.__dict__.pop("_cambios", {}).items():
+            self.__dict__["_" + nombre] = original
+
+    def guardar(self):
+        """Escribir los cambios pendientes de este objeto (un UPDATE)"""
+        return guardar_todos([self])
+
+    @classmethod
+    def _sql_actualizar(cls, nombres):
+        """UPDATE de las columnas `nombres`; si tocan varias tablas, un UPDATE multitabla con JOIN"""
+        columnas = [getattr(cls, nombre) for nombre in nombres]
+        tablas = [t for t in cls._claves_tabla if any(c.tabla == t for c in columnas)]
+        principal = tablas[0]
+        clave = cls._claves_tabla[principal]
+        if len(tablas) == 1:
+            asignaciones = ", ".join(f"{c.columna} = %s" for c in columnas)
+            return f"UPDATE {principal} SET {asignaciones} WHERE {clave} = %s"
+        uniones = "".join(
+            f" JOIN {t} ON {t}.{cls._claves_tabla[t]} = {principal}.{clave}" for t in tablas[1:]
+        )
+        asignaciones = ", ".join(f"{c.tabla}.{c.columna} = %s" for c in columnas)
+        return f"UPDATE {principal}{uniones} SET {asignaciones} WHERE {principal}.{clave} = %s"
+
+
+def guardar_todos(objetos):
+    """Escribir los cambios de varios objetos en una transacción; retorna cuántas filas se actualizaron.
+
+    Los objetos con las mismas columnas modificadas comparten sentencia (executemany).
+    Si algo falla, los objetos conservan sus cambios pendientes.
+    """
+    sentencias = {}
+    sucios = []
+    for objeto in objetos:
+        nombres = tuple(sorted(objeto.__dict__.get("_cambios", {})))
+        if not nombres:
+            continue
+        sql = type(objeto)._sql_actualizar(nombres)
+        valores = [getattr(objeto, nombre) for nombre in nombres]
+        sentencias.setdefault(sql, []).append((*valores, getattr(objeto, objeto._atributo_id)))
+        sucios.append(objeto)
+    if not sucios:
+        return 0
+
+    with transaccion() as cursor:
+        for sql, filas in sentencias.items():
+            if len(filas) == 1:
+                cursor.execute(sql, filas[0])
+            else:
+                cursor.executemany(sql, filas)
+
+    espacios = set()
+    for objeto in sucios:
+        objeto.__dict__.pop("_cambios", None)
+        espacios.update(objeto._espacios_cache)
+    if espacios:
+        invalidar(*espacios)
+    return len(sucios)
@@ -1,5 +1,7 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
 from usuario import Usuario
+import db_async
+import identidad
 
 class Cliente(Usuario):
     def __init__(self, id_usuario, nombre, email, nivel_fitness):
@@ -9,9 +11,7 @@ class Cliente(Usuario):
     @classmethod
     def crear(cls, nombre, email, nivel_fitness):
         """Crear un nuevo cliente"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             # Insertar en usuario
             cursor.execute(
                 "INSERT INTO usuario (nombre, email, tipo) VALUES (%s, %s, 'CLIENTE')",
@@ -24,21 +24,15 @@ class Cliente(Usuario):
                 "INSERT INTO cliente (id_usuario, nivel_fitness) VALUES (%s, %s)",
                 (user_id, nivel_fitness)
             )
-            conn.commit()
-            return cls(user_id, nombre, email, nivel_fitness)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        return identidad.registrar(cls(user_id, nombre, email, nivel_fitness), user_id)
 
     @classmethod
     def buscar_por_id(cls, id_usuario):
         """Buscar cliente por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        existente = identidad.obtener(cls, id_usuario)
+        if existente is not None:
+            return existente
+        with lectura(preparada=True) as cursor:
             cursor.execute("""
                 SELECT u.id_usuario, u.nombre, u.email, c.nivel_fitness 
                 FROM usuario u 
@@ -46,17 +40,38 @@ class Cliente(Usuario):
                 WHERE u.id_usuario = %s
             """, (id_usuario,))
             row = cursor.fetchone()
-            return cls(row['id_usuario'], row['nombre'], row['email'], row['nivel_fitness']) if row else None
-        finally:
-            cursor.close()
-            conn.close()
+            return cls._desde_fila(row) if row else None
+
+    @classmethod
+    def buscar_por_ids(cls, ids):
+        """Buscar varios clientes en una sola consulta; retorna un dict {id: cliente}"""
+        encontrados = {}
+        pendientes = []
+        for id_usuario in dict.fromkeys(ids):
+            existente = identidad.obtener(cls, id_usuario)
+            if existente is not None:
+                encontrados[id_usuario] = existente
+            else:
+                pendientes.append(id_usuario)
+        if not pendientes:
+            return encontrados
+        marcadores = ", ".join(["%s"] * len(pendientes))
+        with lectura() as cursor:
+            cursor.execute(f"""
+                SELECT u.id_usuario, u.nombre, u.email, c.nivel_fitness 
+                FROM usuario u 
+                JOIN cliente c ON u.id_usuario = c.id_usuario 
+                WHERE u.id_usuario IN ({marcadores})
+            """, tuple(pendientes))
+            for row in cursor.fetchall():
+                cliente = cls._desde_fila(row)
+                encontrados[cliente.id] = cliente
+        return encontrados
 
     @classmethod
     def listar_todos(cls):
         """Listar todos los clientes"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("""
                 SELECT u.id_usuario, u.nombre, u.email, c.nivel_fitness 
                 FROM usuario u 
@@ -64,33 +79,69 @@ class Cliente(Usuario):
                 ORDER BY u.nombre
             """)
             rows = cursor.fetchall()
-            return [cls(row['id_usuario'], row['nombre'], row['email'], row['nivel_fitness']) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+            return [cls._desde_fila(row) for row in rows]
+
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los clientes de a lotes (memoria constante)"""
+        for rows in leer_en_lotes("""
+            SELECT u.id_usuario, u.nombre, u.email, c.nivel_fitness 
+            FROM usuario u 
+            JOIN cliente c ON u.id_usuario = c.id_usuario 
+            ORDER BY u.nombre
+        """, lote=lote):
+            yield from (cls._desde_fila(row) for row in rows)
+
+    @classmethod
+    async def abuscar_por_id(cls, id_usuario):
+        """Buscar cliente por ID (async)"""
+        existente = identidad.obtener(cls, id_usuario)
+        if existente is not None:
+            return existente
+        rows = await db_async.consultar("""
+            SELECT u.id_usuario, u.nombre, u.email, c.nivel_fitness 
+            FROM usuario u 
+            JOIN cliente c ON u.id_usuario = c.id_usuario 
+            WHERE u.id_usuario = %s
+        """, (id_usuario,))
+        return cls._desde_fila(rows[0]) if rows else None
+
+    @classmethod
+    async def alistar_todos(cls):
+        """Listar todos los clientes (async)"""
+        rows = await db_async.consultar("""
+            SELECT u.id_usuario, u.nombre, u.email, c.nivel_fitness 
+            FROM usuario u 
+            JOIN cliente c ON u.id_usuario = c.id_usuario 
+            ORDER BY u.nombre
+        """)
+        return [cls._desde_fila(row) for row in rows]
+
+    @classmethod
+    def _desde_fila(cls, row):
+        """Construir (o reutilizar del mapa de identidad) un cliente a partir de una fila"""
+        return identidad.registrar(
+            cls(row['id_usuario'], row['nombre'], row['email'], row['nivel_fitness']), row['id_usuario']
+        )
 
     def actualizar_nivel(self, nuevo_nivel):
         """Actualizar nivel de fitness del cliente"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "UPDATE cliente SET nivel_fitness = %s WHERE id_usuario = %s",
                 (nuevo_nivel, self.id)
             )
-            conn.commit()
-            self.nivel_fitness = nuevo_nivel
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        self.nivel_fitness = nuevo_nivel
 
-    def obtener_sesiones(self):
+    def obtener_sesiones(self, perezoso=False):
         """Obtener sesiones del cliente"""
         from sesion_entrenamiento import SesionEntrenamiento
-        return SesionEntrenamiento.buscar_por_cliente(self.id)
+        return SesionEntrenamiento.buscar_por_cliente(self.id, perezoso)
+
+    def resumen_dashboard(self):
+        """Conteos por estado, planes, calificación promedio y próxima sesión (una consulta)"""
+        from sesion_entrenamiento import SesionEntrenamiento
+        return SesionEntrenamiento.resumen_por_cliente(self.id)
 
     def calificar_sesion(self, sesion, calificacion):
         """Calificar una sesión de entrenamiento"""
@@ -103,10 +154,13 @@ class Cliente(Usuario):
 
     def mostrar_dashboard(self):
         """Mostrar dashboard del cliente"""
-        sesiones = self.obtener_sesiones()
-        sesiones_completadas = len([s for s in sesiones if s.estado == 'FINALIZADA'])
+        resumen = self.resumen_dashboard()
         
         print(f"--- Dashboard de Cliente: {self.nombre} ---")
         print(f"Nivel: {self.nivel_fitness}")
-        print(f"Sesiones completadas: {sesiones_completadas}")
-        print(f"Total de sesiones: {len(sesiones)}")
\ No newline at end of file
+        print(f"Sesiones completadas: {resumen['por_estado']['FINALIZADA']}")
+        print(f"Total de sesiones: {resumen['total']}")
+        if resumen['calificacion_promedio'] is not None:
+            print(f"Calificación promedio: {resumen['calificacion_promedio']}/5")
+        if resumen['proxima_sesion'] is not None:
+            print(f"Próxima sesión: {resumen['proxima_sesion'].strftime('%Y-%m-%d %H:%M')}")
\ No newline at end of file
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import Context, ContextVar
+import os
+import threading
+
+from db_connection import POOL_SIZE
+import instrumentacion
+
+# Lecturas independientes de una misma pantalla (p. ej. entrenadores y planes)
+# corren a la vez, cada una con su propia conexión del pool: la pantalla tarda
+# lo que la consulta más lenta y no la suma de todas.
+#
+# Cada lectura corre en un contexto vacío, así que no comparte la conexión, la
+# transacción ni el mapa de identidad de quien llama: ve solo datos confirmados.
+
+MAX_HILOS = int(os.getenv("DB_HILOS_LECTURA", POOL_SIZE))
+
+_hilos = None
+_hilos_lock = threading.Lock()
+_en_hilo_lectura = ContextVar("en_hilo_lectura", default=False)
+
+
+def _ejecutor():
+    """Crear el pool de hilos la primera vez que se necesita"""
+    global _hilos
+    if _hilos is None:
+        with _hilos_lock:
+            if _hilos is None:
+                _hilos = ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix="lectura")
+    return _hilos
+
+
+def en_paralelo(*lecturas):
+    """Correr funciones de lectura sin argumentos a la vez; retorna sus resultados en el mismo orden.
+
+    Espera a que terminen todas; si alguna falla, se relanza el primer error.
+    """
+    if len(lecturas) < 2 or _en_hilo_lectura.get():
+        # Una sola lectura no gana nada, y anidar podría agotar los hilos esperándose entre sí
+        return tuple(lectura() for lectura in lecturas)
+    padre = instrumentacion.accion_actual()
+    futuros = [_ejecutor().submit(Context().run, _correr, lectura, padre) for lectura in lecturas]
+    wait(futuros)
+    return tuple(futuro.result() for futuro in futuros)
+
+
+def _correr(lectura, padre):
+    _en_hilo_lectura.set(True)
+    if padre is None:
+        return lectura()
+    # Las consultas del hilo se suman a la acción de quien llamó
+    with instrumentacion.accion(getattr(lectura, "__name__", "lectura"), padre=padre):
+        return lectura()
@@ -0,0 +1,116 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import time
+import weakref
+
+from mysql.connector.aio import pooling
+from mysql.connector.errors import PoolError
+
+from db_connection import DB_CONFIG, POOL_NAME, POOL_SIZE, POOL_TIMEOUT
+
+# Versión asíncrona de db_connection sobre mysql.connector.aio, con la misma
+# configuración. Las lecturas toman cada una su propia conexión del pool, así
+# que varias consultas independientes pueden correr a la vez con asyncio.gather.
+# Dentro de una transacción las llamadas anidadas comparten su conexión: no
+# lanzar tareas concurrentes dentro de `transaccion()`.
+
+# Los objetos de asyncio pertenecen a un event loop: un pool por loop
+_pools = weakref.WeakKeyDictionary()
+_candados = weakref.WeakKeyDictionary()
+
+
+async def get_pool():
+    """Crear e inicializar el pool del event loop actual la primera vez que se necesita"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is not None:
+        return pool
+    candado = _candados.setdefault(loop, asyncio.Lock())
+    async with candado:
+        pool = _pools.get(loop)
+        if pool is None:
+            pool = pooling.MySQLConnectionPool(
+                pool_name = f"{POOL_NAME}_aio",
+                pool_size = POOL_SIZE,
+                **DB_CONFIG
+            )
+            await pool.initialize_pool()
+            _pools[loop] = pool
+    return pool
+
+
+async def cerrar_pool():
+    """Cerrar las conexiones del pool del event loop actual (p. ej. al apagar un servidor)"""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close_pool()
+
+
+async def get_conn(timeout=None):
+    """Obtener una conexión del pool, esperando sin bloquear el loop si está agotado"""
+    pool = await get_pool()
+    limite = time.monotonic() + (POOL_TIMEOUT if timeout is None else timeout)
+    espera = 0.005
+    while True:
+        try:
+            return await pool.get_connection()
+        except PoolError:
+            if time.monotonic() >= limite:
+                raise
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, 0.1)
+
+
+_transaccion_actual = ContextVar("transaccion_async", default=None)
+
+
+@asynccontextmanager
+async def transaccion(dictionary=False):
+    """Unidad de trabajo asíncrona: commit al salir o rollback si falla (se une a la exterior)"""
+    conn = _transaccion_actual.get()
+    if conn is not None:
+        cursor = await conn.cursor(dictionary=dictionary, buffered=True)
+        try:
+            yield cursor
+        finally:
+            await cursor.close()
+        return
+    conn = await get_conn()
+    token = _transaccion_actual.set(conn)
+    cursor = None
+    try:
+        cursor = await conn.cursor(dictionary=dictionary, buffered=True)
+        yield cursor
+        await conn.commit()
+    except BaseException:
+        await conn.rollback()
+        raise
+    finally:
+        _transaccion_actual.reset(token)
+        if cursor is not None:
+            await cursor.close()
+        await conn.close()  # Devuelve la conexión al pool
+
+
+@asynccontextmanager
+async def lectura(dictionary=True):
+    """Cursor de lectura: usa la transacción en curso o una conexión propia del pool"""
+    conn = _transaccion_actual.get()
+    propia = conn is None
+    if propia:
+        conn = await get_conn()
+    cursor = await conn.cursor(dictionary=dictionary, buffered=True)
+    try:
+        yield cursor
+    finally:
+        await cursor.close()
+        if propia:
+            await conn.close()
+
+
+async def consultar(sql, params=(), dictionary=True):
+    """Atajo para una lectura completa: retorna todas las filas"""
+    async with lectura(dictionary) as cursor:
+        await cursor.execute(sql, params)
+        return await cursor.fetchall()
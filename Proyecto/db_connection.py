@@ -1,8 +1,17 @@
 import mysql.connector
 from mysql.connector import Error
 from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
+from identidad import mapa_identidad
+import instrumentacion
 import os
+import threading
+import time
+import weakref
 
 load_dotenv()  # Cargar las variables del archivo .env
 
@@ -18,27 +27,299 @@ DB_CONFIG = {
 
 POOL_NAME = os.getenv("POOL_NAME", "bib_pool")
 POOL_SIZE = int(os.getenv("POOL_SIZE", 5))
+POOL_TIMEOUT = float(os.getenv("POOL_TIMEOUT", 10))  # segundos esperando una conexión libre
 
-pool = pooling.MySQLConnectionPool(
-    pool_name = POOL_NAME,
-    pool_size = POOL_SIZE,
-    **DB_CONFIG
-)
+# Sentencias preparadas (protocolo binario) para las búsquedas puntuales; opcional
+SENTENCIAS_PREPARADAS = os.getenv("DB_SENTENCIAS_PREPARADAS", "0") == "1"
+MAX_SENTENCIAS = int(os.getenv("DB_MAX_SENTENCIAS", 32))  # por conexión
 
-def get_conn():
-    return pool.get_connection()
+LOTE_LECTURA = int(os.getenv("DB_LOTE_LECTURA", 1000))  # filas por fetchmany en los iterar_*
 
+_pool = None
+_pool_lock = threading.Lock()
 
 
+def configurar_pool(pool_size=None, timeout=None, sentencias_preparadas=None):
+    """Configurar tamaño del pool, tiempo máximo de espera y sentencias preparadas (antes del primer uso)"""
+    global POOL_SIZE, POOL_TIMEOUT, SENTENCIAS_PREPARADAS
+    with _pool_lock:
+        if _pool is not None and pool_size is not None and pool_size != POOL_SIZE:
+            raise RuntimeError("El pool ya fue creado; configure el tamaño antes de usarlo")
+        if _pool is not None and sentencias_preparadas and _pool.reset_session:
+            # El reinicio de sesión al devolver la conexión libera las sentencias preparadas
+            raise RuntimeError("El pool ya fue creado sin soporte para sentencias preparadas")
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if timeout is not None:
+            POOL_TIMEOUT = timeout
+        if sentencias_preparadas is not None:
+            SENTENCIAS_PREPARADAS = sentencias_preparadas
 
-def create_connection():
+
+def get_pool():
+    """Crear el pool la primera vez que se necesita"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name = POOL_NAME,
+                    pool_size = POOL_SIZE,
+                    # COM_RESET_CONNECTION libera las sentencias preparadas de la conexión
+                    pool_reset_session = not SENTENCIAS_PREPARADAS,
+                    **DB_CONFIG
+                )
+    return _pool
+
+
+def get_conn(timeout=None):
+    """Obtener una conexión del pool, esperando si está agotado"""
+    limite = time.monotonic() + (POOL_TIMEOUT if timeout is None else timeout)
+    espera = 0.005
+    while True:
+        try:
+            return get_pool().get_connection()
+        except PoolError:
+            if time.monotonic() >= limite:
+                raise
+            time.sleep(espera)
+            espera = min(espera * 2, 0.1)
+
+
+class _Ambito:
+    """Conexión compartida por las llamadas anidadas dentro de una misma operación"""
+    def __init__(self, conn):
+        self.conn = conn
+        self.en_transaccion = False
+
+
+_ambito_actual = ContextVar("ambito_actual", default=None)
+
+
+@contextmanager
+def sesion_db():
+    """Publicar una conexión del pool para que las llamadas anidadas la reutilicen.
+
+    Mientras dure, también hay un mapa de identidad abierto (ver identidad.py).
+    """
+    ambito = _ambito_actual.get()
+    if ambito is not None:
+        yield ambito
+        return
+    inicio = time.perf_counter()
+    ambito = _Ambito(get_conn())
+    instrumentacion.conexion_abierta(time.perf_counter() - inicio)
+    token = _ambito_actual.set(ambito)
+    try:
+        with mapa_identidad():
+            yield ambito
+    finally:
+        _ambito_actual.reset(token)
+        try:
+            # Siempre, aunque solo se haya leído: con autocommit=False cada lectura abre una
+            # transacción, y si el pool no reinicia la sesión (sentencias preparadas) su
+            # instantánea y sus bloqueos de metadatos seguirían vivos en la próxima reserva
+            ambito.conn.rollback()
+        finally:
+            ambito.conn.close()  # Devuelve la conexión al pool
+
+
+@contextmanager
+def transaccion(dictionary=False):
+    """Unidad de trabajo: commit al salir o rollback si falla.
+
+    Si ya hay una transacción en curso en este contexto, se une a ella y
+    el commit/rollback queda a cargo de la transacción exterior.
+    """
+    with sesion_db() as ambito:
+        exterior = not ambito.en_transaccion
+        ambito.en_transaccion = True
+        cursor = None
+        try:
+            cursor = ambito.conn.cursor(dictionary=dictionary, buffered=True)
+            yield instrumentacion.envolver(cursor)
+            if exterior:
+                ambito.conn.commit()
+        except Exception:
+            if exterior:
+                ambito.conn.rollback()
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if exterior:
+                ambito.en_transaccion = False
+
+
+@contextmanager
+def lectura(dictionary=True, preparada=False):
+    """Cursor de lectura sobre la conexión del contexto actual.
+
+    Con preparada=True (y SENTENCIAS_PREPARADAS activo) se usa una sentencia
+    preparada cacheada en la conexión; pensado para búsquedas puntuales.
+    """
+    with sesion_db() as ambito:
+        if preparada and SENTENCIAS_PREPARADAS:
+            yield instrumentacion.envolver(_CursorPreparado(ambito.conn, dictionary))
+            return
+        cursor = ambito.conn.cursor(dictionary=dictionary, buffered=True)
+        try:
+            yield instrumentacion.envolver(cursor)
+        finally:
+            cursor.close()
+
+
+def leer_en_lotes(sql, params=(), lote=None, dictionary=True):
+    """Generador de lotes de filas leídos con un cursor sin buffer (memoria constante).
+
+    Usa una conexión propia del pool que no se publica en el contexto: mientras
+    quede resultado por leer esa conexión no admite otras consultas, y así las
+    llamadas anidadas (p. ej. cargar relaciones de cada lote) usan otra. Si quien
+    consume corta antes, la consulta se mata en lugar de leer el resto de las filas.
+    """
+    lote = lote or LOTE_LECTURA
+    accion = instrumentacion.accion_actual()
+    inicio = time.perf_counter()
+    conn = get_conn()
+    instrumentacion.conexion_abierta(time.perf_counter() - inicio)
+    cursor = None
+    leidas = 0
+    segundos = 0.0
+    try:
+        cursor = conn.cursor(dictionary=dictionary)
+        inicio = time.perf_counter()
+        cursor.execute(sql, params)
+        while True:
+            filas = cursor.fetchmany(lote)
+            segundos += time.perf_counter() - inicio
+            if not filas:
+                return
+            leidas += len(filas)
+            yield filas
+            inicio = time.perf_counter()
+    finally:
+        # Con cursor sin buffer rowcount no sirve: se registran las filas leídas
+        instrumentacion.registrar_lectura(accion, sql, params, segundos, leidas)
+        if conn.unread_result:
+            _descartar(conn)
+        else:
+            if cursor is not None:
+                cursor.close()
+            conn.close()  # Devuelve la conexión al pool
+
+
+def _descartar(conn):
+    """Cortar una lectura sin buffer a medias sin traer las filas que faltan.
+
+    consume_results() leería todo el resto del resultado (quizá millones de
+    filas). En su lugar se mata la conexión desde otra y se cierra la física;
+    el pool la vuelve a conectar la próxima vez que la entregue.
+    """
+    fisica = getattr(conn, "_cnx", conn)
+    _olvidar_sentencias(conn)
+    try:
+        auxiliar = mysql.connector.connect(**DB_CONFIG)
+        try:
+            cursor = auxiliar.cursor()
+            cursor.execute("KILL %s", (fisica.connection_id,))
+            cursor.close()
+        finally:
+            auxiliar.close()
+    except Error:
+        pass  # si no se pudo matar, cerrarla igual corta la lectura (el servidor aborta al escribir)
+    try:
+        fisica.close()
+    except Error:
+        pass
+    try:
+        conn.close()  # vuelve al pool ya desconectada
+    except Error:
+        pass  # el reinicio de sesión falla sobre una conexión cerrada; igual quedó en el pool
+
+
+# conexión física -> OrderedDict((sql, dictionary) -> (sql, cursor preparado))
+_sentencias = weakref.WeakKeyDictionary()
+
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+
+def _sentencia(conn, sql, dictionary):
+    """Cursor preparado para `sql` en esta conexión (se prepara solo la primera vez)"""
+    fisica = getattr(conn, "_cnx", conn)  # PooledMySQLConnection envuelve la conexión real
+    cache = _sentencias.get(fisica)
+    if cache is None:
+        cache = _sentencias[fisica] = OrderedDict()
+    clave = (sql, dictionary)
+    entrada = cache.get(clave)
+    if entrada is not None:
+        cache.move_to_end(clave)
+        return entrada
+    # El conector solo reutiliza la sentencia si recibe el mismo objeto str,
+    # por eso se guarda el texto junto con el cursor
+    entrada = cache[clave] = (sql, fisica.cursor(prepared=True, dictionary=dictionary))
+    while len(cache) > MAX_SENTENCIAS:
+        _, (_, viejo) = cache.popitem(last=False)
+        viejo.close()  # COM_STMT_CLOSE
+    return entrada
+
+
+def _olvidar_sentencias(conn):
+    """Descartar el caché de una conexión (p. ej. tras reconectar)"""
+    _sentencias.pop(getattr(conn, "_cnx", conn), None)
+
+
+class _CursorPreparado:
+    """Cursor de lectura con la interfaz de uno buffered, ejecutado con sentencias preparadas"""
+    def __init__(self, conn, dictionary):
+        self.conn = conn
+        self.dictionary = dictionary
+        self._filas = []
+        self._siguiente = 0
+
+    def execute(self, sql, params=()):
+        try:
+            texto, cursor = _sentencia(self.conn, sql, self.dictionary)
+            cursor.execute(texto, params)
+        except Error as e:
+            if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                raise
+            # El servidor ya no conoce la sentencia: se vuelve a preparar
+            _olvidar_sentencias(self.conn)
+            texto, cursor = _sentencia(self.conn, sql, self.dictionary)
+            cursor.execute(texto, params)
+        self._filas = cursor.fetchall() if cursor.with_rows else []
+        self._siguiente = 0
+
+    @property
+    def rowcount(self):
+        return len(self._filas)
+
+    def fetchone(self):
+        if self._siguiente >= len(self._filas):
+            return None
+        self._siguiente += 1
+        return self._filas[self._siguiente - 1]
+
+    def fetchall(self):
+        filas = self._filas[self._siguiente:]
+        self._siguiente = len(self._filas)
+        return filas
+
+    def close(self):
+        self._filas = []
+
+
+
+
+def create_connection(allow_local_infile=False):
     try:
         connection = mysql.connector.connect(
             host=os.getenv("DB_HOST"),
             user=os.getenv("DB_USER"),
             port = os.getenv("DB_PORT"),
             password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
+            database=os.getenv("DB_NAME"),
+            allow_local_infile=allow_local_infile  # necesario para LOAD DATA LOCAL INFILE
         )
         if connection.is_connected():
             print("Conexión exitosa a MySQL")
@@ -50,4 +331,4 @@ def create_connection():
 def close_connection(connection):
     if connection and connection.is_connected():
         connection.close()
-        print("Conexión cerrada.")
\ No newline at end of file
+        print("Conexión cerrada.")
@@ -1,7 +1,29 @@
 from abc import ABC, abstractmethod
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
+import db_async
+import identidad
+from cache import cacheado, invalidar
+from cambios import Columna, ConCambios
+
+# Columnas de un ejercicio junto con las de ambos subtipos (usar con JOIN_SUBTIPOS)
+COLUMNAS_EJERCICIO = """
+    e.id_ejercicio, e.nombre, e.descripcion, e.tipo,
+    ef.id_ejercicio AS id_fuerza, ef.repeticiones, ef.series, ef.peso_kg,
+    ec.id_ejercicio AS id_cardio, ec.duracion_minutos, ec.tipo_cardio,
+    ec.nivel_resistencia, ec.ritmo_cardiaco_objetivo
+"""
+
+JOIN_SUBTIPOS = """
+    LEFT JOIN ejercicio_fuerza ef ON ef.id_ejercicio = e.id_ejercicio
+    LEFT JOIN ejercicio_cardio ec ON ec.id_ejercicio = e.id_ejercicio
+"""
+
+class Ejercicio(ConCambios, ABC):
+    nombre = Columna("ejercicio")
+    descripcion = Columna("ejercicio")
+    _claves_tabla = {"ejercicio": "id_ejercicio"}
+    _espacios_cache = ("ejercicios", "planes")
 
-class Ejercicio(ABC):
     def __init__(self, id_ejercicio, nombre, descripcion, tipo):
         self.id = id_ejercicio
         self.nombre = nombre
@@ -11,58 +33,68 @@ class Ejercicio(ABC):
     @classmethod
     def crear(cls, nombre, descripcion, tipo):
         """Crear un nuevo ejercicio"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "INSERT INTO ejercicio (nombre, descripcion, tipo) VALUES (%s, %s, %s)",
                 (nombre, descripcion, tipo)
             )
             ejercicio_id = cursor.lastrowid
-            conn.commit()
-            
+        
             # Retornar instancia del tipo correcto
-            if tipo == 'FUERZA':
-                from ejercicio_fuerza import EjercicioFuerza
-                return EjercicioFuerza.buscar_por_id(ejercicio_id)
-            else:  # CARDIO
-                from ejercicio_cardio import EjercicioCardio
-                return EjercicioCardio.buscar_por_id(ejercicio_id)
-                
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+            ejercicio = Ejercicio.buscar_por_id(ejercicio_id)
+        invalidar("ejercicios", "planes")
+        return ejercicio
 
     @classmethod
     def buscar_por_id(cls, id_ejercicio):
         """Buscar ejercicio por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id_ejercicio, nombre, descripcion, tipo FROM ejercicio WHERE id_ejercicio = %s",
-                (id_ejercicio,)
-            )
+        existente = identidad.obtener(cls, id_ejercicio)
+        if existente is not None:
+            return existente
+        with lectura(preparada=True) as cursor:
+            cursor.execute(f"""
+                SELECT {COLUMNAS_EJERCICIO}
+                FROM ejercicio e
+                {JOIN_SUBTIPOS}
+                WHERE e.id_ejercicio = %s
+            """, (id_ejercicio,))
             row = cursor.fetchone()
-            if not row:
-                return None
-            
-            # Retornar instancia del tipo correcto
-            if row['tipo'] == 'FUERZA':
-                from ejercicio_fuerza import EjercicioFuerza
-                return EjercicioFuerza.buscar_por_id(id_ejercicio)
-            else:  # CARDIO
-                from ejercicio_cardio import EjercicioCardio
-                return EjercicioCardio.buscar_por_id(id_ejercicio)
-                
-        finally:
-            cursor.close()
-            conn.close()
+        # Retornar instancia del tipo correcto
+        ejercicio = Ejercicio._desde_fila(row) if row else None
+        return ejercicio if isinstance(ejercicio, cls) else None
 
     @classmethod
+    def buscar_por_ids(cls, ids):
+        """Buscar varios ejercicios en una sola consulta; retorna un dict {id: ejercicio}"""
+        ejercicios = {}
+        pendientes = []
+        for id_ejercicio in dict.fromkeys(ids):
+            existente = identidad.obtener(cls, id_ejercicio)
+            if existente is not None:
+                ejercicios[id_ejercicio] = existente
+            else:
+                pendientes.append(id_ejercicio)
+        if not pendientes:
+            return ejercicios
+        ids = pendientes
+        marcadores = ", ".join(["%s"] * len(ids))
+        with lectura() as cursor:
+            cursor.execute(f"""
+                SELECT {COLUMNAS_EJERCICIO}
+                FROM ejercicio e
+                {JOIN_SUBTIPOS}
+                WHERE e.id_ejercicio IN ({marcadores})
+            """, tuple(ids))
+            rows = cursor.fetchall()
+        
+        for row in rows:
+            ejercicio = Ejercicio._desde_fila(row)
+            if ejercicio is not None and isinstance(ejercicio, cls):
+                ejercicios[ejercicio.id] = ejercicio
+        return ejercicios
+
+    @classmethod
+    @cacheado("ejercicios")
     def listar_todos(cls):
         """Listar todos los ejercicios"""
         ejercicios = []
@@ -77,44 +109,68 @@ class Ejercicio(ABC):
         
         return sorted(ejercicios, key=lambda x: x.nombre)
 
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los ejercicios de a lotes (memoria constante)"""
+        for rows in leer_en_lotes(f"""
+            SELECT {COLUMNAS_EJERCICIO}
+            FROM ejercicio e
+            {JOIN_SUBTIPOS}
+            ORDER BY e.nombre
+        """, lote=lote):
+            for row in rows:
+                ejercicio = Ejercicio._desde_fila(row)
+                if ejercicio is not None:
+                    yield ejercicio
+
+    @classmethod
+    async def alistar_todos(cls):
+        """Listar todos los ejercicios (async)"""
+        rows = await db_async.consultar(f"""
+            SELECT {COLUMNAS_EJERCICIO}
+            FROM ejercicio e
+            {JOIN_SUBTIPOS}
+            ORDER BY e.nombre
+        """)
+        return [ejercicio for ejercicio in map(Ejercicio._desde_fila, rows) if ejercicio is not None]
+
     @classmethod
     def buscar_por_nombre(cls, nombre):
         """Buscar ejercicio por nombre"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id_ejercicio, tipo FROM ejercicio WHERE nombre = %s",
-                (nombre,)
-            )
+        with lectura() as cursor:
+            cursor.execute(f"""
+                SELECT {COLUMNAS_EJERCICIO}
+                FROM ejercicio e
+                {JOIN_SUBTIPOS}
+                WHERE e.nombre = %s
+                LIMIT 1
+            """, (nombre,))
             row = cursor.fetchone()
-            if not row:
+        return Ejercicio._desde_fila(row) if row else None
+
+    @staticmethod
+    def _desde_fila(row):
+        """Construir la subclase correcta a partir de una fila con COLUMNAS_EJERCICIO"""
+        if row['tipo'] == 'FUERZA':
+            if row['id_fuerza'] is None:
+                return None
+            from ejercicio_fuerza import EjercicioFuerza
+            ejercicio = EjercicioFuerza(row['id_ejercicio'], row['nombre'], row['descripcion'],
+                                        row['repeticiones'], row['series'], row['peso_kg'])
+        else:  # CARDIO
+            if row['id_cardio'] is None:
                 return None
-            
-            if row['tipo'] == 'FUERZA':
-                from ejercicio_fuerza import EjercicioFuerza
-                return EjercicioFuerza.buscar_por_id(row['id_ejercicio'])
-            else:  # CARDIO
-                from ejercicio_cardio import EjercicioCardio
-                return EjercicioCardio.buscar_por_id(row['id_ejercicio'])
-                
-        finally:
-            cursor.close()
-            conn.close()
+            from ejercicio_cardio import EjercicioCardio
+            ejercicio = EjercicioCardio(row['id_ejercicio'], row['nombre'], row['descripcion'],
+                                        row['duracion_minutos'], row['tipo_cardio'],
+                                        row['nivel_resistencia'], row['ritmo_cardiaco_objetivo'])
+        return identidad.registrar(ejercicio, ejercicio.id)
 
     def eliminar(self):
         """Eliminar ejercicio de la base de datos"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute("DELETE FROM ejercicio WHERE id_ejercicio = %s", (self.id,))
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        invalidar("ejercicios", "planes")
 
     def __str__(self):
         return f"{self.nombre} ({self.tipo}) - {self.descripcion}"
\ No newline at end of file
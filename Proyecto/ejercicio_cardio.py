@@ -1,5 +1,7 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
 from ejercicio import Ejercicio
+import identidad
+from cache import invalidar
 
 class EjercicioCardio(Ejercicio):
     def __init__(self, id_ejercicio, nombre, descripcion, duracion_minutos, tipo_cardio, 
@@ -13,9 +15,7 @@ class EjercicioCardio(Ejercicio):
     @classmethod
     def crear(cls, nombre, descripcion, duracion_minutos, tipo_cardio, nivel_resistencia=1, ritmo_cardiaco_objetivo=120):
         """Crear un nuevo ejercicio de cardio"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             # Insertar en ejercicio
             cursor.execute(
                 "INSERT INTO ejercicio (nombre, descripcion, tipo) VALUES (%s, %s, 'CARDIO')",
@@ -29,22 +29,18 @@ class EjercicioCardio(Ejercicio):
                 nivel_resistencia, ritmo_cardiaco_objetivo) VALUES (%s, %s, %s, %s, %s)""",
                 (ejercicio_id, duracion_minutos, tipo_cardio, nivel_resistencia, ritmo_cardiaco_objetivo)
             )
-            conn.commit()
-            return cls(ejercicio_id, nombre, descripcion, duracion_minutos, tipo_cardio, 
-                      nivel_resistencia, ritmo_cardiaco_objetivo)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+            ejercicio = identidad.registrar(cls(ejercicio_id, nombre, descripcion, duracion_minutos, tipo_cardio, 
+                      nivel_resistencia, ritmo_cardiaco_objetivo), ejercicio_id)
+        invalidar("ejercicios", "planes")
+        return ejercicio
 
     @classmethod
     def buscar_por_id(cls, id_ejercicio):
         """Buscar ejercicio de cardio por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        existente = identidad.obtener(cls, id_ejercicio)
+        if existente is not None:
+            return existente
+        with lectura(preparada=True) as cursor:
             cursor.execute("""
                 SELECT e.id_ejercicio, e.nombre, e.descripcion, ec.duracion_minutos, 
                        ec.tipo_cardio, ec.nivel_resistencia, ec.ritmo_cardiaco_objetivo 
@@ -53,19 +49,14 @@ class EjercicioCardio(Ejercicio):
                 WHERE e.id_ejercicio = %s
             """, (id_ejercicio,))
             row = cursor.fetchone()
-            return cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
+            return identidad.registrar(cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
                       row['duracion_minutos'], row['tipo_cardio'],
-                      row['nivel_resistencia'], row['ritmo_cardiaco_objetivo']) if row else None
-        finally:
-            cursor.close()
-            conn.close()
+                      row['nivel_resistencia'], row['ritmo_cardiaco_objetivo']), row['id_ejercicio']) if row else None
 
     @classmethod
     def listar_todos(cls):
         """Listar todos los ejercicios de cardio"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("""
                 SELECT e.id_ejercicio, e.nombre, e.descripcion, ec.duracion_minutos, 
                        ec.tipo_cardio, ec.nivel_resistencia, ec.ritmo_cardiaco_objetivo 
@@ -74,12 +65,24 @@ class EjercicioCardio(Ejercicio):
                 ORDER BY e.nombre
             """)
             rows = cursor.fetchall()
-            return [cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
+            return [identidad.registrar(cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
                        row['duracion_minutos'], row['tipo_cardio'],
-                       row['nivel_resistencia'], row['ritmo_cardiaco_objetivo']) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+                       row['nivel_resistencia'], row['ritmo_cardiaco_objetivo']), row['id_ejercicio']) for row in rows]
+
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los ejercicios de a lotes (memoria constante)"""
+        for rows in leer_en_lotes("""
+            SELECT e.id_ejercicio, e.nombre, e.descripcion, ec.duracion_minutos, 
+                   ec.tipo_cardio, ec.nivel_resistencia, ec.ritmo_cardiaco_objetivo 
+            FROM ejercicio e 
+            JOIN ejercicio_cardio ec ON e.id_ejercicio = ec.id_ejercicio 
+            ORDER BY e.nombre
+        """, lote=lote):
+            for row in rows:
+                yield identidad.registrar(cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
+                          row['duracion_minutos'], row['tipo_cardio'],
+                          row['nivel_resistencia'], row['ritmo_cardiaco_objetivo']), row['id_ejercicio'])
 
     def calcular_intensidad(self):
         """Calcular intensidad del ejercicio"""
@@ -91,19 +94,11 @@ class EjercicioCardio(Ejercicio):
 
     def actualizar_duracion(self, nueva_duracion):
         """Actualizar duración del ejercicio"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute("UPDATE ejercicio_cardio SET duracion_minutos = %s WHERE id_ejercicio = %s", 
                          (nueva_duracion, self.id))
-            conn.commit()
             self.duracion_minutos = nueva_duracion
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        invalidar("ejercicios", "planes")
 
     @property
     def duracion_minutos(self):
@@ -1,7 +1,15 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
 from ejercicio import Ejercicio
+import identidad
+from cache import invalidar
+from cambios import Columna
 
 class EjercicioFuerza(Ejercicio):
+    repeticiones = Columna("ejercicio_fuerza")
+    series = Columna("ejercicio_fuerza")
+    peso_kg = Columna("ejercicio_fuerza")
+    _claves_tabla = {**Ejercicio._claves_tabla, "ejercicio_fuerza": "id_ejercicio"}
+
     def __init__(self, id_ejercicio, nombre, descripcion, repeticiones, series, peso_kg):
         super().__init__(id_ejercicio, nombre, descripcion, 'FUERZA')
         self.repeticiones = repeticiones
@@ -11,9 +19,7 @@ class EjercicioFuerza(Ejercicio):
     @classmethod
     def crear(cls, nombre, descripcion, repeticiones, series, peso_kg):
         """Crear un nuevo ejercicio de fuerza"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             # Insertar en ejercicio
             cursor.execute(
                 "INSERT INTO ejercicio (nombre, descripcion, tipo) VALUES (%s, %s, 'FUERZA')",
@@ -26,21 +32,17 @@ class EjercicioFuerza(Ejercicio):
                 "INSERT INTO ejercicio_fuerza (id_ejercicio, repeticiones, series, peso_kg) VALUES (%s, %s, %s, %s)",
                 (ejercicio_id, repeticiones, series, peso_kg)
             )
-            conn.commit()
-            return cls(ejercicio_id, nombre, descripcion, repeticiones, series, peso_kg)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+            ejercicio = identidad.registrar(cls(ejercicio_id, nombre, descripcion, repeticiones, series, peso_kg), ejercicio_id)
+        invalidar("ejercicios", "planes")
+        return ejercicio
 
     @classmethod
     def buscar_por_id(cls, id_ejercicio):
         """Buscar ejercicio de fuerza por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        existente = identidad.obtener(cls, id_ejercicio)
+        if existente is not None:
+            return existente
+        with lectura(preparada=True) as cursor:
             cursor.execute("""
                 SELECT e.id_ejercicio, e.nombre, e.descripcion, ef.repeticiones, ef.series, ef.peso_kg 
                 FROM ejercicio e 
@@ -48,18 +50,13 @@ class EjercicioFuerza(Ejercicio):
                 WHERE e.id_ejercicio = %s
             """, (id_ejercicio,))
             row = cursor.fetchone()
-            return cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
-                      row['repeticiones'], row['series'], row['peso_kg']) if row else None
-        finally:
-            cursor.close()
-            conn.close()
+            return identidad.registrar(cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
+                      row['repeticiones'], row['series'], row['peso_kg']), row['id_ejercicio']) if row else None
 
     @classmethod
     def listar_todos(cls):
         """Listar todos los ejercicios de fuerza"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("""
                 SELECT e.id_ejercicio, e.nombre, e.descripcion, ef.repeticiones, ef.series, ef.peso_kg 
                 FROM ejercicio e 
@@ -67,11 +64,21 @@ class EjercicioFuerza(Ejercicio):
                 ORDER BY e.nombre
             """)
             rows = cursor.fetchall()
-            return [cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
-                       row['repeticiones'], row['series'], row['peso_kg']) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+            return [identidad.registrar(cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
+                       row['repeticiones'], row['series'], row['peso_kg']), row['id_ejercicio']) for row in rows]
+
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los ejercicios de a lotes (memoria constante)"""
+        for rows in leer_en_lotes("""
+            SELECT e.id_ejercicio, e.nombre, e.descripcion, ef.repeticiones, ef.series, ef.peso_kg 
+            FROM ejercicio e 
+            JOIN ejercicio_fuerza ef ON e.id_ejercicio = ef.id_ejercicio 
+            ORDER BY e.nombre
+        """, lote=lote):
+            for row in rows:
+                yield identidad.registrar(cls(row['id_ejercicio'], row['nombre'], row['descripcion'], 
+                          row['repeticiones'], row['series'], row['peso_kg']), row['id_ejercicio'])
 
     def calcular_intensidad(self):
         """Calcular intensidad del ejercicio"""
@@ -82,26 +89,11 @@ class EjercicioFuerza(Ejercicio):
         return f"Fuerza: {self.series} series de {self.repeticiones} reps con {self.peso_kg}kg."
 
     def actualizar(self, repeticiones=None, series=None, peso_kg=None):
-        """Actualizar ejercicio de fuerza"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
-            if repeticiones is not None:
-                cursor.execute("UPDATE ejercicio_fuerza SET repeticiones = %s WHERE id_ejercicio = %s", 
-                             (repeticiones, self.id))
-                self.repeticiones = repeticiones
-            if series is not None:
-                cursor.execute("UPDATE ejercicio_fuerza SET series = %s WHERE id_ejercicio = %s", 
-                             (series, self.id))
-                self.series = series
-            if peso_kg is not None:
-                cursor.execute("UPDATE ejercicio_fuerza SET peso_kg = %s WHERE id_ejercicio = %s", 
-                             (peso_kg, self.id))
-                self.peso_kg = peso_kg
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
\ No newline at end of file
+        """Actualizar ejercicio de fuerza (un solo UPDATE con los campos que cambian)"""
+        if repeticiones is not None:
+            self.repeticiones = repeticiones
+        if series is not None:
+            self.series = series
+        if peso_kg is not None:
+            self.peso_kg = peso_kg
+        self.guardar()
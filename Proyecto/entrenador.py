@@ -1,6 +1,9 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, sesion_db, leer_en_lotes
 from usuario import Usuario
 from plan_entrenamiento import PlanEntrenamiento
+import db_async
+import identidad
+from cache import cacheado, invalidar
 
 class Entrenador(Usuario):
     def __init__(self, id_usuario, nombre, email, especialidad, anos_experiencia):
@@ -11,9 +14,7 @@ class Entrenador(Usuario):
     @classmethod
     def crear(cls, nombre, email, especialidad, anos_experiencia):
         """Crear un nuevo entrenador"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             # Insertar en usuario
             cursor.execute(
                 "INSERT INTO usuario (nombre, email, tipo) VALUES (%s, %s, 'ENTRENADOR')",
@@ -26,21 +27,16 @@ class Entrenador(Usuario):
                 "INSERT INTO entrenador (id_usuario, especialidad, anos_experiencia) VALUES (%s, %s, %s)",
                 (user_id, especialidad, anos_experiencia)
             )
-            conn.commit()
-            return cls(user_id, nombre, email, especialidad, anos_experiencia)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        invalidar("entrenadores")
+        return identidad.registrar(cls(user_id, nombre, email, especialidad, anos_experiencia), user_id)
 
     @classmethod
     def buscar_por_id(cls, id_usuario):
         """Buscar entrenador por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        existente = identidad.obtener(cls, id_usuario)
+        if existente is not None:
+            return existente
+        with lectura(preparada=True) as cursor:
             cursor.execute("""
                 SELECT u.id_usuario, u.nombre, u.email, e.especialidad, e.anos_experiencia 
                 FROM usuario u 
@@ -48,17 +44,39 @@ class Entrenador(Usuario):
                 WHERE u.id_usuario = %s
             """, (id_usuario,))
             row = cursor.fetchone()
-            return cls(row['id_usuario'], row['nombre'], row['email'], row['especialidad'], row['anos_experiencia']) if row else None
-        finally:
-            cursor.close()
-            conn.close()
+            return cls._desde_fila(row) if row else None
 
     @classmethod
+    def buscar_por_ids(cls, ids):
+        """Buscar varios entrenadores en una sola consulta; retorna un dict {id: entrenador}"""
+        encontrados = {}
+        pendientes = []
+        for id_usuario in dict.fromkeys(ids):
+            existente = identidad.obtener(cls, id_usuario)
+            if existente is not None:
+                encontrados[id_usuario] = existente
+            else:
+                pendientes.append(id_usuario)
+        if not pendientes:
+            return encontrados
+        marcadores = ", ".join(["%s"] * len(pendientes))
+        with lectura() as cursor:
+            cursor.execute(f"""
+                SELECT u.id_usuario, u.nombre, u.email, e.especialidad, e.anos_experiencia 
+                FROM usuario u 
+                JOIN entrenador e ON u.id_usuario = e.id_usuario 
+                WHERE u.id_usuario IN ({marcadores})
+            """, tuple(pendientes))
+            for row in cursor.fetchall():
+                entrenador = cls._desde_fila(row)
+                encontrados[entrenador.id] = entrenador
+        return encontrados
+
+    @classmethod
+    @cacheado("entrenadores")
     def listar_todos(cls):
         """Listar todos los entrenadores"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("""
                 SELECT u.id_usuario, u.nombre, u.email, e.especialidad, e.anos_experiencia 
                 FROM usuario u 
@@ -66,41 +84,79 @@ class Entrenador(Usuario):
                 ORDER BY u.nombre
             """)
             rows = cursor.fetchall()
-            return [cls(row['id_usuario'], row['nombre'], row['email'], row['especialidad'], row['anos_experiencia']) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+            return [cls._desde_fila(row) for row in rows]
+
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los entrenadores de a lotes (memoria constante)"""
+        for rows in leer_en_lotes("""
+            SELECT u.id_usuario, u.nombre, u.email, e.especialidad, e.anos_experiencia 
+            FROM usuario u 
+            JOIN entrenador e ON u.id_usuario = e.id_usuario 
+            ORDER BY u.nombre
+        """, lote=lote):
+            yield from (cls._desde_fila(row) for row in rows)
+
+    @classmethod
+    async def abuscar_por_id(cls, id_usuario):
+        """Buscar entrenador por ID (async)"""
+        existente = identidad.obtener(cls, id_usuario)
+        if existente is not None:
+            return existente
+        rows = await db_async.consultar("""
+            SELECT u.id_usuario, u.nombre, u.email, e.especialidad, e.anos_experiencia 
+            FROM usuario u 
+            JOIN entrenador e ON u.id_usuario = e.id_usuario 
+            WHERE u.id_usuario = %s
+        """, (id_usuario,))
+        return cls._desde_fila(rows[0]) if rows else None
+
+    @classmethod
+    async def alistar_todos(cls):
+        """Listar todos los entrenadores (async)"""
+        rows = await db_async.consultar("""
+            SELECT u.id_usuario, u.nombre, u.email, e.especialidad, e.anos_experiencia 
+            FROM usuario u 
+            JOIN entrenador e ON u.id_usuario = e.id_usuario 
+            ORDER BY u.nombre
+        """)
+        return [cls._desde_fila(row) for row in rows]
+
+    @classmethod
+    def _desde_fila(cls, row):
+        """Construir (o reutilizar del mapa de identidad) un entrenador a partir de una fila"""
+        return identidad.registrar(
+            cls(row['id_usuario'], row['nombre'], row['email'], row['especialidad'], row['anos_experiencia']),
+            row['id_usuario']
+        )
 
     def crear_plan(self, nombre, objetivo):
         """Crear un nuevo plan de entrenamiento"""
         return PlanEntrenamiento.crear(nombre, objetivo, self.id)
 
-    def obtener_planes(self):
+    def obtener_planes(self, perezoso=False):
         """Obtener planes creados por el entrenador"""
-        return PlanEntrenamiento.buscar_por_entrenador(self.id)
+        return PlanEntrenamiento.buscar_por_entrenador(self.id, perezoso=perezoso)
 
-    def obtener_sesiones(self):
+    def obtener_sesiones(self, perezoso=False):
         """Obtener sesiones del entrenador"""
         from sesion_entrenamiento import SesionEntrenamiento
-        return SesionEntrenamiento.buscar_por_entrenador(self.id)
+        return SesionEntrenamiento.buscar_por_entrenador(self.id, perezoso)
+
+    def resumen_dashboard(self):
+        """Conteos por estado, planes creados, calificación promedio y próxima sesión (una consulta)"""
+        from sesion_entrenamiento import SesionEntrenamiento
+        return SesionEntrenamiento.resumen_por_entrenador(self.id)
 
     def agregar_experiencia(self):
         """Aumentar años de experiencia"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "UPDATE entrenador SET anos_experiencia = anos_experiencia + 1 WHERE id_usuario = %s",
                 (self.id,)
             )
-            conn.commit()
-            self.anos_experiencia += 1
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        self.anos_experiencia += 1
+        invalidar("entrenadores")
 
     def actualizar_nivel_cliente(self, cliente_id, nuevo_nivel):
         """Actualizar el nivel de fitness de un cliente"""
@@ -117,52 +173,40 @@ class Entrenador(Usuario):
             raise ValueError(f"Nivel inválido. Debe ser uno de: {', '.join(niveles_validos)}")
         
         # Actualizar en la base de datos
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "UPDATE cliente SET nivel_fitness = %s WHERE id_usuario = %s",
                 (nuevo_nivel, cliente_id)
             )
-            conn.commit()
-            
-            # Actualizar el objeto cliente
-            cliente.nivel_fitness = nuevo_nivel
-            return cliente
-            
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        
+        # Actualizar el objeto cliente
+        cliente.nivel_fitness = nuevo_nivel
+        return cliente
 
     def obtener_clientes_entrenados(self):
         """Obtener lista de clientes que ha entrenado este entrenador"""
         from cliente import Cliente
-        from sesion_entrenamiento import SesionEntrenamiento
-        
-        # Obtener sesiones donde este entrenador ha trabajado
-        sesiones = self.obtener_sesiones()
         
-        # Obtener clientes únicos de esas sesiones
-        clientes_ids = set(sesion.cliente.id for sesion in sesiones)
-        clientes_entrenados = []
-        
-        for cliente_id in clientes_ids:
-            cliente = Cliente.buscar_por_id(cliente_id)
-            if cliente:
-                clientes_entrenados.append(cliente)
+        with sesion_db():
+            # Obtener sesiones donde este entrenador ha trabajado (solo hacen falta los ids)
+            sesiones = self.obtener_sesiones(perezoso=True)
+            
+            # Obtener clientes únicos de esas sesiones en una sola consulta
+            clientes_ids = set(sesion.id_cliente for sesion in sesiones)
+            clientes_entrenados = list(Cliente.buscar_por_ids(clientes_ids).values())
         
         return clientes_entrenados
 
     def mostrar_dashboard(self):
         """Mostrar dashboard del entrenador"""
-        planes = self.obtener_planes()
-        sesiones = self.obtener_sesiones()
+        resumen = self.resumen_dashboard()
         
         print(f"--- Panel de Entrenador: {self.nombre} ---")
         print(f"Especialidad: {self.especialidad}")
         print(f"Experiencia: {self.anos_experiencia} años")
-        print(f"Planes creados: {len(planes)}")
-        print(f"Sesiones programadas: {len(sesiones)}")
\ No newline at end of file
+        print(f"Planes creados: {resumen['planes']}")
+        print(f"Sesiones programadas: {resumen['total']}")
+        if resumen['calificacion_promedio'] is not None:
+            print(f"Calificación promedio: {resumen['calificacion_promedio']}/5")
+        if resumen['proxima_sesion'] is not None:
+            print(f"Próxima sesión: {resumen['proxima_sesion'].strftime('%Y-%m-%d %H:%M')}")
\ No newline at end of file
@@ -1,4 +1,6 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
+import db_async
+from paginacion import Pagina, TAMANO_PAGINA, condicion_despues_de
 
 class HistorialSesiones:
     def __init__(self, id_historial, id_cliente, id_sesion, fecha_registro):
@@ -10,27 +12,37 @@ class HistorialSesiones:
     @classmethod
     def agregar(cls, id_cliente, id_sesion):
         """Agregar sesión al historial"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "INSERT INTO historial_sesiones (id_cliente, id_sesion) VALUES (%s, %s)",
                 (id_cliente, id_sesion)
             )
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+
+    @classmethod
+    def agregar_sesiones(cls, ids_sesion):
+        """Agregar varias sesiones al historial con un solo INSERT ... SELECT"""
+        if not ids_sesion:
+            return
+        marcadores = ", ".join(["%s"] * len(ids_sesion))
+        with transaccion() as cursor:
+            cursor.execute(f"""
+                INSERT INTO historial_sesiones (id_cliente, id_sesion)
+                SELECT id_cliente, id_sesion FROM sesion_entrenamiento WHERE id_sesion IN ({marcadores})
+            """, tuple(ids_sesion))
+
+    @classmethod
+    async def aagregar(cls, id_cliente, id_sesion):
+        """Agregar sesión al historial (async)"""
+        async with db_async.transaccion() as cursor:
+            await cursor.execute(
+                "INSERT INTO historial_sesiones (id_cliente, id_sesion) VALUES (%s, %s)",
+                (id_cliente, id_sesion)
+            )
 
     @classmethod
     def buscar_por_cliente(cls, id_cliente):
         """Buscar historial por cliente"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("""
                 SELECT h.id_historial, h.id_cliente, h.id_sesion, h.fecha_registro,
                        s.fecha_hora, s.estado, s.calificacion
@@ -42,16 +54,42 @@ class HistorialSesiones:
             rows = cursor.fetchall()
             return [cls(row['id_historial'], row['id_cliente'], row['id_sesion'], row['fecha_registro']) 
                     for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+
+    @classmethod
+    def paginar_por_cliente(cls, id_cliente, tamano=TAMANO_PAGINA, cursor=None):
+        """Página del historial de un cliente, del registro más reciente al más antiguo"""
+        return cls._pagina("h.id_cliente = %s", (id_cliente,), tamano, cursor)
+
+    @classmethod
+    def paginar_todo(cls, tamano=TAMANO_PAGINA, cursor=None):
+        """Página de todo el historial"""
+        return cls._pagina(None, (), tamano, cursor)
+
+    @classmethod
+    def _pagina(cls, condicion, params, tamano, cursor):
+        """Leer tamano + 1 registros después del cursor, ordenados por (fecha_registro, id_historial)"""
+        condiciones = [condicion] if condicion else []
+        if cursor:
+            despues, params_cursor = condicion_despues_de("h.fecha_registro", "h.id_historial", cursor)
+            condiciones.append(despues)
+            params = params + params_cursor
+        filtro = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+        with lectura() as cur:
+            cur.execute(f"""
+                SELECT h.id_historial, h.id_cliente, h.id_sesion, h.fecha_registro
+                FROM historial_sesiones h
+                {filtro}
+                ORDER BY h.fecha_registro DESC, h.id_historial DESC
+                LIMIT %s
+            """, params + (tamano + 1,))
+            registros = [cls(row['id_historial'], row['id_cliente'], row['id_sesion'], row['fecha_registro'])
+                         for row in cur.fetchall()]
+        return Pagina.desde_filas(registros, tamano, lambda h: (h.fecha_registro, h.id_historial))
 
     @classmethod
     def listar_todo(cls):
         """Listar todo el historial"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("""
                 SELECT id_historial, id_cliente, id_sesion, fecha_registro
                 FROM historial_sesiones
@@ -60,6 +98,14 @@ class HistorialSesiones:
             rows = cursor.fetchall()
             return [cls(row['id_historial'], row['id_cliente'], row['id_sesion'], row['fecha_registro']) 
                     for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
\ No newline at end of file
+
+    @classmethod
+    def iterar_todo(cls, lote=None):
+        """Como listar_todo, pero generando los registros de a lotes (memoria constante)"""
+        for rows in leer_en_lotes("""
+            SELECT id_historial, id_cliente, id_sesion, fecha_registro
+            FROM historial_sesiones
+            ORDER BY fecha_registro DESC, id_historial DESC
+        """, lote=lote):
+            for row in rows:
+                yield cls(row['id_historial'], row['id_cliente'], row['id_sesion'], row['fecha_registro'])
@@ -0,0 +1,62 @@
+from abc import ABC
+from contextlib import contextmanager
+from contextvars import ContextVar
+import weakref
+
+# Mapa de identidad: dentro de un ámbito cada fila (clase, id) se representa
+# con un único objeto Python. Las referencias son débiles, así que un objeto
+# sale del mapa en cuanto nadie más lo usa.
+
+_mapa_actual = ContextVar("mapa_identidad", default=None)
+
+
+@contextmanager
+def mapa_identidad():
+    """Abrir un ámbito de identidad (o unirse al que ya está abierto)"""
+    mapa = _mapa_actual.get()
+    if mapa is not None:
+        yield mapa
+        return
+    mapa = weakref.WeakValueDictionary()
+    token = _mapa_actual.set(mapa)
+    try:
+        yield mapa
+    finally:
+        _mapa_actual.reset(token)
+
+
+# Bases compartidas por varias jerarquías: no cuentan como raíz
+_BASES_GENERICAS = {object, ABC}
+
+
+def base_generica(clase):
+    """Decorador para bases comunes (p. ej. ConCambios) que no definen una jerarquía propia"""
+    _BASES_GENERICAS.add(clase)
+    return clase
+
+
+def _clase_raiz(clase):
+    """Clase base de la jerarquía (Usuario, Ejercicio, ...), usada como parte de la clave"""
+    return [c for c in clase.__mro__ if c not in _BASES_GENERICAS][-1]
+
+
+def obtener(clase, id_objeto):
+    """Retornar el objeto ya cargado para (clase, id) o None"""
+    mapa = _mapa_actual.get()
+    if mapa is None or id_objeto is None:
+        return None
+    objeto = mapa.get((_clase_raiz(clase), id_objeto))
+    return objeto if isinstance(objeto, clase) else None
+
+
+def registrar(objeto, id_objeto):
+    """Registrar un objeto recién cargado; si ya existe uno para esa fila se retorna el existente"""
+    mapa = _mapa_actual.get()
+    if mapa is None or id_objeto is None:
+        return objeto
+    clave = (_clase_raiz(type(objeto)), id_objeto)
+    existente = mapa.get(clave)
+    if existente is not None and isinstance(existente, type(objeto)):
+        return existente
+    mapa[clave] = objeto
+    return objeto
@@ -0,0 +1,199 @@
+from collections import Counter, deque, namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Instrumentación de consultas: dentro de `with accion("nombre"):` cada
+# ejecución de cursor del data layer queda registrada (huella del SQL,
+# cantidad de parámetros, tiempo y filas), junto con las conexiones que se
+# abren. Al cerrar la acción se reporta un resumen y se marcan como N+1 las
+# huellas que se repiten demasiadas veces.
+
+INSTRUMENTACION_ACTIVA = os.getenv("DB_INSTRUMENTACION", "0") == "1"
+UMBRAL_N_MAS_1 = int(os.getenv("DB_UMBRAL_N_MAS_1", 5))  # repeticiones de una misma huella
+
+Consulta = namedtuple("Consulta", "huella parametros segundos filas")
+
+_accion_actual = ContextVar("accion_actual", default=None)
+historial = deque(maxlen=50)  # últimas acciones terminadas
+_abiertas_lock = threading.Lock()
+reportar = print  # se puede reemplazar (p. ej. por logging) para redirigir los reportes
+
+_RE_CADENAS = re.compile(r"'(?:[^'\\]|\\.)*'")
+_RE_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=512)
+def huella(sql):
+    """Normalizar el SQL para agrupar consultas iguales que solo cambian en valores"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    sql = _RE_CADENAS.sub("?", sql)
+    sql = _RE_NUMEROS.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _RE_LISTAS.sub("(...)", sql)
+    return _RE_ESPACIOS.sub(" ", sql).strip()
+
+
+class Accion:
+    """Consultas y conexiones de una acción lógica (p. ej. un comando del menú)"""
+    def __init__(self, nombre, padre=None):
+        self.nombre = nombre
+        self.padre = padre
+        self.consultas = []
+        self.conexiones = 0
+        self.espera_conexion = 0.0
+        self.inicio = time.perf_counter()
+        self.duracion = None
+        self._abiertas = 1  # el propio bloque más las hijas que siguen corriendo
+
+    def registrar(self, consulta):
+        accion = self
+        while accion is not None:
+            accion.consultas.append(consulta)
+            accion = accion.padre
+
+    def registrar_conexion(self, espera):
+        accion = self
+        while accion is not None:
+            accion.conexiones += 1
+            accion.espera_conexion += espera
+            accion = accion.padre
+
+    @property
+    def tiempo_sql(self):
+        return sum(c.segundos for c in self.consultas)
+
+    def n_mas_1(self, umbral=None):
+        """Huellas repetidas al menos `umbral` veces: {huella: repeticiones}"""
+        umbral = UMBRAL_N_MAS_1 if umbral is None else umbral
+        conteo = Counter(c.huella for c in self.consultas)
+        return {h: n for h, n in conteo.most_common() if n >= umbral}
+
+    def resumen(self):
+        duracion = self.duracion if self.duracion is not None else time.perf_counter() - self.inicio
+        lineas = [
+            f"[{self.nombre}] {len(self.consultas)} consultas, {self.conexiones} conexiones, "
+            f"SQL {self.tiempo_sql * 1000:.1f} ms de {duracion * 1000:.1f} ms"
+        ]
+        for h, n in self.n_mas_1().items():
+            lineas.append(f"  posible N+1 ({n} veces): {h[:120]}")
+        return "\n".join(lineas)
+
+
+@contextmanager
+def accion(nombre, padre=None):
+    """Agrupar las consultas ejecutadas dentro del bloque bajo una acción.
+
+    `padre` permite colgarla de una acción de otro hilo (por defecto, la del contexto actual).
+    """
+    padre = padre or _accion_actual.get()
+    if padre is not None:
+        retener(padre)
+    actual = Accion(nombre, padre)
+    token = _accion_actual.set(actual)
+    try:
+        yield actual
+    finally:
+        _accion_actual.reset(token)
+        soltar(actual)
+
+
+def retener(actual):
+    """Mantener abierta una acción mientras sigue trabajo suyo en otro hilo (cerrar con soltar)"""
+    with _abiertas_lock:
+        actual._abiertas += 1
+
+
+def soltar(actual):
+    """Cerrar una parte de la acción; al cerrarse la última se mide y, si es raíz, se reporta"""
+    while actual is not None:
+        with _abiertas_lock:
+            actual._abiertas -= 1
+            if actual._abiertas > 0:
+                return
+        actual.duracion = time.perf_counter() - actual.inicio
+        if actual.padre is None:
+            historial.append(actual)
+            if INSTRUMENTACION_ACTIVA:
+                reportar(actual.resumen())
+            return
+        actual = actual.padre
+
+
+def instrumentar(funcion):
+    """Decorador para comandos: los registra como acción si la instrumentación está activa"""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not INSTRUMENTACION_ACTIVA:
+            return funcion(*args, **kwargs)
+        with accion(funcion.__name__):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+
+def accion_actual():
+    """Acción en curso en este contexto, o None"""
+    return _accion_actual.get()
+
+
+def conexion_abierta(espera):
+    """Avisar que se tomó una conexión del pool (espera en segundos)"""
+    actual = _accion_actual.get()
+    if actual is not None:
+        actual.registrar_conexion(espera)
+
+
+def registrar_lectura(actual, sql, params, segundos, filas):
+    """Registrar en `actual` una lectura medida a mano (p. ej. con cursor sin buffer, cuyo rowcount es -1)"""
+    if actual is not None:
+        actual.registrar(Consulta(huella(sql), len(params) if params else 0, segundos, filas))
+
+
+def envolver(cursor):
+    """Retornar el cursor instrumentado si hay una acción en curso"""
+    actual = _accion_actual.get()
+    return cursor if actual is None else _CursorInstrumentado(cursor, actual)
+
+
+class _CursorInstrumentado:
+    """Proxy de cursor que mide cada execute/executemany"""
+    def __init__(self, cursor, accion_actual):
+        self._cursor = cursor
+        self._accion = accion_actual
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            self._accion.registrar(Consulta(
+                huella(sql), len(params) if params else 0,
+                time.perf_counter() - inicio, self._cursor.rowcount
+            ))
+
+    def executemany(self, sql, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_params, *args, **kwargs)
+        finally:
+            self._accion.registrar(Consulta(
+                huella(sql), sum(len(p) for p in seq_params),
+                time.perf_counter() - inicio, self._cursor.rowcount
+            ))
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
@@ -0,0 +1,217 @@
+"""Migraciones versionadas del esquema.
+
+Cada migración tiene un número de versión y un paso `subir` idempotente
+(revisa information_schema antes de tocar nada). Las versiones aplicadas se
+registran en la tabla schema_migraciones.
+
+Uso (desde Proyecto/):
+    python migraciones.py            # aplicar las pendientes
+    python migraciones.py --estado   # ver qué versiones están aplicadas
+    python migraciones.py --revertir 1
+"""
+import argparse
+
+from db_connection import transaccion, lectura
+
+TABLA_VERSIONES = """
+    CREATE TABLE IF NOT EXISTS schema_migraciones (
+        version INT PRIMARY KEY,
+        descripcion VARCHAR(200) NOT NULL,
+        aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE = InnoDB
+"""
+
+ESPERA_BLOQUEO = 30  # segundos esperando a otro proceso que esté migrando
+
+
+def indice_existe(cursor, tabla, indice):
+    """Indica si `tabla` ya tiene un índice con ese nombre"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (tabla, indice))
+    return cursor.fetchone()[0] > 0
+
+
+def crear_indice(cursor, tabla, indice, columnas):
+    """CREATE INDEX solo si todavía no existe"""
+    if not indice_existe(cursor, tabla, indice):
+        cursor.execute(f"CREATE INDEX {indice} ON {tabla} ({', '.join(columnas)})")
+
+
+def eliminar_indice(cursor, tabla, indice):
+    """DROP INDEX solo si existe"""
+    if indice_existe(cursor, tabla, indice):
+        cursor.execute(f"DROP INDEX {indice} ON {tabla}")
+
+
+# --- Versión 1: índices para los accesos más frecuentes ---
+
+INDICES_V1 = [
+    # WHERE id_cliente = ? ORDER BY fecha_hora DESC (se recorre el índice hacia atrás)
+    ("sesion_entrenamiento", "idx_sesion_cliente_fecha", ("id_cliente", "fecha_hora")),
+    # WHERE id_entrenador = ? ORDER BY fecha_hora DESC
+    ("sesion_entrenamiento", "idx_sesion_entrenador_fecha", ("id_entrenador", "fecha_hora")),
+    # WHERE id_cliente = ? ORDER BY fecha_registro DESC
+    ("historial_sesiones", "idx_historial_cliente_fecha", ("id_cliente", "fecha_registro")),
+    # WHERE nombre = ?
+    ("ejercicio", "idx_ejercicio_nombre", ("nombre",)),
+    # ORDER BY nombre (objetivo es TEXT y no puede ir en el índice)
+    ("plan_entrenamiento", "idx_plan_nombre", ("nombre",)),
+    # ORDER BY nombre; cubre id_usuario, nombre, email y tipo sin ir a la tabla
+    ("usuario", "idx_usuario_nombre", ("nombre", "email", "tipo")),
+]
+
+
+# Los índices compuestos que empiezan por id_cliente / id_entrenador también sirven
+# a las claves foráneas, e InnoDB descarta el índice implícito de la FK al crearlos.
+# Al bajar hay que dejar antes un índice simple para cada FK; si no, el DROP INDEX
+# falla con el error 1553 ("needed in a foreign key constraint").
+INDICES_FK_V1 = [
+    ("sesion_entrenamiento", "idx_fk_sesion_cliente", ("id_cliente",)),
+    ("sesion_entrenamiento", "idx_fk_sesion_entrenador", ("id_entrenador",)),
+    ("historial_sesiones", "idx_fk_historial_cliente", ("id_cliente",)),
+]
+
+
+def _subir_v1(cursor):
+    for tabla, indice, columnas in INDICES_V1:
+        crear_indice(cursor, tabla, indice, columnas)
+    # Los simples que dejó una reversión anterior ya están cubiertos por los compuestos
+    for tabla, indice, _ in INDICES_FK_V1:
+        eliminar_indice(cursor, tabla, indice)
+
+
+def _bajar_v1(cursor):
+    for tabla, indice, columnas in INDICES_FK_V1:
+        crear_indice(cursor, tabla, indice, columnas)
+    for tabla, indice, _ in INDICES_V1:
+        eliminar_indice(cursor, tabla, indice)
+
+
+# --- Versión 2: paginación por keyset de los listados completos ---
+
+INDICES_V2 = [
+    # ORDER BY fecha_hora DESC, id_sesion DESC (InnoDB agrega la clave primaria al índice)
+    ("sesion_entrenamiento", "idx_sesion_fecha", ("fecha_hora",)),
+    # ORDER BY fecha_registro DESC, id_historial DESC
+    ("historial_sesiones", "idx_historial_fecha", ("fecha_registro",)),
+]
+
+
+def _subir_v2(cursor):
+    for tabla, indice, columnas in INDICES_V2:
+        crear_indice(cursor, tabla, indice, columnas)
+
+
+def _bajar_v2(cursor):
+    for tabla, indice, _ in INDICES_V2:
+        eliminar_indice(cursor, tabla, indice)
+
+
+# --- Versión 3: recorridos por estado para el planificador ---
+
+INDICES_V3 = [
+    # WHERE estado = ? AND fecha_hora < ? ORDER BY fecha_hora LIMIT n (rango del índice)
+    ("sesion_entrenamiento", "idx_sesion_estado_fecha", ("estado", "fecha_hora")),
+]
+
+
+def _subir_v3(cursor):
+    for tabla, indice, columnas in INDICES_V3:
+        crear_indice(cursor, tabla, indice, columnas)
+
+
+def _bajar_v3(cursor):
+    for tabla, indice, _ in INDICES_V3:
+        eliminar_indice(cursor, tabla, indice)
+
+
+MIGRACIONES = [
+    # (versión, descripción, subir, bajar)
+    (1, "Indices para sesiones, historial y listados por nombre", _subir_v1, _bajar_v1),
+    (2, "Indices por fecha para paginar sesiones e historial", _subir_v2, _bajar_v2),
+    (3, "Indice por estado y fecha para el planificador de sesiones", _subir_v3, _bajar_v3),
+]
+
+
+def _versiones_aplicadas(cursor):
+    cursor.execute(TABLA_VERSIONES)
+    cursor.execute("SELECT version FROM schema_migraciones")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _con_bloqueo(funcion):
+    """Ejecutar `funcion(cursor)` con un bloqueo con nombre para no migrar en paralelo"""
+    with transaccion() as cursor:
+        cursor.execute("SELECT GET_LOCK('schema_migraciones', %s)", (ESPERA_BLOQUEO,))
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Otro proceso está aplicando migraciones")
+        try:
+            return funcion(cursor)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('schema_migraciones')")
+            cursor.fetchall()
+
+
+def aplicar():
+    """Aplicar las migraciones pendientes en orden; retorna las versiones aplicadas"""
+    def pendientes(cursor):
+        aplicadas = _versiones_aplicadas(cursor)
+        nuevas = []
+        for version, descripcion, subir, _ in MIGRACIONES:
+            if version in aplicadas:
+                continue
+            # El DDL hace commit implícito; como los pasos son idempotentes,
+            # si algo falla a mitad basta con volver a ejecutar
+            subir(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migraciones (version, descripcion) VALUES (%s, %s)",
+                (version, descripcion)
+            )
+            nuevas.append(version)
+        return nuevas
+    return _con_bloqueo(pendientes)
+
+
+def revertir(version):
+    """Deshacer una versión aplicada"""
+    def deshacer(cursor):
+        for numero, _, _, bajar in MIGRACIONES:
+            if numero == version:
+                bajar(cursor)
+                cursor.execute("DELETE FROM schema_migraciones WHERE version = %s", (version,))
+                return
+        raise ValueError(f"No existe la migración {version}")
+    _con_bloqueo(deshacer)
+
+
+def estado():
+    """Lista de (versión, descripción, fecha de aplicación o None)"""
+    with transaccion() as cursor:
+        cursor.execute(TABLA_VERSIONES)
+    with lectura() as cursor:
+        cursor.execute("SELECT version, aplicada_en FROM schema_migraciones")
+        aplicadas = {row['version']: row['aplicada_en'] for row in cursor.fetchall()}
+    return [(version, descripcion, aplicadas.get(version)) for version, descripcion, _, _ in MIGRACIONES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migraciones del esquema")
+    parser.add_argument("--estado", action="store_true", help="mostrar versiones aplicadas")
+    parser.add_argument("--revertir", type=int, metavar="VERSION", help="deshacer una versión")
+    args = parser.parse_args()
+
+    if args.estado:
+        for version, descripcion, fecha in estado():
+            print(f"{version:>4}  {'aplicada ' + str(fecha) if fecha else 'pendiente':30}  {descripcion}")
+    elif args.revertir is not None:
+        revertir(args.revertir)
+        print(f"Versión {args.revertir} revertida")
+    else:
+        nuevas = aplicar()
+        print(f"Migraciones aplicadas: {nuevas}" if nuevas else "El esquema ya está al día")
+
+
+if __name__ == "__main__":
+    main()
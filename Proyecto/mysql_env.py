@@ -1,5 +1,9 @@
 from db_connection import create_connection, close_connection
+from migraciones import aplicar as aplicar_migraciones
 from datetime import datetime, timedelta
+import itertools
+import os
+import tempfile
 
 def create_tables(conn):
      # --- Crear tabla usuario ---
@@ -224,52 +228,201 @@ def insert_historial_entrenamiento(conn, id_cliente, id_sesion):
     print(f"Historial actualizado")
     cursor.close()
 
+def _ultimo_id(conn):
+    """Id AUTO_INCREMENT generado por el último INSERT de la conexión"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT LAST_INSERT_ID()")
+    ultimo = cursor.fetchone()[0]
+    cursor.close()
+    return ultimo
+
+
+# --- Carga masiva ---
+# Los insert_* de arriba hacen un commit y un print por fila; para volúmenes
+# grandes se usan estas funciones: executemany (o LOAD DATA LOCAL INFILE)
+# por lotes, un commit por lote y sin salida por fila.
+
+LOTE_CARGA = 5000
+
+
+def _lotes(filas, lote):
+    """Partir un iterable en listas de hasta `lote` elementos"""
+    filas = iter(filas)
+    while True:
+        bloque = list(itertools.islice(filas, lote))
+        if not bloque:
+            return
+        yield bloque
+
+
+def _valor_tsv(valor):
+    """Valor en el formato por defecto de LOAD DATA (tabuladores, escapes con \\)"""
+    if valor is None:
+        return "\\N"
+    texto = str(valor)
+    return (texto.replace("\\", "\\\\").replace("\t", "\\t")
+                 .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _cargar_bloque(cursor, tabla, columnas, bloque, infile):
+    """Insertar un bloque de filas con executemany o con LOAD DATA LOCAL INFILE"""
+    if not infile:
+        marcadores = ", ".join(["%s"] * len(columnas))
+        cursor.executemany(
+            f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({marcadores})", bloque
+        )
+        return
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", newline="", delete=False) as archivo:
+        for fila in bloque:
+            archivo.write("\t".join(_valor_tsv(v) for v in fila))
+            archivo.write("\n")
+    try:
+        cursor.execute(
+            f"""LOAD DATA LOCAL INFILE %s INTO TABLE {tabla}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(columnas)})""",
+            (archivo.name,)
+        )
+    finally:
+        os.remove(archivo.name)
+
+
+def insertar_lote(conn, tabla, columnas, filas, lote=LOTE_CARGA, infile=False):
+    """Insertar muchas filas en `tabla` con un commit por lote; retorna cuántas se insertaron.
+
+    Con infile=True cada lote se escribe a un archivo temporal y se carga con
+    LOAD DATA LOCAL INFILE (la conexión debe crearse con allow_local_infile=True).
+    """
+    total = 0
+    cursor = conn.cursor()
+    try:
+        for bloque in _lotes(filas, lote):
+            _cargar_bloque(cursor, tabla, columnas, bloque, infile)
+            conn.commit()
+            total += len(bloque)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return total
+
+
+def _insertar_con_subtipo(conn, tabla, columna_id, columnas, subtipos, filas, lote, infile):
+    """Insertar filas padre e hija asignando los ids por lote.
+
+    `filas` trae (valores_padre, tabla_hija, valores_hija). El máximo id se lee
+    con FOR UPDATE para que nadie inserte en el rango mientras dura el lote.
+    """
+    ids = []
+    cursor = conn.cursor()
+    try:
+        for bloque in _lotes(filas, lote):
+            cursor.execute(f"SELECT COALESCE(MAX({columna_id}), 0) FROM {tabla} FOR UPDATE")
+            siguiente = cursor.fetchone()[0] + 1
+            padres = []
+            hijas = {tabla_hija: [] for tabla_hija in subtipos}
+            for nuevo_id, (valores, tabla_hija, valores_hija) in enumerate(bloque, start=siguiente):
+                padres.append((nuevo_id, *valores))
+                hijas[tabla_hija].append((nuevo_id, *valores_hija))
+                ids.append(nuevo_id)
+            _cargar_bloque(cursor, tabla, (columna_id, *columnas), padres, infile)
+            for tabla_hija, filas_hija in hijas.items():
+                if filas_hija:
+                    _cargar_bloque(cursor, tabla_hija, subtipos[tabla_hija], filas_hija, infile)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return ids
+
+
+def insertar_clientes_lote(conn, filas, lote=LOTE_CARGA, infile=False):
+    """filas: (nombre, email, nivel_fitness). Retorna los ids asignados"""
+    return _insertar_con_subtipo(
+        conn, "usuario", "id_usuario", ("nombre", "email", "tipo"),
+        {"cliente": ("id_usuario", "nivel_fitness")},
+        (((nombre, email, "CLIENTE"), "cliente", (nivel,)) for nombre, email, nivel in filas),
+        lote, infile,
+    )
+
+
+def insertar_entrenadores_lote(conn, filas, lote=LOTE_CARGA, infile=False):
+    """filas: (nombre, email, especialidad, anos_experiencia). Retorna los ids asignados"""
+    return _insertar_con_subtipo(
+        conn, "usuario", "id_usuario", ("nombre", "email", "tipo"),
+        {"entrenador": ("id_usuario", "especialidad", "anos_experiencia")},
+        (((nombre, email, "ENTRENADOR"), "entrenador", (especialidad, anos))
+         for nombre, email, especialidad, anos in filas),
+        lote, infile,
+    )
+
+
+def insertar_ejercicios_lote(conn, filas, lote=LOTE_CARGA, infile=False):
+    """filas: (nombre, descripcion, 'FUERZA', (repeticiones, series, peso_kg))
+    o (nombre, descripcion, 'CARDIO', (duracion_minutos, tipo_cardio, nivel_resistencia, ritmo_cardiaco_objetivo)).
+    Retorna los ids asignados"""
+    return _insertar_con_subtipo(
+        conn, "ejercicio", "id_ejercicio", ("nombre", "descripcion", "tipo"),
+        {
+            "ejercicio_fuerza": ("id_ejercicio", "repeticiones", "series", "peso_kg"),
+            "ejercicio_cardio": ("id_ejercicio", "duracion_minutos", "tipo_cardio",
+                                 "nivel_resistencia", "ritmo_cardiaco_objetivo"),
+        },
+        (((nombre, descripcion, tipo), "ejercicio_fuerza" if tipo == "FUERZA" else "ejercicio_cardio", datos)
+         for nombre, descripcion, tipo, datos in filas),
+        lote, infile,
+    )
+
 def main():
     # Asume que create_connection se modificará o configurará para conectar a la base de datos 'biblioteca'
     conn = create_connection()
     if conn:
         create_tables(conn)
+        # Índices y demás cambios versionados del esquema (ver migraciones.py)
+        aplicar_migraciones()
 
-        # Insertar registros en las tablas creadas
-        #TABKLA USUARIO
-        insert_usuario(conn, "Juan Perez", 'juan@gym.com', 'ENTRENADOR')
-        insert_usuario(conn, 'María García', 'maria@gym.com', 'ENTRENADOR')
-        insert_usuario(conn, 'Pedro López', 'pedro@mail.com', 'CLIENTE')
-
-        #TABLA CLIENTE
-        insert_cliente(conn, 3, 'Principiante')
-
-        #TABLA ENTRENADOR
-        insert_entrenador(conn, 1, 'Hipertrofia', 5)
-        insert_entrenador(conn, 2, 'Cardio', 3)
-
-        #TABLA EJERCICIO
-        insert_ejercicio(conn, 'Press de Banca', 'Empuje horizontal con barra', 'FUERZA')
-        insert_ejercicio(conn, 'Sentadillas', 'Ejercicio para piernas', 'FUERZA')
-        insert_ejercicio(conn, 'Cinta Correr', 'Running suave', 'CARDIO')
+        # Insertar registros en las tablas creadas (carga por lotes: un commit por tabla)
+        #TABLAS USUARIO + ENTRENADOR
+        juan, maria = insertar_entrenadores_lote(conn, [
+            ("Juan Perez", 'juan@gym.com', 'Hipertrofia', 5),
+            ('María García', 'maria@gym.com', 'Cardio', 3),
+        ])
 
-        #TABLA EJERCICIO FUERZA
-        insert_ejercicio_fuerza(conn, 1, 10, 4, 60.0)
-        insert_ejercicio_fuerza(conn, 2, 12, 3, 70.0)
+        #TABLAS USUARIO + CLIENTE
+        pedro, = insertar_clientes_lote(conn, [('Pedro López', 'pedro@mail.com', 'Principiante')])
 
-        #TABLA EJERCICIO CARDIO
-        insert_ejercicio_cardio(conn, 3, 30, 'CORRER')
+        #TABLAS EJERCICIO + EJERCICIO FUERZA / EJERCICIO CARDIO
+        press, sentadillas, cinta = insertar_ejercicios_lote(conn, [
+            ('Press de Banca', 'Empuje horizontal con barra', 'FUERZA', (10, 4, 60.0)),
+            ('Sentadillas', 'Ejercicio para piernas', 'FUERZA', (12, 3, 70.0)),
+            ('Cinta Correr', 'Running suave', 'CARDIO', (30, 'CORRER', 1, 120)),
+        ])
 
         #TABLA PLAN ENTRENAMIENTO
-        insert_plan_entrenamiento(conn, 'Volumen Extremo', 'Ganancia muscular máxima', 1)
-        insert_plan_entrenamiento(conn, 'Cardio Intenso', 'Mejora cardiovascular', 2)
+        insert_plan_entrenamiento(conn, 'Volumen Extremo', 'Ganancia muscular máxima', juan)
+        volumen = _ultimo_id(conn)
+        insert_plan_entrenamiento(conn, 'Cardio Intenso', 'Mejora cardiovascular', maria)
+        cardio = _ultimo_id(conn)
 
         #TABLA EJERCICIO A PLAN
-        insert_ejercicio_in_plan(conn, 1, 1, 1)
-        insert_ejercicio_in_plan(conn, 1, 2, 2)
-        insert_ejercicio_in_plan(conn, 2, 3, 1)
+        insertar_lote(conn, "plan_ejercicio", ("id_plan", "id_ejercicio", "orden"), [
+            (volumen, press, 1),
+            (volumen, sentadillas, 2),
+            (cardio, cinta, 1),
+        ])
 
         #TABLA SESION DE ENTRENAMIENTO
-        insert_sesion_entrenamiento(conn, datetime.now() + timedelta(days=1), 3, 1, 1, 'PROGRAMADA', 0)
-        insert_sesion_entrenamiento(conn, datetime.now() - timedelta(days=1), 3, 1, 1, 'FINALIZADA', 4)
+        insert_sesion_entrenamiento(conn, datetime.now() + timedelta(days=1), pedro, juan, volumen, 'PROGRAMADA', 0)
+        insert_sesion_entrenamiento(conn, datetime.now() - timedelta(days=1), pedro, juan, volumen, 'FINALIZADA', 4)
+        finalizada = _ultimo_id(conn)
 
         #TABLA HISTORIAL SESIONES
-        insert_historial_entrenamiento(conn, 3, 2)
+        insert_historial_entrenamiento(conn, pedro, finalizada)
 
         print("REGISTROS REALIZADOS")
         close_connection(conn)
@@ -0,0 +1,58 @@
+import base64
+from datetime import datetime
+import json
+
+# Paginación por keyset: en lugar de OFFSET, cada página empieza después de
+# la última fila de la anterior según (fecha, id). Así el costo de una página
+# no depende de cuántas filas haya antes. El cursor es opaco para quien llama.
+
+TAMANO_PAGINA = 50
+
+
+def codificar_cursor(fecha, id_fila):
+    """Cursor opaco a partir de la clave (fecha, id) de la última fila"""
+    datos = json.dumps([fecha.isoformat(), id_fila]).encode("utf-8")
+    return base64.urlsafe_b64encode(datos).decode("ascii")
+
+
+def decodificar_cursor(cursor):
+    """Clave (fecha, id) guardada en un cursor"""
+    try:
+        fecha, id_fila = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(fecha), int(id_fila)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def condicion_despues_de(columna_fecha, columna_id, cursor):
+    """Condición SQL y parámetros para seguir después del cursor (orden descendente)"""
+    fecha, id_fila = decodificar_cursor(cursor)
+    return (
+        f"({columna_fecha} < %s OR ({columna_fecha} = %s AND {columna_id} < %s))",
+        (fecha, fecha, id_fila),
+    )
+
+
+class Pagina:
+    """Una página de resultados y el cursor para pedir la siguiente (None si es la última)"""
+    def __init__(self, elementos, siguiente=None):
+        self.elementos = elementos
+        self.siguiente = siguiente
+
+    @property
+    def hay_mas(self):
+        return self.siguiente is not None
+
+    @classmethod
+    def desde_filas(cls, elementos, tamano, clave):
+        """Armar la página con `tamano + 1` elementos leídos; `clave(e)` da (fecha, id)"""
+        if len(elementos) <= tamano:
+            return cls(elementos)
+        elementos = elementos[:tamano]
+        return cls(elementos, codificar_cursor(*clave(elementos[-1])))
+
+    def __iter__(self):
+        return iter(self.elementos)
+
+    def __len__(self):
+        return len(self.elementos)
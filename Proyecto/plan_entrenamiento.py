@@ -1,6 +1,20 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
+import db_async
+import identidad
+from cache import cacheado, invalidar
+from relaciones import Coleccion, agrupar
+from cambios import Columna, ConCambios
+
+class PlanEntrenamiento(ConCambios):
+    nombre = Columna("plan_entrenamiento")
+    objetivo = Columna("plan_entrenamiento")
+    _claves_tabla = {"plan_entrenamiento": "id_plan"}
+    _atributo_id = "id_plan"
+    _espacios_cache = ("planes",)
+
+    # Los ejercicios se cargan al primer acceso si el plan se obtuvo con perezoso=True
+    ejercicios = Coleccion(lambda planes: PlanEntrenamiento.cargar_ejercicios_lote(planes))
 
-class PlanEntrenamiento:
     def __init__(self, id_plan, nombre, objetivo, id_entrenador):
         self.id_plan = id_plan
         self.nombre = nombre
@@ -11,29 +25,22 @@ class PlanEntrenamiento:
     @classmethod
     def crear(cls, nombre, objetivo, id_entrenador):
         """Crear un nuevo plan de entrenamiento"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "INSERT INTO plan_entrenamiento (nombre, objetivo, id_entrenador) VALUES (%s, %s, %s)",
                 (nombre, objetivo, id_entrenador)
             )
             plan_id = cursor.lastrowid
-            conn.commit()
-            return cls(plan_id, nombre, objetivo, id_entrenador)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        invalidar("planes")
+        return identidad.registrar(cls(plan_id, nombre, objetivo, id_entrenador), plan_id)
 
     @classmethod
-    def buscar_por_id(cls, id_plan):
+    def buscar_por_id(cls, id_plan, perezoso=False):
         """Buscar plan por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        existente = identidad.obtener(cls, id_plan)
+        if existente is not None:
+            return existente
+        with lectura() as cursor:
             cursor.execute(
                 "SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento WHERE id_plan = %s",
                 (id_plan,)
@@ -41,82 +48,184 @@ class PlanEntrenamiento:
             row = cursor.fetchone()
             if not row:
                 return None
-            
-            plan = cls(row['id_plan'], row['nombre'], row['objetivo'], row['id_entrenador'])
-            plan.cargar_ejercicios()
+        
+            plan = cls._desde_fila(row, perezoso)
+            if not perezoso:
+                plan.cargar_ejercicios()
             return plan
-        finally:
-            cursor.close()
-            conn.close()
 
     @classmethod
-    def buscar_por_entrenador(cls, id_entrenador):
+    def buscar_por_ids(cls, ids, perezoso=False):
+        """Buscar varios planes en una sola consulta; retorna un dict {id: plan}"""
+        planes = {}
+        pendientes = []
+        for id_plan in dict.fromkeys(ids):
+            existente = identidad.obtener(cls, id_plan)
+            if existente is not None:
+                planes[id_plan] = existente
+            else:
+                pendientes.append(id_plan)
+        if not pendientes:
+            return planes
+        marcadores = ", ".join(["%s"] * len(pendientes))
+        with lectura() as cursor:
+            cursor.execute(
+                f"SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento WHERE id_plan IN ({marcadores})",
+                tuple(pendientes)
+            )
+            nuevos = [cls._desde_fila(row, perezoso) for row in cursor.fetchall()]
+            cls._completar(nuevos, perezoso)
+        planes.update((plan.id_plan, plan) for plan in nuevos)
+        return planes
+
+    @classmethod
+    @cacheado("planes")
+    def buscar_por_entrenador(cls, id_entrenador, perezoso=False):
         """Buscar planes por entrenador"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute(
                 "SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento WHERE id_entrenador = %s",
                 (id_entrenador,)
             )
             rows = cursor.fetchall()
-            planes = []
-            for row in rows:
-                plan = cls(row['id_plan'], row['nombre'], row['objetivo'], row['id_entrenador'])
-                plan.cargar_ejercicios()
-                planes.append(plan)
-            return planes
-        finally:
-            cursor.close()
-            conn.close()
+            planes = [cls._desde_fila(row, perezoso) for row in rows]
+            return cls._completar(planes, perezoso)
 
     @classmethod
-    def listar_todos(cls):
+    @cacheado("planes")
+    def listar_todos(cls, perezoso=False):
         """Listar todos los planes"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento ORDER BY nombre")
             rows = cursor.fetchall()
-            planes = []
-            for row in rows:
-                plan = cls(row['id_plan'], row['nombre'], row['objetivo'], row['id_entrenador'])
-                plan.cargar_ejercicios()
-                planes.append(plan)
-            return planes
-        finally:
-            cursor.close()
-            conn.close()
+            planes = [cls._desde_fila(row, perezoso) for row in rows]
+            return cls._completar(planes, perezoso)
+
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los planes de a lotes (memoria constante).
+
+        Los ejercicios se cargan al primer acceso, con una consulta por lote.
+        """
+        for rows in leer_en_lotes(
+            "SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento ORDER BY nombre", lote=lote
+        ):
+            yield from cls._completar([cls._desde_fila(row, perezoso=True) for row in rows], perezoso=True)
+
+    @classmethod
+    async def abuscar_por_ids(cls, ids):
+        """Buscar varios planes, con sus ejercicios, en una sola consulta (async); retorna un dict {id: plan}"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        marcadores = ", ".join(["%s"] * len(ids))
+        rows = await db_async.consultar(
+            f"SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento WHERE id_plan IN ({marcadores})",
+            tuple(ids)
+        )
+        planes = [cls._desde_fila(row) for row in rows]
+        await cls.acargar_ejercicios_lote(planes)
+        return {plan.id_plan: plan for plan in planes}
+
+    @classmethod
+    async def abuscar_por_entrenador(cls, id_entrenador):
+        """Buscar planes por entrenador, con sus ejercicios (async)"""
+        rows = await db_async.consultar(
+            "SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento WHERE id_entrenador = %s",
+            (id_entrenador,)
+        )
+        planes = [cls._desde_fila(row) for row in rows]
+        await cls.acargar_ejercicios_lote(planes)
+        return planes
+
+    @classmethod
+    async def alistar_todos(cls):
+        """Listar todos los planes, con sus ejercicios (async)"""
+        rows = await db_async.consultar(
+            "SELECT id_plan, nombre, objetivo, id_entrenador FROM plan_entrenamiento ORDER BY nombre"
+        )
+        planes = [cls._desde_fila(row) for row in rows]
+        await cls.acargar_ejercicios_lote(planes)
+        return planes
+
+    @classmethod
+    def _desde_fila(cls, row, perezoso=False):
+        """Construir (o reutilizar del mapa de identidad) un plan a partir de una fila"""
+        plan = cls(row['id_plan'], row['nombre'], row['objetivo'], row['id_entrenador'])
+        if perezoso:
+            PlanEntrenamiento.ejercicios.descargar(plan)
+        return identidad.registrar(plan, row['id_plan'])
+
+    @classmethod
+    def _completar(cls, planes, perezoso):
+        """Cargar ya los ejercicios o dejarlos para el primer acceso (en lote)"""
+        if perezoso:
+            return agrupar(planes)
+        cls.cargar_ejercicios_lote(planes)
+        return planes
 
     def cargar_ejercicios(self):
         """Cargar ejercicios del plan"""
+        PlanEntrenamiento.cargar_ejercicios_lote([self])
+
+    @classmethod
+    def cargar_ejercicios_lote(cls, planes):
+        """Cargar los ejercicios de varios planes con una sola consulta"""
+        planes_por_id = {}
+        for plan in planes:
+            plan.ejercicios = []
+            planes_por_id.setdefault(plan.id_plan, []).append(plan)
+        if not planes_por_id:
+            return
+        
+        with lectura() as cursor:
+            cursor.execute(cls._sql_ejercicios(len(planes_por_id)), tuple(planes_por_id))
+            cls._repartir_ejercicios(planes_por_id, cursor.fetchall())
+
+    @classmethod
+    async def acargar_ejercicios_lote(cls, planes):
+        """Como cargar_ejercicios_lote (async)"""
+        planes_por_id = {}
+        for plan in planes:
+            plan.ejercicios = []
+            planes_por_id.setdefault(plan.id_plan, []).append(plan)
+        if not planes_por_id:
+            return
+        rows = await db_async.consultar(cls._sql_ejercicios(len(planes_por_id)), tuple(planes_por_id))
+        cls._repartir_ejercicios(planes_por_id, rows)
+
+    @staticmethod
+    def _sql_ejercicios(cantidad):
+        """Consulta de los ejercicios (con sus subtipos) de `cantidad` planes, en orden"""
+        from ejercicio import COLUMNAS_EJERCICIO, JOIN_SUBTIPOS
+        marcadores = ", ".join(["%s"] * cantidad)
+        return f"""
+            SELECT pe.id_plan, {COLUMNAS_EJERCICIO}
+            FROM plan_ejercicio pe
+            JOIN ejercicio e ON e.id_ejercicio = pe.id_ejercicio
+            {JOIN_SUBTIPOS}
+            WHERE pe.id_plan IN ({marcadores})
+            ORDER BY pe.id_plan, pe.orden
+        """
+
+    @staticmethod
+    def _repartir_ejercicios(planes_por_id, rows):
+        """Agregar a cada plan sus ejercicios; un ejercicio compartido se construye una vez"""
         from ejercicio import Ejercicio
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT pe.id_ejercicio, pe.orden 
-                FROM plan_ejercicio pe 
-                WHERE pe.id_plan = %s 
-                ORDER BY pe.orden
-            """, (self.id_plan,))
-            rows = cursor.fetchall()
-            
-            self.ejercicios = []
-            for row in rows:
-                ejercicio = Ejercicio.buscar_por_id(row['id_ejercicio'])
-                if ejercicio:
-                    self.ejercicios.append(ejercicio)
-        finally:
-            cursor.close()
-            conn.close()
+        ejercicios = {}
+        for row in rows:
+            ejercicio = ejercicios.get(row['id_ejercicio'])
+            if ejercicio is None:
+                ejercicio = Ejercicio._desde_fila(row)
+                if ejercicio is None:
+                    continue
+                ejercicios[ejercicio.id] = ejercicio
+            for plan in planes_por_id[row['id_plan']]:
+                plan.ejercicios.append(ejercicio)
 
     def agregar_ejercicio(self, ejercicio, orden=None):
         """Agregar ejercicio al plan"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
-            
+        with transaccion() as cursor:
             # Obtener el siguiente orden si no se especifica
             if orden is None:
                 cursor.execute("SELECT COALESCE(MAX(orden), 0) + 1 FROM plan_ejercicio WHERE id_plan = %s", 
@@ -127,67 +236,82 @@ class PlanEntrenamiento:
                 "INSERT INTO plan_ejercicio (id_plan, id_ejercicio, orden) VALUES (%s, %s, %s)",
                 (self.id_plan, ejercicio.id, orden)
             )
-            conn.commit()
-            self.ejercicios.append(ejercicio)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        self.ejercicios.append(ejercicio)
+        invalidar("planes")
 
     def eliminar_ejercicio(self, ejercicio):
         """Eliminar ejercicio del plan"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "DELETE FROM plan_ejercicio WHERE id_plan = %s AND id_ejercicio = %s",
                 (self.id_plan, ejercicio.id)
             )
-            conn.commit()
-            self.ejercicios = [e for e in self.ejercicios if e.id != ejercicio.id]
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        self.ejercicios = [e for e in self.ejercicios if e.id != ejercicio.id]
+        invalidar("planes")
+
+    def sincronizar_ejercicios(self, ejercicios):
+        """Dejar el plan con exactamente estos ejercicios, en este orden (orden 1..n).
+
+        Compara con plan_ejercicio y aplica solo las diferencias, con una sentencia
+        por tipo (DELETE, UPDATE de orden, INSERT) en una sola transacción.
+        Retorna cuántos ejercicios se agregaron, eliminaron y reordenaron.
+        """
+        ejercicios = list(ejercicios)
+        deseado = {ejercicio.id: orden for orden, ejercicio in enumerate(ejercicios, start=1)}
+        if len(deseado) != len(ejercicios):
+            raise ValueError("Un ejercicio no puede repetirse en el plan")
+
+        with transaccion() as cursor:
+            cursor.execute(
+                "SELECT id_ejercicio, orden FROM plan_ejercicio WHERE id_plan = %s FOR UPDATE",
+                (self.id_plan,)
+            )
+            actual = dict(cursor.fetchall())
+
+            eliminar = [id_ejercicio for id_ejercicio in actual if id_ejercicio not in deseado]
+            reordenar = [(id_ejercicio, orden) for id_ejercicio, orden in deseado.items()
+                         if id_ejercicio in actual and actual[id_ejercicio] != orden]
+            agregar = [(self.id_plan, id_ejercicio, orden) for id_ejercicio, orden in deseado.items()
+                       if id_ejercicio not in actual]
+
+            # executemany solo agrupa los INSERT; DELETE y UPDATE se arman con IN / CASE
+            if eliminar:
+                marcadores = ", ".join(["%s"] * len(eliminar))
+                cursor.execute(
+                    f"DELETE FROM plan_ejercicio WHERE id_plan = %s AND id_ejercicio IN ({marcadores})",
+                    (self.id_plan, *eliminar)
+                )
+            if reordenar:
+                casos = " ".join(["WHEN %s THEN %s"] * len(reordenar))
+                marcadores = ", ".join(["%s"] * len(reordenar))
+                cursor.execute(
+                    f"UPDATE plan_ejercicio SET orden = CASE id_ejercicio {casos} END "
+                    f"WHERE id_plan = %s AND id_ejercicio IN ({marcadores})",
+                    (*(valor for par in reordenar for valor in par), self.id_plan, *(i for i, _ in reordenar))
+                )
+            if agregar:
+                cursor.executemany(
+                    "INSERT INTO plan_ejercicio (id_plan, id_ejercicio, orden) VALUES (%s, %s, %s)",
+                    agregar
+                )
+
+        self.ejercicios = ejercicios
+        invalidar("planes")
+        return {"agregados": len(agregar), "eliminados": len(eliminar), "reordenados": len(reordenar)}
 
     def actualizar(self, nombre=None, objetivo=None):
-        """Actualizar información del plan"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
-            if nombre:
-                cursor.execute("UPDATE plan_entrenamiento SET nombre = %s WHERE id_plan = %s", 
-                             (nombre, self.id_plan))
-                self.nombre = nombre
-            if objetivo:
-                cursor.execute("UPDATE plan_entrenamiento SET objetivo = %s WHERE id_plan = %s", 
-                             (objetivo, self.id_plan))
-                self.objetivo = objetivo
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        """Actualizar información del plan (un solo UPDATE con los campos que cambian)"""
+        if nombre:
+            self.nombre = nombre
+        if objetivo:
+            self.objetivo = objetivo
+        self.guardar()
 
     def eliminar(self):
         """Eliminar plan de entrenamiento"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute("DELETE FROM plan_entrenamiento WHERE id_plan = %s", (self.id_plan,))
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        invalidar("planes")
 
     def __str__(self):
         return f"{self.nombre} - {self.objetivo} ({len(self.ejercicios)} ejercicios)"
\ No newline at end of file
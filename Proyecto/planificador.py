@@ -0,0 +1,192 @@
+"""Planificador que avanza solo las sesiones vencidas.
+
+Cada ciclo pasa a EN_CURSO las sesiones PROGRAMADA cuya hora ya llegó, y a
+FINALIZADA (con su fila en historial_sesiones) las que ya terminaron. Las
+busca por rangos del índice (estado, fecha_hora) y las procesa en lotes
+acotados, cada uno en su propia transacción.
+
+Uso (desde Proyecto/):
+    python planificador.py              # correr como proceso aparte
+    python planificador.py --una-vez    # un solo ciclo y salir
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+
+from db_connection import lectura
+import instrumentacion
+from sesion_entrenamiento import SesionEntrenamiento
+
+INTERVALO = float(os.getenv("PLANIFICADOR_INTERVALO", 60))      # segundos entre ciclos
+LOTE = int(os.getenv("PLANIFICADOR_LOTE", 500))                  # sesiones por transacción
+DURACION_SESION = int(os.getenv("PLANIFICADOR_DURACION", 60))    # minutos que dura una sesión
+
+
+class Metricas:
+    """Contadores del planificador (se leen desde otros hilos, por eso el candado)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ciclos = 0
+        self.en_curso = 0
+        self.finalizadas = 0
+        self.lotes = 0
+        self.lote_maximo = 0
+        self.ultimo_lote = 0
+        self.retraso = 0.0        # segundos desde la sesión vencida más antigua al empezar el ciclo
+        self.duracion_ciclo = 0.0
+        self.ultimo_ciclo = None
+        self.ultimo_error = None
+
+    def registrar_lote(self, estado, cantidad):
+        with self._lock:
+            self.lotes += 1
+            self.ultimo_lote = cantidad
+            self.lote_maximo = max(self.lote_maximo, cantidad)
+            if estado == "FINALIZADA":
+                self.finalizadas += cantidad
+            else:
+                self.en_curso += cantidad
+
+    def registrar_ciclo(self, retraso, duracion, error=None):
+        with self._lock:
+            self.ciclos += 1
+            self.retraso = retraso
+            self.duracion_ciclo = duracion
+            self.ultimo_ciclo = datetime.now()
+            self.ultimo_error = error
+
+    def resumen(self):
+        with self._lock:
+            return {
+                "ciclos": self.ciclos,
+                "en_curso": self.en_curso,
+                "finalizadas": self.finalizadas,
+                "lotes": self.lotes,
+                "lote_maximo": self.lote_maximo,
+                "ultimo_lote": self.ultimo_lote,
+                "retraso_segundos": self.retraso,
+                "duracion_ciclo": self.duracion_ciclo,
+                "ultimo_ciclo": self.ultimo_ciclo,
+                "ultimo_error": self.ultimo_error,
+            }
+
+
+class Planificador:
+    """Avanza las sesiones vencidas cada `intervalo` segundos en un hilo propio"""
+    def __init__(self, intervalo=INTERVALO, lote=LOTE, duracion_sesion=DURACION_SESION):
+        self.intervalo = intervalo
+        self.lote = lote
+        self.duracion_sesion = timedelta(minutes=duracion_sesion)
+        self.metricas = Metricas()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._ciclo_lock = threading.Lock()  # un ciclo a la vez (hilo y ejecución manual)
+
+    def iniciar(self):
+        """Arrancar el hilo (daemon: no impide que el programa termine)"""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="planificador", daemon=True)
+        self._hilo.start()
+
+    def detener(self, esperar=True):
+        """Pedir que el hilo termine después del lote en curso"""
+        self._detener.set()
+        if esperar and self._hilo is not None:
+            self._hilo.join()
+
+    def ejecutar_ciclo(self, ahora=None):
+        """Un ciclo completo; retorna {'EN_CURSO': ids, 'FINALIZADA': ids}"""
+        with self._ciclo_lock:
+            ahora = ahora or datetime.now()
+            inicio = time.perf_counter()
+            terminadas = ahora - self.duracion_sesion
+            cambios = {"EN_CURSO": [], "FINALIZADA": []}
+            retraso = 0.0
+            try:
+                retraso = self._retraso(ahora, terminadas)
+                # Primero lo que ya terminó (aunque nunca haya pasado por EN_CURSO)
+                for estado_actual in ("EN_CURSO", "PROGRAMADA"):
+                    cambios["FINALIZADA"] += self._avanzar(estado_actual, terminadas, "FINALIZADA")
+                cambios["EN_CURSO"] += self._avanzar("PROGRAMADA", ahora, "EN_CURSO")
+            except Exception as e:
+                self.metricas.registrar_ciclo(retraso, time.perf_counter() - inicio, error=str(e))
+                raise
+            self.metricas.registrar_ciclo(retraso, time.perf_counter() - inicio)
+            return cambios
+
+    def _avanzar(self, estado_actual, limite, nuevo_estado):
+        """Procesar de a lotes las sesiones en `estado_actual` anteriores a `limite`"""
+        ids = []
+        while not self._detener.is_set():
+            lote = SesionEntrenamiento.cambiar_estado_anteriores(limite, nuevo_estado, estado_actual, self.lote)
+            if lote:
+                self.metricas.registrar_lote(nuevo_estado, len(lote))
+                ids += lote
+            if len(lote) < self.lote:
+                break
+        return ids
+
+    def _retraso(self, ahora, terminadas):
+        """Segundos que lleva esperando la sesión vencida más antigua (por empezar o por finalizar)"""
+        with lectura(dictionary=False) as cursor:
+            # Un MIN por estado sobre el prefijo (estado) del índice: cada uno lee una sola entrada
+            cursor.execute(
+                "SELECT "
+                "(SELECT MIN(fecha_hora) FROM sesion_entrenamiento WHERE estado = 'PROGRAMADA' AND fecha_hora <= %s), "
+                "(SELECT MIN(fecha_hora) FROM sesion_entrenamiento WHERE estado = 'EN_CURSO' AND fecha_hora <= %s)",
+                (ahora, terminadas)
+            )
+            programada, en_curso = cursor.fetchone()
+        retrasos = [0.0]
+        if programada is not None:
+            retrasos.append((ahora - programada).total_seconds())
+        if en_curso is not None:
+            # Una sesión en curso vence cuando termina, no cuando empieza
+            retrasos.append((terminadas - en_curso).total_seconds())
+        return max(retrasos)
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                if instrumentacion.INSTRUMENTACION_ACTIVA:
+                    with instrumentacion.accion("planificador"):
+                        self.ejecutar_ciclo()
+                else:
+                    self.ejecutar_ciclo()
+            except Exception as e:
+                # Un error (p. ej. la base caída) no detiene el planificador: se reintenta en el próximo ciclo
+                instrumentacion.reportar(f"[planificador] error: {e}")
+            self._detener.wait(self.intervalo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Avanzar sesiones vencidas periódicamente")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO, help="segundos entre ciclos")
+    parser.add_argument("--lote", type=int, default=LOTE, help="sesiones por transacción")
+    parser.add_argument("--duracion", type=int, default=DURACION_SESION, help="minutos que dura una sesión")
+    parser.add_argument("--una-vez", action="store_true", help="ejecutar un solo ciclo y salir")
+    args = parser.parse_args()
+
+    planificador = Planificador(args.intervalo, args.lote, args.duracion)
+    if args.una_vez:
+        cambios = planificador.ejecutar_ciclo()
+        print(f"En curso: {len(cambios['EN_CURSO'])}  Finalizadas: {len(cambios['FINALIZADA'])}")
+        return
+
+    planificador.iniciar()
+    try:
+        while True:
+            time.sleep(args.intervalo)
+            m = planificador.metricas.resumen()
+            print(f"ciclos={m['ciclos']} en_curso={m['en_curso']} finalizadas={m['finalizadas']} "
+                  f"ultimo_lote={m['ultimo_lote']} retraso={m['retraso_segundos']:.0f}s")
+    except KeyboardInterrupt:
+        planificador.detener()
+
+
+if __name__ == "__main__":
+    main()
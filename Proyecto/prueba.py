@@ -1,8 +1,10 @@
+import os
 import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime
 
+from usuario import Usuario
 from cliente import Cliente
 from entrenador import Entrenador
 from ejercicio_fuerza import EjercicioFuerza
@@ -10,9 +12,66 @@ from ejercicio_cardio import EjercicioCardio
 from sesion_entrenamiento import SesionEntrenamiento
 from plan_entrenamiento import PlanEntrenamiento
 from ejercicio import Ejercicio
+from relaciones import agrupar
+from instrumentacion import instrumentar
+from paginacion import TAMANO_PAGINA
+from acciones import EjecutorAcciones
+from concurrente import en_paralelo
+from planificador import Planificador
+from vista_resultados import VistaResultados
 
 # Variables globales
 current_user = None  # objeto Usuario autenticado (Cliente o Entrenador)
+_listado = {"cargar": None, "formatear": None, "lineas": 1, "cursor": None, "cargando": False}  # listado paginado en lb_output
+
+# --------------------------
+# Listados paginados
+# --------------------------
+
+def limpiar_salida():
+    """Vaciar lb_output y olvidar el listado paginado que estuviera abierto."""
+    lb_output.delete(0, tk.END)
+    _listado["cargar"] = None
+
+def _paginar(cargar, formatear, lineas, encabezado, mensaje_vacio):
+    """Mostrar la primera página de `cargar(cursor)` y dejar el resto para cuando se desplace.
+
+    `formatear(elemento)` da las `lineas` líneas de cada elemento; lb_output guarda
+    los elementos y solo formatea los que llegan a verse.
+    """
+    _listado.update(cargar=cargar, formatear=formatear, lineas=lineas, cursor=None, cargando=False)
+    _cargar_pagina(encabezado, mensaje_vacio)
+
+def _cargar_pagina(encabezado=None, mensaje_vacio=None):
+    """Pedir en segundo plano la siguiente página del listado abierto y agregarla a lb_output."""
+    cargar, cursor = _listado["cargar"], _listado["cursor"]
+    primera = cursor is None
+    _listado["cargando"] = True
+
+    def agregar(pagina):
+        if _listado["cargar"] is not cargar:  # mientras tanto se abrió otro listado
+            return
+        if primera:
+            lb_output.insert(tk.END, encabezado if pagina.elementos else mensaje_vacio)
+        lb_output.agregar(pagina.elementos, _listado["formatear"], _listado["lineas"])
+        _listado["cursor"] = pagina.siguiente
+        if not pagina.hay_mas:
+            _listado["cargar"] = None
+
+    def liberar():
+        # También si la carga falló: si no, desplazarse no volvería a pedir páginas
+        if _listado["cargar"] is cargar:
+            _listado["cargando"] = False
+
+    # La primera página es la acción en sí; las siguientes no reemplazan a otras acciones
+    ejecutor.ejecutar(lambda: cargar(cursor), agregar, "Cargando resultados", nombre="cargar_pagina",
+                      mensaje_error="Error al cargar resultados", independiente=not primera,
+                      al_finalizar=liberar)
+
+def _al_desplazar(primero, ultimo):
+    """Aviso de desplazamiento de lb_output: al llegar al final se pide la página siguiente."""
+    if _listado["cargar"] is not None and not _listado["cargando"] and float(ultimo) >= 0.999:
+        _cargar_pagina()
 
 # --------------------------
 # Funciones de la aplicación 
@@ -160,158 +219,167 @@ def requiere_cliente(func):
 @requiere_entrenador
 def crear_plan_entrenamiento():
     """Permite a un entrenador crear un plan de entrenamiento."""
+    usuario = current_user
     nombre = simpledialog.askstring("Crear Plan", "Nombre del plan:")
     if not nombre:
         return
     objetivo = simpledialog.askstring("Crear Plan", "Objetivo del plan:")
     if not objetivo:
         return
-    
-    try:
-        plan = current_user.crear_plan(nombre.strip(), objetivo.strip())
+
+    def confirmar(plan):
         messagebox.showinfo("OK", f"Plan creado: {plan.nombre}")
         listar_planes()
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al crear plan:\n{e}")
+
+    ejecutor.ejecutar(lambda: usuario.crear_plan(nombre.strip(), objetivo.strip()), confirmar, "Creando plan",
+                      nombre="crear_plan_entrenamiento", mensaje_error="Error al crear plan")
 
 @requiere_entrenador
 def agregar_ejercicio_plan():
     """Agregar ejercicio a un plan existente - permite seleccionar existentes o crear nuevos."""
-    try:
-        # Cargar planes del entrenador actual
-        planes = current_user.obtener_planes()
-        
-        if not planes:
-            messagebox.showwarning("Advertencia", "No hay planes creados.")
+    usuario = current_user
+    # Planes del entrenador y ejercicios del sistema a la vez (los dos caminos usan la lista de ejercicios)
+    ejecutor.ejecutar(lambda: en_paralelo(usuario.obtener_planes, Ejercicio.listar_todos),
+                      lambda datos: _agregar_ejercicio_plan_con(*datos), "Cargando planes y ejercicios",
+                      nombre="agregar_ejercicio_plan", mensaje_error="Error al agregar ejercicio")
+
+def _buscar_ejercicio(ejercicios, nombre):
+    """Ejercicio con ese nombre (sin distinguir mayúsculas, como la búsqueda en la base) o None"""
+    nombre = nombre.casefold()
+    return next((e for e in ejercicios if e.nombre.casefold() == nombre), None)
+
+def _agregar_ejercicio_plan_con(planes, ejercicios_existentes):
+    """Diálogos de agregar_ejercicio_plan con los planes y ejercicios ya cargados."""
+    if not planes:
+        messagebox.showwarning("Advertencia", "No hay planes creados.")
+        return
+
+    # Seleccionar plan
+    plan_nombres = [plan.nombre for plan in planes]
+    plan_seleccionado = simpledialog.askstring("Seleccionar Plan",
+                                             f"Planes disponibles: {', '.join(plan_nombres)}\nIngrese el nombre:")
+    if not plan_seleccionado:
+        return
+
+    plan = next((p for p in planes if p.nombre == plan_seleccionado.strip()), None)
+    if not plan:
+        messagebox.showwarning("Error", "Plan no encontrado.")
+        return
+
+    # Preguntar si quiere usar ejercicio existente o crear nuevo
+    opcion = messagebox.askyesno(
+        "Seleccionar Ejercicio",
+        f"Plan seleccionado: {plan.nombre}\n\n"
+        f"¿Deseas seleccionar un ejercicio existente?\n\n"
+        f"• Sí = Elegir de la lista de ejercicios\n"
+        f"• No = Crear un nuevo ejercicio"
+    )
+
+    if opcion:
+        # SELECCIONAR EJERCICIO EXISTENTE
+        if not ejercicios_existentes:
+            messagebox.showwarning("Advertencia", "No hay ejercicios disponibles en el sistema.")
             return
-        
-        # Seleccionar plan
-        plan_nombres = [plan.nombre for plan in planes]
-        plan_seleccionado = simpledialog.askstring("Seleccionar Plan", 
-                                                 f"Planes disponibles: {', '.join(plan_nombres)}\nIngrese el nombre:")
-        if not plan_seleccionado:
+
+        # Mostrar lista de ejercicios
+        lista_ejercicios = [f"{ejercicio.nombre} ({ejercicio.tipo}) - {ejercicio.descripcion}"
+                           for ejercicio in ejercicios_existentes]
+
+        ejercicio_seleccionado = simpledialog.askstring(
+            "Seleccionar Ejercicio Existente",
+            f"Ejercicios disponibles:\n" + "\n".join(lista_ejercicios) +
+            "\n\nIngrese el nombre exacto del ejercicio:"
+        )
+
+        if not ejercicio_seleccionado:
             return
-        
-        plan = next((p for p in planes if p.nombre == plan_seleccionado.strip()), None)
-        if not plan:
-            messagebox.showwarning("Error", "Plan no encontrado.")
+
+        # Buscar el ejercicio
+        ejercicio = _buscar_ejercicio(ejercicios_existentes, ejercicio_seleccionado.strip())
+        if not ejercicio:
+            messagebox.showwarning("Error", "Ejercicio no encontrado.")
             return
-        
-        # Preguntar si quiere usar ejercicio existente o crear nuevo
-        opcion = messagebox.askyesno(
-            "Seleccionar Ejercicio",
-            f"Plan seleccionado: {plan.nombre}\n\n"
-            f"¿Deseas seleccionar un ejercicio existente?\n\n"
-            f"• Sí = Elegir de la lista de ejercicios\n"
-            f"• No = Crear un nuevo ejercicio"
-        )
-        
-        if opcion:
-            # SELECCIONAR EJERCICIO EXISTENTE
-            ejercicios_existentes = Ejercicio.listar_todos()
-            
-            if not ejercicios_existentes:
-                messagebox.showwarning("Advertencia", "No hay ejercicios disponibles en el sistema.")
-                return
-            
-            # Mostrar lista de ejercicios
-            lista_ejercicios = [f"{ejercicio.nombre} ({ejercicio.tipo}) - {ejercicio.descripcion}" 
-                               for ejercicio in ejercicios_existentes]
-            
-            ejercicio_seleccionado = simpledialog.askstring(
-                "Seleccionar Ejercicio Existente",
-                f"Ejercicios disponibles:\n" + "\n".join(lista_ejercicios) + 
-                "\n\nIngrese el nombre exacto del ejercicio:"
+
+        # Verificar si el ejercicio ya está en el plan
+        ejercicios_plan = [e.nombre for e in plan.ejercicios]
+        if ejercicio.nombre in ejercicios_plan:
+            messagebox.showwarning("Advertencia", f"El ejercicio '{ejercicio.nombre}' ya está en el plan.")
+            return
+
+        crear = lambda: ejercicio
+
+    else:
+        # CREAR NUEVO EJERCICIO
+        tipo_ejercicio = simpledialog.askstring("Tipo de Ejercicio", "Tipo (fuerza/cardio):", initialvalue="fuerza")
+        if not tipo_ejercicio:
+            return
+
+        nombre = simpledialog.askstring("Nuevo Ejercicio", "Nombre del ejercicio:")
+        if not nombre:
+            return
+
+        descripcion = simpledialog.askstring("Nuevo Ejercicio", "Descripción:", initialvalue="")
+
+        # Verificar si ya existe un ejercicio con ese nombre
+        ejercicio_existente = _buscar_ejercicio(ejercicios_existentes, nombre.strip())
+        if ejercicio_existente:
+            usar_existente = messagebox.askyesno(
+                "Ejercicio Existente",
+                f"Ya existe un ejercicio con el nombre '{nombre}'.\n\n"
+                f"¿Deseas usar el ejercicio existente en lugar de crear uno nuevo?"
             )
-            
-            if not ejercicio_seleccionado:
-                return
-            
-            # Buscar el ejercicio
-            ejercicio = Ejercicio.buscar_por_nombre(ejercicio_seleccionado.strip())
-            if not ejercicio:
-                messagebox.showwarning("Error", "Ejercicio no encontrado.")
-                return
-            
-            # Verificar si el ejercicio ya está en el plan
-            ejercicios_plan = [e.nombre for e in plan.ejercicios]
-            if ejercicio.nombre in ejercicios_plan:
-                messagebox.showwarning("Advertencia", f"El ejercicio '{ejercicio.nombre}' ya está en el plan.")
+            if usar_existente:
+                crear = lambda: ejercicio_existente
+            else:
+                messagebox.showinfo("Cancelado", "Por favor, usa un nombre diferente.")
                 return
-            
         else:
-            # CREAR NUEVO EJERCICIO
-            tipo_ejercicio = simpledialog.askstring("Tipo de Ejercicio", "Tipo (fuerza/cardio):", initialvalue="fuerza")
-            if not tipo_ejercicio:
-                return
-            
-            nombre = simpledialog.askstring("Nuevo Ejercicio", "Nombre del ejercicio:")
-            if not nombre:
-                return
-            
-            descripcion = simpledialog.askstring("Nuevo Ejercicio", "Descripción:", initialvalue="")
-            
-            # Verificar si ya existe un ejercicio con ese nombre
-            ejercicio_existente = Ejercicio.buscar_por_nombre(nombre.strip())
-            if ejercicio_existente:
-                usar_existente = messagebox.askyesno(
-                    "Ejercicio Existente",
-                    f"Ya existe un ejercicio con el nombre '{nombre}'.\n\n"
-                    f"¿Deseas usar el ejercicio existente en lugar de crear uno nuevo?"
-                )
-                if usar_existente:
-                    ejercicio = ejercicio_existente
-                else:
-                    messagebox.showinfo("Cancelado", "Por favor, usa un nombre diferente.")
-                    return
+            # Crear nuevo ejercicio
+            if tipo_ejercicio.lower() == 'fuerza':
+                repeticiones = simpledialog.askinteger("Ejercicio Fuerza", "Repeticiones:", initialvalue=10)
+                series = simpledialog.askinteger("Ejercicio Fuerza", "Series:", initialvalue=4)
+                peso = simpledialog.askfloat("Ejercicio Fuerza", "Peso (kg):", initialvalue=50.0)
+                crear = lambda: EjercicioFuerza.crear(nombre.strip(), descripcion.strip(), repeticiones, series, peso)
             else:
-                # Crear nuevo ejercicio
-                if tipo_ejercicio.lower() == 'fuerza':
-                    repeticiones = simpledialog.askinteger("Ejercicio Fuerza", "Repeticiones:", initialvalue=10)
-                    series = simpledialog.askinteger("Ejercicio Fuerza", "Series:", initialvalue=4)
-                    peso = simpledialog.askfloat("Ejercicio Fuerza", "Peso (kg):", initialvalue=50.0)
-                    
-                    ejercicio = EjercicioFuerza.crear(
-                        nombre.strip(), 
-                        descripcion.strip(), 
-                        repeticiones, 
-                        series, 
-                        peso
-                    )
-                else:
-                    duracion = simpledialog.askinteger("Ejercicio Cardio", "Duración (minutos):", initialvalue=20)
-                    tipo_cardio = simpledialog.askstring("Ejercicio Cardio", "Tipo de cardio:", initialvalue="CORRER")
-                    
-                    ejercicio = EjercicioCardio.crear(
-                        nombre.strip(), 
-                        descripcion.strip(), 
-                        duracion, 
-                        tipo_cardio.strip()
-                    )
-        
+                duracion = simpledialog.askinteger("Ejercicio Cardio", "Duración (minutos):", initialvalue=20)
+                tipo_cardio = simpledialog.askstring("Ejercicio Cardio", "Tipo de cardio:", initialvalue="CORRER")
+                crear = lambda: EjercicioCardio.crear(nombre.strip(), descripcion.strip(), duracion, tipo_cardio.strip())
+
+    def guardar():
         # Agregar ejercicio al plan
+        ejercicio = crear()
         plan.agregar_ejercicio(ejercicio)
-        
-        messagebox.showinfo("Éxito", 
+        return ejercicio
+
+    def confirmar(ejercicio):
+        messagebox.showinfo("Éxito",
                           f"Ejercicio agregado al plan:\n\n"
                           f"Plan: {plan.nombre}\n"
                           f"Ejercicio: {ejercicio.nombre}\n"
                           f"Tipo: {ejercicio.tipo}\n"
                           f"Descripción: {ejercicio.descripcion}")
-        
         listar_planes()
-        
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al agregar ejercicio:\n{e}")
+
+    ejecutor.ejecutar(guardar, confirmar, "Agregando ejercicio", nombre="agregar_ejercicio_plan",
+                      mensaje_error="Error al agregar ejercicio")
 
 def programar_sesion():
     """Programar una sesión de entrenamiento"""
+    usuario = current_user
+    if isinstance(usuario, Entrenador):
+        cargar = lambda: en_paralelo(Cliente.listar_todos, usuario.obtener_planes)
+    else:
+        cargar = lambda: en_paralelo(Entrenador.listar_todos, PlanEntrenamiento.listar_todos)
+    ejecutor.ejecutar(cargar, lambda datos: _programar_sesion_con(usuario, *datos), "Cargando datos de la sesión",
+                      nombre="programar_sesion", mensaje_error="Error al programar sesión")
+
+def _programar_sesion_con(usuario, disponibles, planes):
+    """Diálogos de programar_sesion con los usuarios y planes ya cargados."""
     try:
         # Determinar quién está programando la sesión
-        if isinstance(current_user, Entrenador):
+        if isinstance(usuario, Entrenador):
             # Entrenador programando sesión - busca cliente
-            clientes = Cliente.listar_todos()
-            planes = current_user.obtener_planes()
+            clientes = disponibles
             
             if not planes:
                 messagebox.showwarning("Advertencia", "No tienes planes creados. Crea un plan primero.")
@@ -329,7 +397,7 @@ def programar_sesion():
             
             try:
                 cliente_id = int(cliente_info)
-                cliente = Cliente.buscar_por_id(cliente_id)
+                cliente = next((c for c in clientes if c.id == cliente_id), None)
             except ValueError:
                 messagebox.showerror("Error", "ID debe ser un número")
                 return
@@ -351,12 +419,12 @@ def programar_sesion():
                 return
             
             # Entrenador programa sesión para cliente
-            entrenador_id = current_user.id
+            entrenador_id = usuario.id
             cliente_id = cliente.id
             
         else:  # Cliente programando sesión - busca entrenador
-            entrenadores = Entrenador.listar_todos()
-            planes_disponibles = PlanEntrenamiento.listar_todos()  # Todos los planes del sistema
+            entrenadores = disponibles
+            planes_disponibles = planes  # Todos los planes del sistema
             
             if not entrenadores:
                 messagebox.showwarning("Advertencia", "No hay entrenadores registrados en el sistema.")
@@ -372,7 +440,7 @@ def programar_sesion():
             
             try:
                 entrenador_id = int(entrenador_info)
-                entrenador = Entrenador.buscar_por_id(entrenador_id)
+                entrenador = next((e for e in entrenadores if e.id == entrenador_id), None)
             except ValueError:
                 messagebox.showerror("Error", "ID debe ser un número")
                 return
@@ -401,7 +469,7 @@ def programar_sesion():
                 return
             
             # Cliente programa sesión con entrenador
-            cliente_id = current_user.id
+            cliente_id = usuario.id
             entrenador_id = entrenador.id
         
         # Solicitar fecha y hora de la sesión
@@ -423,22 +491,22 @@ def programar_sesion():
             messagebox.showerror("Error", "Formato de fecha incorrecto. Use: YYYY-MM-DD HH:MM")
             return
         
-        # Crear la sesión
-        sesion = SesionEntrenamiento.crear(
-            fecha_hora, 
-            cliente_id, 
-            entrenador_id, 
-            plan.id_plan
-        )
-        
-        # Mensaje de confirmación personalizado
-        if isinstance(current_user, Entrenador):
-            mensaje = f" Sesión programada exitosamente!\n\nID Sesión: {sesion.id}\nCliente: {cliente.nombre}\nPlan: {plan.nombre}\nFecha: {fecha_hora.strftime('%d/%m/%Y %H:%M')}"
-        else:
-            mensaje = f" Sesión programada exitosamente!\n\nID Sesión: {sesion.id}\nEntrenador: {entrenador.nombre}\nPlan: {plan.nombre}\nFecha: {fecha_hora.strftime('%d/%m/%Y %H:%M')}"
+        def confirmar(sesion):
+            # Mensaje de confirmación personalizado
+            if isinstance(usuario, Entrenador):
+                mensaje = f" Sesión programada exitosamente!\n\nID Sesión: {sesion.id}\nCliente: {cliente.nombre}\nPlan: {plan.nombre}\nFecha: {fecha_hora.strftime('%d/%m/%Y %H:%M')}"
+            else:
+                mensaje = f" Sesión programada exitosamente!\n\nID Sesión: {sesion.id}\nEntrenador: {entrenador.nombre}\nPlan: {plan.nombre}\nFecha: {fecha_hora.strftime('%d/%m/%Y %H:%M')}"
+            
+            messagebox.showinfo("Sesión Programada", mensaje)
+            listar_sesiones()
         
-        messagebox.showinfo("Sesión Programada", mensaje)
-        listar_sesiones()
+        # Crear la sesión en segundo plano
+        ejecutor.ejecutar(
+            lambda: SesionEntrenamiento.crear(fecha_hora, cliente_id, entrenador_id, plan.id_plan),
+            confirmar, "Programando sesión", nombre="programar_sesion",
+            mensaje_error="Error al programar sesión"
+        )
         
     except Exception as e:
         messagebox.showerror("Error", f"Error al programar sesión:\n{e}")
@@ -447,51 +515,60 @@ def programar_sesion():
 @requiere_cliente
 def calificar_sesion():
     """Permite a un cliente calificar una sesión completada."""
+    usuario = current_user
+
+    def cargar():
+        # Obtener sesiones finalizadas del cliente, con sus planes (una consulta para todos)
+        sesiones_cliente = SesionEntrenamiento.buscar_por_cliente(usuario.id, perezoso=True)
+        sesiones_finalizadas = agrupar([s for s in sesiones_cliente if s.estado == "FINALIZADA"])
+        for sesion in sesiones_finalizadas:
+            sesion.plan
+        return sesiones_finalizadas
+
+    ejecutor.ejecutar(cargar, _calificar_sesion_con, "Cargando sesiones", nombre="calificar_sesion",
+                      mensaje_error="Error al obtener sesiones")
+
+def _calificar_sesion_con(sesiones_finalizadas):
+    """Diálogos de calificar_sesion con las sesiones finalizadas ya cargadas."""
+    if not sesiones_finalizadas:
+        messagebox.showwarning("Advertencia", "No tienes sesiones finalizadas para calificar.")
+        return
+
+    sesion_info = [f"Sesión {s.id} - {s.plan.nombre} ({s.fecha_hora.strftime('%Y-%m-%d')})"
+                   for s in sesiones_finalizadas]
+    sesion_seleccionada = simpledialog.askstring("Seleccionar Sesión",
+                                               f"Sesiones finalizadas:\n" + "\n".join(sesion_info) + "\n\nIngrese ID de sesión:")
+    if not sesion_seleccionada:
+        return
+
     try:
-        # Obtener sesiones finalizadas del cliente
-        sesiones_cliente = SesionEntrenamiento.buscar_por_cliente(current_user.id)
-        sesiones_finalizadas = [s for s in sesiones_cliente if s.estado == "FINALIZADA"]
-        
-        if not sesiones_finalizadas:
-            messagebox.showwarning("Advertencia", "No tienes sesiones finalizadas para calificar.")
-            return
-        
-        sesion_info = [f"Sesión {s.id} - {s.plan.nombre} ({s.fecha_hora.strftime('%Y-%m-%d')})" 
-                       for s in sesiones_finalizadas]
-        sesion_seleccionada = simpledialog.askstring("Seleccionar Sesión", 
-                                                   f"Sesiones finalizadas:\n" + "\n".join(sesion_info) + "\n\nIngrese ID de sesión:")
-        if not sesion_seleccionada:
-            return
-        
-        try:
-            sesion_id = int(sesion_seleccionada)
-            sesion = SesionEntrenamiento.buscar_por_id(sesion_id)
-        except ValueError:
-            messagebox.showerror("Error", "ID debe ser un número")
-            return
-        
-        if not sesion or sesion.cliente.id != current_user.id:
-            messagebox.showwarning("Error", "Sesión no encontrada.")
-            return
-        
-        calificacion = simpledialog.askinteger("Calificar Sesión", "Calificación (1-5):", minvalue=1, maxvalue=5)
-        if calificacion:
-            try:
-                sesion.calificar(calificacion)
-                messagebox.showinfo("OK", f"Sesión calificada con {calificacion} estrellas")
-                listar_sesiones()
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al calificar sesión:\n{e}")
-                
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al obtener sesiones:\n{e}")
+        sesion_id = int(sesion_seleccionada)
+    except ValueError:
+        messagebox.showerror("Error", "ID debe ser un número")
+        return
+
+    # Solo se aceptan las sesiones listadas (propias y finalizadas)
+    sesion = next((s for s in sesiones_finalizadas if s.id == sesion_id), None)
+    if not sesion:
+        messagebox.showwarning("Error", "Sesión no encontrada.")
+        return
+
+    calificacion = simpledialog.askinteger("Calificar Sesión", "Calificación (1-5):", minvalue=1, maxvalue=5)
+    if not calificacion:
+        return
+
+    def confirmar(_):
+        messagebox.showinfo("OK", f"Sesión calificada con {calificacion} estrellas")
+        listar_sesiones()
+
+    ejecutor.ejecutar(lambda: sesion.calificar(calificacion), confirmar, "Calificando sesión",
+                      nombre="calificar_sesion", mensaje_error="Error al calificar sesión")
 
 def listar_planes():
     """Listar todos los planes de entrenamiento."""
-    lb_output.delete(0, tk.END)
-    try:
-        planes = PlanEntrenamiento.listar_todos()
-        
+    limpiar_salida()
+    
+    def mostrar(planes):
         if not planes:
             lb_output.insert(tk.END, "No hay planes de entrenamiento registrados.")
             return
@@ -503,37 +580,36 @@ def listar_planes():
             for i, ejercicio in enumerate(plan.ejercicios, 1):
                 lb_output.insert(tk.END, f"      {i}. {ejercicio.nombre} ({ejercicio.tipo})")
             lb_output.insert(tk.END, "")
-            
-    except Exception as e:
-        lb_output.insert(tk.END, f"Error al cargar planes: {e}")
+    
+    ejecutor.ejecutar(PlanEntrenamiento.listar_todos, mostrar, "Cargando planes",
+                      nombre="listar_planes", mensaje_error="Error al cargar planes")
 
 def listar_sesiones():
-    """Listar todas las sesiones de entrenamiento."""
-    lb_output.delete(0, tk.END)
-    try:
-        sesiones = SesionEntrenamiento.listar_todas()
-        
-        if not sesiones:
-            lb_output.insert(tk.END, "No hay sesiones de entrenamiento programadas.")
-            return
-        
-        lb_output.insert(tk.END, "SESIONES DE ENTRENAMIENTO:")
-        for sesion in sesiones:
-            lb_output.insert(tk.END, f"  [ID: {sesion.id}] {sesion.cliente.nombre} con {sesion.entrenador.nombre}")
-            lb_output.insert(tk.END, f"    Plan: {sesion.plan.nombre} | Estado: {sesion.estado} | Calificación: {sesion.calificacion}/5")
-            lb_output.insert(tk.END, f"    Fecha: {sesion.fecha_hora.strftime('%Y-%m-%d %H:%M')}")
-            lb_output.insert(tk.END, "")
-            
-    except Exception as e:
-        lb_output.insert(tk.END, f"Error al cargar sesiones: {e}")
+    """Listar las sesiones de entrenamiento, de a una página a la vez."""
+    limpiar_salida()
+    
+    def lineas_sesion(sesion):
+        return [
+            f"  [ID: {sesion.id}] {sesion.cliente.nombre} con {sesion.entrenador.nombre}",
+            f"    Plan: {sesion.plan.nombre} | Estado: {sesion.estado} | Calificación: {sesion.calificacion}/5",
+            f"    Fecha: {sesion.fecha_hora.strftime('%Y-%m-%d %H:%M')}",
+            "",
+        ]
+    
+    # Cada página llega con sus relaciones cargadas: mostrarla no consulta la base en el hilo de Tk
+    _paginar(
+        lambda cursor: SesionEntrenamiento.paginar_todas(TAMANO_PAGINA, cursor),
+        lineas_sesion, 4,
+        "SESIONES DE ENTRENAMIENTO:",
+        "No hay sesiones de entrenamiento programadas."
+    )
 
 def listar_usuarios():
     """Listar todos los usuarios del sistema."""
-    lb_output.delete(0, tk.END)
-    try:
-        clientes = Cliente.listar_todos()
-        entrenadores = Entrenador.listar_todos()
-        
+    limpiar_salida()
+    
+    def mostrar(usuarios):
+        clientes, entrenadores = usuarios
         if not clientes and not entrenadores:
             lb_output.insert(tk.END, "No hay usuarios registrados.")
             return
@@ -549,320 +625,300 @@ def listar_usuarios():
             lb_output.insert(tk.END, "  CLIENTES:")
             for cliente in clientes:
                 lb_output.insert(tk.END, f"    [ID: {cliente.id}] {cliente.nombre} - Nivel: {cliente.nivel_fitness}")
-                
-    except Exception as e:
-        lb_output.insert(tk.END, f"Error al cargar usuarios: {e}")
+    
+    ejecutor.ejecutar(lambda: en_paralelo(Cliente.listar_todos, Entrenador.listar_todos), mostrar,
+                      "Cargando usuarios", nombre="listar_usuarios", mensaje_error="Error al cargar usuarios")
 
 def simular_entrenamiento():
     """Simular la finalización de una sesión de entrenamiento."""
+    def cargar():
+        # Solo se leen las sesiones programadas (índice por estado) y luego sus clientes
+        sesiones_activas = SesionEntrenamiento.buscar_por_estado("PROGRAMADA", perezoso=True)
+        for sesion in sesiones_activas:
+            sesion.cliente
+        return sesiones_activas
+
+    ejecutor.ejecutar(cargar, _simular_entrenamiento_con, "Cargando sesiones", nombre="simular_entrenamiento",
+                      mensaje_error="Error al cargar sesiones")
+
+def _simular_entrenamiento_con(sesiones_activas):
+    """Diálogos de simular_entrenamiento con las sesiones programadas ya cargadas."""
+    if not sesiones_activas:
+        messagebox.showwarning("Advertencia", "No hay sesiones activas para finalizar.")
+        return
+
+    sesion_info = [f"Sesión {s.id} - {s.cliente.nombre} ({s.fecha_hora.strftime('%Y-%m-%d')})"
+                   for s in sesiones_activas]
+    sesion_seleccionada = simpledialog.askstring("Finalizar Sesión",
+                                               f"Sesiones activas:\n" + "\n".join(sesion_info) + "\n\nIngrese ID de sesión:")
+    if not sesion_seleccionada:
+        return
+
     try:
-        sesiones = SesionEntrenamiento.listar_todas()
-        sesiones_activas = [s for s in sesiones if s.estado == "PROGRAMADA"]
-        
-        if not sesiones_activas:
-            messagebox.showwarning("Advertencia", "No hay sesiones activas para finalizar.")
-            return
-        
-        sesion_info = [f"Sesión {s.id} - {s.cliente.nombre} ({s.fecha_hora.strftime('%Y-%m-%d')})" 
-                       for s in sesiones_activas]
-        sesion_seleccionada = simpledialog.askstring("Finalizar Sesión", 
-                                                   f"Sesiones activas:\n" + "\n".join(sesion_info) + "\n\nIngrese ID de sesión:")
-        if not sesion_seleccionada:
-            return
-        
-        try:
-            sesion_id = int(sesion_seleccionada)
-            sesion = SesionEntrenamiento.buscar_por_id(sesion_id)
-        except ValueError:
-            messagebox.showerror("Error", "ID debe ser un número")
-            return
-        
-        if not sesion or sesion.estado != "PROGRAMADA":
-            messagebox.showwarning("Error", "Sesión no encontrada o no está programada.")
-            return
-        
-        try:
-            sesion.cambiar_estado("FINALIZADA")
-            messagebox.showinfo("OK", f"Sesión {sesion_id} finalizada exitosamente")
-            listar_sesiones()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al finalizar sesión:\n{e}")
-            
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al cargar sesiones:\n{e}")
+        sesion_id = int(sesion_seleccionada)
+    except ValueError:
+        messagebox.showerror("Error", "ID debe ser un número")
+        return
+
+    sesion = next((s for s in sesiones_activas if s.id == sesion_id), None)
+    if not sesion:
+        messagebox.showwarning("Error", "Sesión no encontrada o no está programada.")
+        return
+
+    def confirmar(_):
+        messagebox.showinfo("OK", f"Sesión {sesion_id} finalizada exitosamente")
+        listar_sesiones()
+
+    ejecutor.ejecutar(lambda: sesion.cambiar_estado("FINALIZADA"), confirmar, "Finalizando sesión",
+                      nombre="simular_entrenamiento", mensaje_error="Error al finalizar sesión")
+
+def avanzar_sesiones_vencidas():
+    """Ejecutar ahora un ciclo del planificador y mostrar qué sesiones cambiaron."""
+    limpiar_salida()
+    
+    def mostrar(cambios):
+        m = planificador.metricas.resumen()
+        lb_output.insert(tk.END, "SESIONES VENCIDAS:")
+        lb_output.insert(tk.END, f"  Pasaron a EN_CURSO: {len(cambios['EN_CURSO'])}")
+        lb_output.insert(tk.END, f"  Finalizadas: {len(cambios['FINALIZADA'])}")
+        lb_output.insert(tk.END, f"  Retraso de la más antigua: {m['retraso_segundos']:.0f} s")
+        lb_output.insert(tk.END, f"  Ciclos: {m['ciclos']} | Lotes: {m['lotes']} | Lote máximo: {m['lote_maximo']}")
+    
+    ejecutor.ejecutar(planificador.ejecutar_ciclo, mostrar, "Avanzando sesiones",
+                      nombre="avanzar_sesiones_vencidas", mensaje_error="Error al avanzar sesiones")
 
 def mostrar_dashboard():
     """Mostrar el dashboard del usuario actual."""
     if current_user:
-        lb_output.delete(0, tk.END)
-        try:
-            if isinstance(current_user, Cliente):
-                sesiones = SesionEntrenamiento.buscar_por_cliente(current_user.id)
-                sesiones_completadas = len([s for s in sesiones if s.estado == 'FINALIZADA'])
-                
-                lb_output.insert(tk.END, f"DASHBOARD DE {current_user.nombre.upper()}")
-                lb_output.insert(tk.END, f"Nivel: {current_user.nivel_fitness}")
-                lb_output.insert(tk.END, f"Sesiones completadas: {sesiones_completadas}")
-                lb_output.insert(tk.END, f"Total de sesiones: {len(sesiones)}")
-                lb_output.insert(tk.END, f"Email: {current_user.email}")
+        limpiar_salida()
+        usuario = current_user
+        
+        def mostrar(resumen):
+            if isinstance(usuario, Cliente):
+                lb_output.insert(tk.END, f"DASHBOARD DE {usuario.nombre.upper()}")
+                lb_output.insert(tk.END, f"Nivel: {usuario.nivel_fitness}")
+                lb_output.insert(tk.END, f"Sesiones completadas: {resumen['por_estado']['FINALIZADA']}")
+                lb_output.insert(tk.END, f"Total de sesiones: {resumen['total']}")
                 
             else:  # Entrenador
-                planes = current_user.obtener_planes()
-                sesiones = current_user.obtener_sesiones()
-                
-                lb_output.insert(tk.END, f"PANEL DE ENTRENADOR: {current_user.nombre.upper()}")
-                lb_output.insert(tk.END, f"Especialidad: {current_user.especialidad}")
-                lb_output.insert(tk.END, f"Experiencia: {current_user.anos_experiencia} años")
-                lb_output.insert(tk.END, f"Planes creados: {len(planes)}")
-                lb_output.insert(tk.END, f"Sesiones programadas: {len(sesiones)}")
-                lb_output.insert(tk.END, f"Email: {current_user.email}")
-                
-        except Exception as e:
-            lb_output.insert(tk.END, f"Error al cargar dashboard: {e}")
+                lb_output.insert(tk.END, f"PANEL DE ENTRENADOR: {usuario.nombre.upper()}")
+                lb_output.insert(tk.END, f"Especialidad: {usuario.especialidad}")
+                lb_output.insert(tk.END, f"Experiencia: {usuario.anos_experiencia} años")
+                lb_output.insert(tk.END, f"Planes creados: {resumen['planes']}")
+                lb_output.insert(tk.END, f"Sesiones programadas: {resumen['total']}")
+            
+            if resumen['calificacion_promedio'] is not None:
+                lb_output.insert(tk.END, f"Calificación promedio: {resumen['calificacion_promedio']}/5")
+            if resumen['proxima_sesion'] is not None:
+                lb_output.insert(tk.END, f"Próxima sesión: {resumen['proxima_sesion'].strftime('%Y-%m-%d %H:%M')}")
+            lb_output.insert(tk.END, f"Email: {usuario.email}")
+        
+        ejecutor.ejecutar(usuario.resumen_dashboard, mostrar, "Cargando dashboard",
+                          nombre="mostrar_dashboard", mensaje_error="Error al cargar dashboard")
 
 @requiere_entrenador
 def eliminar_usuario():
     """Permite a un entrenador eliminar cualquier usuario del sistema, manejando sesiones relacionadas."""
-    try:
-        # Cargar todos los usuarios del sistema
-        clientes = Cliente.listar_todos()
-        entrenadores = Entrenador.listar_todos()
-        
-        if not clientes and not entrenadores:
-            messagebox.showwarning("Advertencia", "No hay usuarios registrados en el sistema.")
-            return
-        
-        # Crear lista combinada de usuarios
-        todos_usuarios = []
-        for cliente in clientes:
-            # Contar sesiones del cliente
-            sesiones_cliente = SesionEntrenamiento.buscar_por_cliente(cliente.id)
-            sesiones_activas = [s for s in sesiones_cliente if s.estado != 'FINALIZADA']
-            
-            todos_usuarios.append({
-                'id': cliente.id,
-                'nombre': cliente.nombre,
-                'email': cliente.email,
-                'tipo': 'CLIENTE',
-                'info_adicional': f"Nivel: {cliente.nivel_fitness} | Sesiones activas: {len(sesiones_activas)}"
-            })
-        
-        for entrenador in entrenadores:
-            # Contar sesiones del entrenador
-            sesiones_entrenador = SesionEntrenamiento.buscar_por_entrenador(entrenador.id)
-            sesiones_activas = [s for s in sesiones_entrenador if s.estado != 'FINALIZADA']
-            planes_entrenador = entrenador.obtener_planes()
-            
-            todos_usuarios.append({
-                'id': entrenador.id,
-                'nombre': entrenador.nombre,
-                'email': entrenador.email,
-                'tipo': 'ENTRENADOR',
-                'info_adicional': f"Especialidad: {entrenador.especialidad} | Planes: {len(planes_entrenador)} | Sesiones activas: {len(sesiones_activas)}"
-            })
-        
-        # Mostrar lista de usuarios
-        lista_usuarios = [f"ID: {user['id']} | {user['nombre']} ({user['tipo']}) - {user['info_adicional']}" 
-                         for user in todos_usuarios]
-        
-        usuario_info = simpledialog.askstring("Eliminar Usuario", 
-                                            f"Usuarios del sistema:\n" + "\n".join(lista_usuarios) + 
-                                            "\n\nIngrese ID del usuario a eliminar:")
-        if not usuario_info:
-            return
-        
-        try:
-            usuario_id = int(usuario_info)
-        except ValueError:
-            messagebox.showerror("Error", "ID debe ser un número")
-            return
-        
-        # Buscar el usuario
-        usuario_a_eliminar = None
-        tipo_usuario = None
-        
-        # Buscar como cliente primero
-        usuario_a_eliminar = Cliente.buscar_por_id(usuario_id)
-        if usuario_a_eliminar:
-            tipo_usuario = 'CLIENTE'
+    usuario = current_user
+    # Resumen de todos los usuarios (tipo, sesiones y planes) en una sola consulta
+    ejecutor.ejecutar(Usuario.resumen_usuarios, lambda resumen: _eliminar_usuario_con(usuario, resumen),
+                      "Cargando usuarios", nombre="eliminar_usuario", mensaje_error="Error al procesar la eliminación")
+
+def _eliminar_usuario_con(usuario, resumen):
+    """Diálogos de eliminar_usuario con el resumen ya cargado; el borrado corre aparte, sin diálogos abiertos."""
+    if not resumen:
+        messagebox.showwarning("Advertencia", "No hay usuarios registrados en el sistema.")
+        return
+
+    for user in resumen:
+        if user['tipo'] == 'CLIENTE':
+            user['info_adicional'] = f"Nivel: {user['nivel_fitness']} | Sesiones activas: {user['sesiones_activas']}"
         else:
-            # Buscar como entrenador
-            usuario_a_eliminar = Entrenador.buscar_por_id(usuario_id)
-            if usuario_a_eliminar:
-                tipo_usuario = 'ENTRENADOR'
-        
-        if not usuario_a_eliminar:
-            messagebox.showwarning("Error", "Usuario no encontrado.")
-            return
-        
-        # Verificar que no se está intentando eliminar a sí mismo
-        if usuario_a_eliminar.id == current_user.id:
-            messagebox.showwarning("Error", "No puedes eliminarte a ti mismo.")
+            user['info_adicional'] = f"Especialidad: {user['especialidad']} | Planes: {user['planes']} | Sesiones activas: {user['sesiones_activas']}"
+
+    # Crear lista combinada de usuarios (primero los clientes)
+    todos_usuarios = ([u for u in resumen if u['tipo'] == 'CLIENTE'] +
+                      [u for u in resumen if u['tipo'] != 'CLIENTE'])
+
+    # Mostrar lista de usuarios
+    lista_usuarios = [f"ID: {user['id']} | {user['nombre']} ({user['tipo']}) - {user['info_adicional']}"
+                     for user in todos_usuarios]
+
+    usuario_info = simpledialog.askstring("Eliminar Usuario",
+                                        f"Usuarios del sistema:\n" + "\n".join(lista_usuarios) +
+                                        "\n\nIngrese ID del usuario a eliminar:")
+    if not usuario_info:
+        return
+
+    try:
+        usuario_id = int(usuario_info)
+    except ValueError:
+        messagebox.showerror("Error", "ID debe ser un número")
+        return
+
+    # El resumen ya trae nombre, email, tipo y conteos de sesiones del usuario
+    datos = next((u for u in resumen if u['id'] == usuario_id), None)
+    if not datos or datos['tipo'] not in ('CLIENTE', 'ENTRENADOR'):
+        messagebox.showwarning("Error", "Usuario no encontrado.")
+        return
+
+    # Verificar que no se está intentando eliminar a sí mismo
+    if usuario_id == usuario.id:
+        messagebox.showwarning("Error", "No puedes eliminarte a ti mismo.")
+        return
+
+    tipo_usuario = datos['tipo']
+    sesiones_activas = datos['sesiones_activas']
+    sesiones_finalizadas = datos['sesiones_finalizadas']
+    total_sesiones = sesiones_activas + sesiones_finalizadas
+
+    # Confirmación de eliminación con información detallada
+    mensaje_confirmacion = (
+        f"¿Estás seguro de que deseas eliminar al siguiente usuario?\n\n"
+        f"ID: {usuario_id}\n"
+        f"Nombre: {datos['nombre']}\n"
+        f"Email: {datos['email']}\n"
+        f"Tipo: {tipo_usuario}\n"
+        f"Sesiones activas: {sesiones_activas}\n"
+        f"Sesiones finalizadas: {sesiones_finalizadas}\n\n"
+        f" Esta acción eliminará TODAS las sesiones del usuario.\n"
+        f" Esta acción no se puede deshacer."
+    )
+
+    confirmacion = messagebox.askyesno("Confirmar Eliminación", mensaje_confirmacion)
+
+    if not confirmacion:
+        return
+
+    # Todas las preguntas se hacen antes de abrir la transacción
+    eliminar_planes = False
+    if tipo_usuario == 'ENTRENADOR' and datos['planes']:
+        # Preguntar qué hacer con los planes
+        eliminar_planes = messagebox.askyesno(
+            "Planes del Entrenador",
+            f"El entrenador {datos['nombre']} tiene planes creados.\n\n"
+            f"¿Deseas eliminar también todos sus planes?\n\n"
+            f"Si seleccionas 'No', la eliminación se cancelará."
+        )
+        if not eliminar_planes:
+            messagebox.showinfo("Cancelado", "Eliminación cancelada.")
             return
-        
-        # Obtener información de sesiones para mostrar en la confirmación
-        sesiones_usuario = []
-        if tipo_usuario == 'CLIENTE':
-            sesiones_usuario = SesionEntrenamiento.buscar_por_cliente(usuario_id)
-        else:  # ENTRENADOR
-            sesiones_usuario = SesionEntrenamiento.buscar_por_entrenador(usuario_id)
-        
-        sesiones_activas = [s for s in sesiones_usuario if s.estado != 'FINALIZADA']
-        sesiones_finalizadas = [s for s in sesiones_usuario if s.estado == 'FINALIZADA']
-        
-        # Confirmación de eliminación con información detallada
-        mensaje_confirmacion = (
-            f"¿Estás seguro de que deseas eliminar al siguiente usuario?\n\n"
-            f"ID: {usuario_a_eliminar.id}\n"
-            f"Nombre: {usuario_a_eliminar.nombre}\n"
-            f"Email: {usuario_a_eliminar.email}\n"
+
+    def confirmar(planes_eliminados):
+        # Mensaje de éxito con resumen
+        mensaje_exito = (
+            f" Usuario eliminado correctamente:\n\n"
+            f"Nombre: {datos['nombre']}\n"
             f"Tipo: {tipo_usuario}\n"
-            f"Sesiones activas: {len(sesiones_activas)}\n"
-            f"Sesiones finalizadas: {len(sesiones_finalizadas)}\n\n"
-            f" Esta acción eliminará TODAS las sesiones del usuario.\n"
-            f" Esta acción no se puede deshacer."
+            f"Sesiones eliminadas: {total_sesiones}\n"
         )
-        
-        confirmacion = messagebox.askyesno("Confirmar Eliminación", mensaje_confirmacion)
-        
-        if not confirmacion:
-            return
-        
-        # Eliminar el usuario y sus sesiones
-        try:
-            from db_connection import create_connection
-            conn = create_connection()
-            cursor = conn.cursor()
-            
-            try:
-                if tipo_usuario == 'CLIENTE':
-                    # Para cliente: eliminar sesiones primero, luego el cliente
-                    if sesiones_usuario:
-                        # Eliminar todas las sesiones del cliente
-                        cursor.execute("DELETE FROM sesion_entrenamiento WHERE id_cliente = %s", (usuario_id,))
-                    
-                    # Eliminar de tabla cliente (cascade eliminará de usuario)
-                    cursor.execute("DELETE FROM cliente WHERE id_usuario = %s", (usuario_id,))
-                    
-                else:  # ENTRENADOR
-                    # Para entrenador: manejar planes y sesiones primero
-                    
-                    # Verificar si el entrenador tiene planes creados
-                    cursor.execute("SELECT COUNT(*) FROM plan_entrenamiento WHERE id_entrenador = %s", (usuario_id,))
-                    tiene_planes = cursor.fetchone()[0] > 0
-                    
-                    if tiene_planes:
-                        # Preguntar qué hacer con los planes
-                        opcion_planes = messagebox.askyesno(
-                            "Planes del Entrenador",
-                            f"El entrenador {usuario_a_eliminar.nombre} tiene planes creados.\n\n"
-                            f"¿Deseas eliminar también todos sus planes?\n\n"
-                            f"Si seleccionas 'No', la eliminación se cancelará."
-                        )
-                        
-                        if opcion_planes:
-                            # Eliminar planes del entrenador (cascade eliminará las sesiones relacionadas)
-                            cursor.execute("DELETE FROM plan_entrenamiento WHERE id_entrenador = %s", (usuario_id,))
-                        else:
-                            messagebox.showinfo("Cancelado", "Eliminación cancelada.")
-                            return
-                    else:
-                        # Si no tiene planes, eliminar sus sesiones directamente
-                        if sesiones_usuario:
-                            cursor.execute("DELETE FROM sesion_entrenamiento WHERE id_entrenador = %s", (usuario_id,))
-                    
-                    # Eliminar de tabla entrenador
-                    cursor.execute("DELETE FROM entrenador WHERE id_usuario = %s", (usuario_id,))
-                
-                conn.commit()
-                
-                # Mensaje de éxito con resumen
-                mensaje_exito = (
-                    f" Usuario eliminado correctamente:\n\n"
-                    f"Nombre: {usuario_a_eliminar.nombre}\n"
-                    f"Tipo: {tipo_usuario}\n"
-                    f"Sesiones eliminadas: {len(sesiones_usuario)}\n"
-                )
-                
-                if tipo_usuario == 'ENTRENADOR' and tiene_planes:
-                    mensaje_exito += f"Planes eliminados: {tiene_planes}\n"
-                
-                messagebox.showinfo("Éxito", mensaje_exito)
-                listar_usuarios()  # Actualizar la lista
-                
-            except Exception as e:
-                conn.rollback()
-                raise e
-            finally:
-                cursor.close()
-                conn.close()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo eliminar el usuario:\n{e}")
-            
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al procesar la eliminación:\n{e}")
+
+        if planes_eliminados:
+            mensaje_exito += f"Planes eliminados: {planes_eliminados}\n"
+
+        messagebox.showinfo("Éxito", mensaje_exito)
+        listar_usuarios()  # Actualizar la lista
+
+    ejecutor.ejecutar(lambda: _borrar_usuario(usuario_id, tipo_usuario, eliminar_planes), confirmar,
+                      "Eliminando usuario", nombre="eliminar_usuario", mensaje_error="No se pudo eliminar el usuario")
+
+def _borrar_usuario(usuario_id, tipo_usuario, eliminar_planes):
+    """Eliminar el usuario y sus sesiones (y sus planes si eliminar_planes) en una transacción; retorna los planes eliminados."""
+    from db_connection import transaccion
+    from cache import invalidar
+    planes_eliminados = 0
+    with transaccion() as cursor:
+        if tipo_usuario == 'CLIENTE':
+            # Para cliente: eliminar sesiones primero, luego el cliente
+            cursor.execute("DELETE FROM sesion_entrenamiento WHERE id_cliente = %s", (usuario_id,))
+
+            # Eliminar de tabla cliente (cascade eliminará de usuario)
+            cursor.execute("DELETE FROM cliente WHERE id_usuario = %s", (usuario_id,))
+
+        else:  # ENTRENADOR
+            if eliminar_planes:
+                # Eliminar planes del entrenador (cascade eliminará las sesiones relacionadas)
+                cursor.execute("DELETE FROM plan_entrenamiento WHERE id_entrenador = %s", (usuario_id,))
+                planes_eliminados = cursor.rowcount
+            else:
+                # No se confirmó borrar planes: si los creó mientras se confirmaba, no se toca nada
+                cursor.execute("SELECT COUNT(*) FROM plan_entrenamiento WHERE id_entrenador = %s", (usuario_id,))
+                if cursor.fetchone()[0] > 0:
+                    raise ValueError("El entrenador tiene planes creados; vuelva a intentarlo.")
+
+            cursor.execute("DELETE FROM sesion_entrenamiento WHERE id_entrenador = %s", (usuario_id,))
+
+            # Eliminar de tabla entrenador
+            cursor.execute("DELETE FROM entrenador WHERE id_usuario = %s", (usuario_id,))
+    invalidar("entrenadores", "planes")
+    return planes_eliminados
 
 @requiere_entrenador
 def actualizar_nivel_cliente():
     """Permite a un entrenador actualizar el nivel de fitness de un cliente."""
+    usuario = current_user
+    # Obtener clientes que ha entrenado este entrenador
+    ejecutor.ejecutar(usuario.obtener_clientes_entrenados, lambda clientes: _actualizar_nivel_cliente_con(usuario, clientes),
+                      "Cargando clientes", nombre="actualizar_nivel_cliente",
+                      mensaje_error="Error al actualizar nivel del cliente")
+
+def _actualizar_nivel_cliente_con(usuario, clientes):
+    """Diálogos de actualizar_nivel_cliente con los clientes ya cargados."""
+    if not clientes:
+        messagebox.showwarning("Advertencia", "No tienes clientes asignados.")
+        return
+
+    # Mostrar lista de clientes
+    lista_clientes = [f"ID: {cliente.id} | {cliente.nombre} - Nivel actual: {cliente.nivel_fitness}"
+                     for cliente in clientes]
+
+    cliente_info = simpledialog.askstring("Actualizar Nivel de Cliente",
+                                        f"Tus clientes:\n" + "\n".join(lista_clientes) +
+                                        "\n\nIngrese ID del cliente:")
+    if not cliente_info:
+        return
+
     try:
-        # Obtener clientes que ha entrenado este entrenador
-        clientes = current_user.obtener_clientes_entrenados()
-        
-        if not clientes:
-            messagebox.showwarning("Advertencia", "No tienes clientes asignados.")
-            return
-        
-        # Mostrar lista de clientes
-        lista_clientes = [f"ID: {cliente.id} | {cliente.nombre} - Nivel actual: {cliente.nivel_fitness}" 
-                         for cliente in clientes]
-        
-        cliente_info = simpledialog.askstring("Actualizar Nivel de Cliente", 
-                                            f"Tus clientes:\n" + "\n".join(lista_clientes) + 
-                                            "\n\nIngrese ID del cliente:")
-        if not cliente_info:
-            return
-        
-        try:
-            cliente_id = int(cliente_info)
-        except ValueError:
-            messagebox.showerror("Error", "ID debe ser un número")
-            return
-        
-        # Verificar que el cliente existe y es entrenado por este entrenador
-        cliente = next((c for c in clientes if c.id == cliente_id), None)
-        if not cliente:
-            messagebox.showwarning("Error", "Cliente no encontrado o no es entrenado por ti.")
-            return
-        
-        # Mostrar niveles disponibles
-        niveles = ["Principiante", "Intermedio", "Avanzado", "Experto"]
-        nivel_seleccionado = simpledialog.askstring("Seleccionar Nuevo Nivel", 
-                                                  f"Cliente: {cliente.nombre}\n"
-                                                  f"Nivel actual: {cliente.nivel_fitness}\n\n"
-                                                  f"Niveles disponibles: {', '.join(niveles)}\n"
-                                                  f"Ingrese el nuevo nivel:")
-        if not nivel_seleccionado:
-            return
-        
-        nivel_seleccionado = nivel_seleccionado.strip().capitalize()
-        if nivel_seleccionado not in niveles:
-            messagebox.showerror("Error", f"Nivel inválido. Debe ser uno de: {', '.join(niveles)}")
-            return
-        
-        # Actualizar el nivel
-        cliente_actualizado = current_user.actualizar_nivel_cliente(cliente_id, nivel_seleccionado)
-        
-        messagebox.showinfo("Éxito", 
+        cliente_id = int(cliente_info)
+    except ValueError:
+        messagebox.showerror("Error", "ID debe ser un número")
+        return
+
+    # Verificar que el cliente existe y es entrenado por este entrenador
+    cliente = next((c for c in clientes if c.id == cliente_id), None)
+    if not cliente:
+        messagebox.showwarning("Error", "Cliente no encontrado o no es entrenado por ti.")
+        return
+
+    # Mostrar niveles disponibles
+    niveles = ["Principiante", "Intermedio", "Avanzado", "Experto"]
+    nivel_seleccionado = simpledialog.askstring("Seleccionar Nuevo Nivel",
+                                              f"Cliente: {cliente.nombre}\n"
+                                              f"Nivel actual: {cliente.nivel_fitness}\n\n"
+                                              f"Niveles disponibles: {', '.join(niveles)}\n"
+                                              f"Ingrese el nuevo nivel:")
+    if not nivel_seleccionado:
+        return
+
+    nivel_seleccionado = nivel_seleccionado.strip().capitalize()
+    if nivel_seleccionado not in niveles:
+        messagebox.showerror("Error", f"Nivel inválido. Debe ser uno de: {', '.join(niveles)}")
+        return
+
+    def confirmar(cliente_actualizado):
+        messagebox.showinfo("Éxito",
                           f"Nivel actualizado correctamente:\n\n"
                           f"Cliente: {cliente_actualizado.nombre}\n"
                           f"Nuevo nivel: {cliente_actualizado.nivel_fitness}")
-        
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al actualizar nivel del cliente:\n{e}")
+
+    # Actualizar el nivel
+    ejecutor.ejecutar(lambda: usuario.actualizar_nivel_cliente(cliente_id, nivel_seleccionado), confirmar,
+                      "Actualizando nivel", nombre="actualizar_nivel_cliente",
+                      mensaje_error="Error al actualizar nivel del cliente")
 
 def salir():
+    planificador.detener(esperar=False)
+    ejecutor.cerrar()
     root.destroy()
     sys.exit(0)
 
@@ -885,6 +941,7 @@ def ajustar_menu_por_rol():
         acciones_menu.entryconfig("Agregar ejercicio a plan", state="normal")
         acciones_menu.entryconfig("Programar sesión", state="normal")
         acciones_menu.entryconfig("Simular entrenamiento", state="normal")
+        acciones_menu.entryconfig("Avanzar sesiones vencidas", state="normal")
         acciones_menu.entryconfig("Actualizar nivel cliente", state="normal")
         acciones_menu.entryconfig("Eliminar usuario", state="normal")
         acciones_menu.entryconfig("Calificar sesión", state="disabled")
@@ -895,6 +952,7 @@ def ajustar_menu_por_rol():
         acciones_menu.entryconfig("Agregar ejercicio a plan", state="disabled")
         acciones_menu.entryconfig("Programar sesión", state="normal")
         acciones_menu.entryconfig("Simular entrenamiento", state="disabled")
+        acciones_menu.entryconfig("Avanzar sesiones vencidas", state="disabled")
         acciones_menu.entryconfig("Actualizar nivel cliente", state="disabled")
         acciones_menu.entryconfig("Eliminar usuario", state="disabled")
         acciones_menu.entryconfig("Calificar sesión", state="normal")
@@ -916,20 +974,21 @@ menubar = tk.Menu(root)
 
 # Menú "Acciones" con las opciones
 acciones_menu = tk.Menu(menubar, tearoff=0)
-acciones_menu.add_command(label="Mostrar dashboard", command=mostrar_dashboard)
+acciones_menu.add_command(label="Mostrar dashboard", command=instrumentar(mostrar_dashboard))
 acciones_menu.add_separator()
-acciones_menu.add_command(label="Crear plan entrenamiento", command=crear_plan_entrenamiento)
-acciones_menu.add_command(label="Agregar ejercicio a plan", command=agregar_ejercicio_plan)
-acciones_menu.add_command(label="Programar sesión", command=programar_sesion)
+acciones_menu.add_command(label="Crear plan entrenamiento", command=instrumentar(crear_plan_entrenamiento))
+acciones_menu.add_command(label="Agregar ejercicio a plan", command=instrumentar(agregar_ejercicio_plan))
+acciones_menu.add_command(label="Programar sesión", command=instrumentar(programar_sesion))
 acciones_menu.add_separator()
-acciones_menu.add_command(label="Simular entrenamiento", command=simular_entrenamiento)
-acciones_menu.add_command(label="Calificar sesión", command=calificar_sesion)
-acciones_menu.add_command(label="Eliminar usuario", command=eliminar_usuario)
-acciones_menu.add_command(label="Actualizar nivel cliente", command=actualizar_nivel_cliente)
+acciones_menu.add_command(label="Simular entrenamiento", command=instrumentar(simular_entrenamiento))
+acciones_menu.add_command(label="Avanzar sesiones vencidas", command=instrumentar(avanzar_sesiones_vencidas))
+acciones_menu.add_command(label="Calificar sesión", command=instrumentar(calificar_sesion))
+acciones_menu.add_command(label="Eliminar usuario", command=instrumentar(eliminar_usuario))
+acciones_menu.add_command(label="Actualizar nivel cliente", command=instrumentar(actualizar_nivel_cliente))
 acciones_menu.add_separator()
-acciones_menu.add_command(label="Listar usuarios", command=listar_usuarios)
-acciones_menu.add_command(label="Listar sesiones", command=listar_sesiones)
-acciones_menu.add_command(label="Listar planes", command=listar_planes)
+acciones_menu.add_command(label="Listar usuarios", command=instrumentar(listar_usuarios))
+acciones_menu.add_command(label="Listar sesiones", command=instrumentar(listar_sesiones))
+acciones_menu.add_command(label="Listar planes", command=instrumentar(listar_planes))
 menubar.add_cascade(label="¿Qué quieres hacer hoy?", menu=acciones_menu)
 
 # Menú "Opciones" con Salir
@@ -952,8 +1011,8 @@ frame_list = ttk.Frame(frame_output)
 frame_list.pack(fill=tk.BOTH, expand=True, pady=(6, 0))
 
 sb = ttk.Scrollbar(frame_list, orient=tk.VERTICAL)
-lb_output = tk.Listbox(frame_list, yscrollcommand=sb.set, font=("Consolas", 10), bg="#ccff33")
-sb.config(command=lb_output.yview)
+# Solo la parte visible de los resultados vive en el widget (ver vista_resultados.py)
+lb_output = VistaResultados(frame_list, sb, al_desplazar=_al_desplazar, font=("Consolas", 10), bg="#ccff33")
 sb.pack(side=tk.RIGHT, fill=tk.Y)
 lb_output.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
@@ -961,6 +1020,14 @@ lb_output.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 lbl_help = tk.Label(frame_output, text="Iniciando sistema espere un poco pliiiis...", font=("Segoe UI", 9),bg="#7D3C98")
 lbl_help.pack(anchor="w", pady=(8, 0))
 
+# Consultas de los comandos en segundo plano; el estado se muestra en lbl_help
+ejecutor = EjecutorAcciones(root, lbl_help)
+
+# Avance automático de sesiones vencidas en un hilo propio (PLANIFICADOR_GUI=1 en .env)
+planificador = Planificador()
+if os.getenv("PLANIFICADOR_GUI", "0") == "1":
+    planificador.iniciar()
+
 # Al iniciar, pedir login directamente 
 root.after(100, login_inicial)
 
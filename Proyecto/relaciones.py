@@ -0,0 +1,96 @@
+import weakref
+
+# Relaciones perezosas: el objeto guarda solo la clave foránea y el objeto
+# relacionado se carga al primer acceso. Los objetos que vinieron de la misma
+# consulta forman un grupo, y la primera carga resuelve la relación para todo
+# el grupo con una sola consulta (en lugar de una por objeto).
+
+
+def agrupar(objetos):
+    """Marcar objetos como hermanos para que sus relaciones se carguen juntas"""
+    grupo = weakref.WeakSet(objetos)
+    for objeto in objetos:
+        objeto._grupo_carga = grupo
+    return objetos
+
+
+def _pendientes(objeto, atributo):
+    """Hermanos (incluido el propio objeto) que aún no cargaron `atributo`"""
+    grupo = getattr(objeto, "_grupo_carga", None) or (objeto,)
+    pendientes = [h for h in grupo if atributo not in h.__dict__]
+    if objeto not in pendientes:
+        pendientes.append(objeto)
+    return pendientes
+
+
+class Relacion:
+    """Relación muchos-a-uno perezosa.
+
+    Se le puede asignar el objeto relacionado o solo su id; con el id la
+    carga se hace al primer acceso mediante `cargar_lote(ids) -> {id: objeto}`.
+    """
+
+    def __init__(self, atributo_fk, cargar_lote, clave="id"):
+        self.atributo_fk = atributo_fk
+        self.cargar_lote = cargar_lote
+        self.clave = clave
+
+    def __set_name__(self, propietario, nombre):
+        self.nombre = nombre
+        self.privado = "_" + nombre
+
+    def __get__(self, objeto, tipo=None):
+        if objeto is None:
+            return self
+        if self.privado not in objeto.__dict__:
+            pendientes = _pendientes(objeto, self.privado)
+            ids = {getattr(h, self.atributo_fk) for h in pendientes} - {None}
+            cargados = self.cargar_lote(list(ids)) if ids else {}
+            for hermano in pendientes:
+                hermano.__dict__[self.privado] = cargados.get(getattr(hermano, self.atributo_fk))
+        return objeto.__dict__[self.privado]
+
+    def __set__(self, objeto, valor):
+        if valor is None or hasattr(valor, self.clave):
+            objeto.__dict__[self.privado] = valor
+            setattr(objeto, self.atributo_fk, getattr(valor, self.clave) if valor is not None else None)
+        else:
+            # Solo la clave foránea: queda pendiente de carga
+            objeto.__dict__.pop(self.privado, None)
+            setattr(objeto, self.atributo_fk, valor)
+
+    def cargada(self, objeto):
+        """Indica si la relación ya está en memoria"""
+        return self.privado in objeto.__dict__
+
+
+class Coleccion:
+    """Colección uno-a-muchos perezosa.
+
+    `cargar_lote(objetos)` debe asignar la colección a cada objeto recibido.
+    """
+
+    def __init__(self, cargar_lote):
+        self.cargar_lote = cargar_lote
+
+    def __set_name__(self, propietario, nombre):
+        self.nombre = nombre
+        self.privado = "_" + nombre
+
+    def __get__(self, objeto, tipo=None):
+        if objeto is None:
+            return self
+        if self.privado not in objeto.__dict__:
+            self.cargar_lote(_pendientes(objeto, self.privado))
+        return objeto.__dict__[self.privado]
+
+    def __set__(self, objeto, valor):
+        objeto.__dict__[self.privado] = valor
+
+    def descargar(self, objeto):
+        """Dejar la colección pendiente de carga"""
+        objeto.__dict__.pop(self.privado, None)
+
+    def cargada(self, objeto):
+        """Indica si la colección ya está en memoria"""
+        return self.privado in objeto.__dict__
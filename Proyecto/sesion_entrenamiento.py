@@ -1,7 +1,59 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
+import db_async
+import identidad
+from relaciones import Relacion, agrupar
+from paginacion import Pagina, TAMANO_PAGINA, condicion_despues_de
 from datetime import datetime
 
+ESTADOS = ("PROGRAMADA", "EN_CURSO", "FINALIZADA", "CANCELADA")
+
+# Sesiones junto con su cliente, entrenador y plan (agregar el filtro al final)
+SELECT_CON_RELACIONES = """
+    SELECT s.id_sesion, s.fecha_hora, s.id_cliente, s.id_entrenador, s.id_plan,
+           s.estado, s.calificacion,
+           uc.nombre AS cliente_nombre, uc.email AS cliente_email, c.nivel_fitness,
+           ue.nombre AS entrenador_nombre, ue.email AS entrenador_email,
+           en.especialidad, en.anos_experiencia,
+           p.nombre AS plan_nombre, p.objetivo AS plan_objetivo,
+           p.id_entrenador AS plan_id_entrenador
+    FROM sesion_entrenamiento s
+    LEFT JOIN cliente c ON c.id_usuario = s.id_cliente
+    LEFT JOIN usuario uc ON uc.id_usuario = c.id_usuario
+    LEFT JOIN entrenador en ON en.id_usuario = s.id_entrenador
+    LEFT JOIN usuario ue ON ue.id_usuario = en.id_usuario
+    LEFT JOIN plan_entrenamiento p ON p.id_plan = s.id_plan
+"""
+
+# Solo las columnas de la sesión; las relaciones quedan como claves foráneas
+SELECT_SESION = """
+    SELECT s.id_sesion, s.fecha_hora, s.id_cliente, s.id_entrenador, s.id_plan,
+           s.estado, s.calificacion
+    FROM sesion_entrenamiento s
+"""
+
+
+def _clientes_por_ids(ids):
+    from cliente import Cliente
+    return Cliente.buscar_por_ids(ids)
+
+
+def _entrenadores_por_ids(ids):
+    from entrenador import Entrenador
+    return Entrenador.buscar_por_ids(ids)
+
+
+def _planes_por_ids(ids):
+    from plan_entrenamiento import PlanEntrenamiento
+    return PlanEntrenamiento.buscar_por_ids(ids, perezoso=True)
+
+
 class SesionEntrenamiento:
+    # cliente, entrenador y plan aceptan el objeto o solo su id;
+    # con el id se cargan al primer acceso, en lote para todas las sesiones de la consulta
+    cliente = Relacion("id_cliente", _clientes_por_ids)
+    entrenador = Relacion("id_entrenador", _entrenadores_por_ids)
+    plan = Relacion("id_plan", _planes_por_ids, clave="id_plan")
+
     def __init__(self, id_sesion, fecha_hora, cliente, entrenador, plan):
         self.id = id_sesion
         self.fecha_hora = fecha_hora
@@ -14,13 +66,7 @@ class SesionEntrenamiento:
     @classmethod
     def crear(cls, fecha_hora, id_cliente, id_entrenador, id_plan):
         """Crear una nueva sesión de entrenamiento"""
-        from cliente import Cliente
-        from entrenador import Entrenador
-        from plan_entrenamiento import PlanEntrenamiento
-        
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 """INSERT INTO sesion_entrenamiento 
                 (fecha_hora, id_cliente, id_entrenador, id_plan, estado, calificacion) 
@@ -28,190 +74,399 @@ class SesionEntrenamiento:
                 (fecha_hora, id_cliente, id_entrenador, id_plan)
             )
             sesion_id = cursor.lastrowid
-            conn.commit()
-            
-            # Cargar objetos completos
-            cliente = Cliente.buscar_por_id(id_cliente)
-            entrenador = Entrenador.buscar_por_id(id_entrenador)
-            plan = PlanEntrenamiento.buscar_por_id(id_plan)
-            
-            return cls(sesion_id, fecha_hora, cliente, entrenador, plan)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        
+        # Cliente, entrenador y plan se cargan recién cuando se usan
+        return identidad.registrar(cls(sesion_id, fecha_hora, id_cliente, id_entrenador, id_plan), sesion_id)
 
     @classmethod
-    def buscar_por_id(cls, id_sesion):
+    def buscar_por_id(cls, id_sesion, perezoso=False):
         """Buscar sesión por ID"""
-        from cliente import Cliente
-        from entrenador import Entrenador
-        from plan_entrenamiento import PlanEntrenamiento
-        
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id_sesion, fecha_hora, id_cliente, id_entrenador, id_plan, estado, calificacion
-                FROM sesion_entrenamiento WHERE id_sesion = %s
-            """, (id_sesion,))
-            row = cursor.fetchone()
-            if not row:
-                return None
-            
-            # Cargar objetos completos
-            cliente = Cliente.buscar_por_id(row['id_cliente'])
-            entrenador = Entrenador.buscar_por_id(row['id_entrenador'])
-            plan = PlanEntrenamiento.buscar_por_id(row['id_plan'])
-            
-            sesion = cls(row['id_sesion'], row['fecha_hora'], cliente, entrenador, plan)
-            sesion.estado = row['estado']
-            sesion.calificacion = row['calificacion']
-            return sesion
-        finally:
-            cursor.close()
-            conn.close()
+        existente = identidad.obtener(cls, id_sesion)
+        if existente is not None:
+            return existente
+        sesiones = cls._cargar("WHERE s.id_sesion = %s", (id_sesion,), perezoso, preparada=True)
+        return sesiones[0] if sesiones else None
 
     @classmethod
-    def buscar_por_cliente(cls, id_cliente):
+    def buscar_por_cliente(cls, id_cliente, perezoso=False):
         """Buscar sesiones por cliente"""
-        from cliente import Cliente
-        from entrenador import Entrenador
-        from plan_entrenamiento import PlanEntrenamiento
-        
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id_sesion, fecha_hora, id_cliente, id_entrenador, id_plan, estado, calificacion
-                FROM sesion_entrenamiento WHERE id_cliente = %s ORDER BY fecha_hora DESC
-            """, (id_cliente,))
-            rows = cursor.fetchall()
-            
-            sesiones = []
-            for row in rows:
-                cliente = Cliente.buscar_por_id(row['id_cliente'])
-                entrenador = Entrenador.buscar_por_id(row['id_entrenador'])
-                plan = PlanEntrenamiento.buscar_por_id(row['id_plan'])
-                
-                sesion = cls(row['id_sesion'], row['fecha_hora'], cliente, entrenador, plan)
-                sesion.estado = row['estado']
-                sesion.calificacion = row['calificacion']
-                sesiones.append(sesion)
-            
-            return sesiones
-        finally:
-            cursor.close()
-            conn.close()
+        return cls._cargar(
+            "WHERE s.id_cliente = %s ORDER BY s.fecha_hora DESC", (id_cliente,), perezoso
+        )
 
     @classmethod
-    def buscar_por_entrenador(cls, id_entrenador):
+    def buscar_por_entrenador(cls, id_entrenador, perezoso=False):
         """Buscar sesiones por entrenador"""
-        from cliente import Cliente
-        from entrenador import Entrenador
-        from plan_entrenamiento import PlanEntrenamiento
-        
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id_sesion, fecha_hora, id_cliente, id_entrenador, id_plan, estado, calificacion
-                FROM sesion_entrenamiento WHERE id_entrenador = %s ORDER BY fecha_hora DESC
-            """, (id_entrenador,))
+        return cls._cargar(
+            "WHERE s.id_entrenador = %s ORDER BY s.fecha_hora DESC", (id_entrenador,), perezoso
+        )
+
+    @classmethod
+    def buscar_por_estado(cls, estado, perezoso=False):
+        """Buscar sesiones en un estado, de la más antigua a la más reciente"""
+        return cls._cargar(
+            "WHERE s.estado = %s ORDER BY s.fecha_hora, s.id_sesion", (estado,), perezoso
+        )
+
+    @classmethod
+    def resumen_por_cliente(cls, id_cliente):
+        """Resumen para el dashboard de un cliente (planes = planes distintos que ha entrenado)"""
+        return cls._resumen(
+            "s.id_cliente",
+            "SELECT COUNT(DISTINCT id_plan) AS planes FROM sesion_entrenamiento WHERE id_cliente = %s",
+            id_cliente
+        )
+
+    @classmethod
+    def resumen_por_entrenador(cls, id_entrenador):
+        """Resumen para el dashboard de un entrenador (planes = planes que ha creado)"""
+        return cls._resumen(
+            "s.id_entrenador",
+            "SELECT COUNT(*) AS planes FROM plan_entrenamiento WHERE id_entrenador = %s",
+            id_entrenador
+        )
+
+    @classmethod
+    def contar_por_plan(cls, id_plan):
+        """Cantidad de sesiones de un plan por estado: {estado: cantidad} (sin cargar las sesiones)"""
+        with lectura() as cursor:
+            cursor.execute(
+                "SELECT estado, COUNT(*) AS cantidad FROM sesion_entrenamiento WHERE id_plan = %s GROUP BY estado",
+                (id_plan,)
+            )
             rows = cursor.fetchall()
-            
-            sesiones = []
-            for row in rows:
-                cliente = Cliente.buscar_por_id(row['id_cliente'])
-                entrenador = Entrenador.buscar_por_id(row['id_entrenador'])
-                plan = PlanEntrenamiento.buscar_por_id(row['id_plan'])
-                
-                sesion = cls(row['id_sesion'], row['fecha_hora'], cliente, entrenador, plan)
-                sesion.estado = row['estado']
-                sesion.calificacion = row['calificacion']
-                sesiones.append(sesion)
-            
-            return sesiones
-        finally:
-            cursor.close()
-            conn.close()
+        por_estado = dict.fromkeys(ESTADOS, 0)
+        for row in rows:
+            por_estado[row['estado']] = row['cantidad']
+        return por_estado
+
+    @staticmethod
+    def _resumen(columna, sql_planes, id_usuario):
+        """Conteos por estado, planes, calificación promedio y próxima sesión en una sola consulta.
+
+        Solo viajan agregados (una fila por estado), sin importar cuántas sesiones haya.
+        La tabla derivada de planes siempre tiene una fila, así que el LEFT JOIN
+        devuelve resultado aunque el usuario no tenga sesiones.
+        """
+        with lectura() as cursor:
+            cursor.execute(f"""
+                SELECT p.planes, s.estado, COUNT(s.id_sesion) AS cantidad,
+                       SUM(CASE WHEN s.calificacion > 0 THEN s.calificacion END) AS suma_calificaciones,
+                       COUNT(CASE WHEN s.calificacion > 0 THEN 1 END) AS calificadas,
+                       MIN(CASE WHEN s.estado = 'PROGRAMADA' AND s.fecha_hora >= NOW()
+                                THEN s.fecha_hora END) AS proxima
+                FROM ({sql_planes}) p
+                LEFT JOIN sesion_entrenamiento s ON {columna} = %s
+                GROUP BY p.planes, s.estado
+            """, (id_usuario, id_usuario))
+            rows = cursor.fetchall()
+
+        por_estado = dict.fromkeys(ESTADOS, 0)
+        suma = calificadas = 0
+        proximas = []
+        for row in rows:
+            if row['estado'] is None:  # sin sesiones
+                continue
+            por_estado[row['estado']] = row['cantidad']
+            suma += row['suma_calificaciones'] or 0
+            calificadas += row['calificadas']
+            if row['proxima'] is not None:
+                proximas.append(row['proxima'])
+        return {
+            "por_estado": por_estado,
+            "total": sum(por_estado.values()),
+            "planes": rows[0]['planes'] if rows else 0,
+            # 0 significa "sin calificar", por eso no entra en el promedio
+            "calificacion_promedio": round(float(suma) / calificadas, 2) if calificadas else None,
+            "proxima_sesion": min(proximas) if proximas else None,
+        }
 
     @classmethod
-    def listar_todas(cls):
+    def listar_todas(cls, perezoso=False):
         """Listar todas las sesiones"""
+        return cls._cargar("ORDER BY s.fecha_hora DESC", perezoso=perezoso)
+
+    @classmethod
+    def iterar_todas(cls, lote=None):
+        """Como listar_todas, pero generando las sesiones de a lotes (memoria constante).
+
+        Cliente, entrenador y plan se cargan al primer acceso, con una consulta por lote.
+        """
+        return cls._iterar("ORDER BY s.fecha_hora DESC, s.id_sesion DESC", (), lote)
+
+    @classmethod
+    def iterar_por_cliente(cls, id_cliente, lote=None):
+        """Sesiones de un cliente, generadas de a lotes"""
+        return cls._iterar("WHERE s.id_cliente = %s ORDER BY s.fecha_hora DESC, s.id_sesion DESC", (id_cliente,), lote)
+
+    @classmethod
+    def iterar_por_entrenador(cls, id_entrenador, lote=None):
+        """Sesiones de un entrenador, generadas de a lotes"""
+        return cls._iterar(
+            "WHERE s.id_entrenador = %s ORDER BY s.fecha_hora DESC, s.id_sesion DESC", (id_entrenador,), lote
+        )
+
+    @classmethod
+    def _iterar(cls, filtro, params, lote):
+        """Generar sesiones sin relaciones cargadas; cada lote se agrupa para cargarlas juntas"""
+        for rows in leer_en_lotes(f"{SELECT_SESION} {filtro}", params, lote):
+            yield from agrupar([cls._desde_fila(row) for row in rows])
+
+    @classmethod
+    def paginar_todas(cls, tamano=TAMANO_PAGINA, cursor=None, perezoso=False):
+        """Página de sesiones, de la más reciente a la más antigua"""
+        return cls._pagina(None, (), tamano, cursor, perezoso)
+
+    @classmethod
+    def paginar_por_cliente(cls, id_cliente, tamano=TAMANO_PAGINA, cursor=None, perezoso=False):
+        """Página de sesiones de un cliente"""
+        return cls._pagina("s.id_cliente = %s", (id_cliente,), tamano, cursor, perezoso)
+
+    @classmethod
+    def paginar_por_entrenador(cls, id_entrenador, tamano=TAMANO_PAGINA, cursor=None, perezoso=False):
+        """Página de sesiones de un entrenador"""
+        return cls._pagina("s.id_entrenador = %s", (id_entrenador,), tamano, cursor, perezoso)
+
+    @classmethod
+    def _pagina(cls, condicion, params, tamano, cursor, perezoso):
+        """Leer tamano + 1 sesiones después del cursor, ordenadas por (fecha_hora, id_sesion)"""
+        condiciones = [condicion] if condicion else []
+        if cursor:
+            despues, params_cursor = condicion_despues_de("s.fecha_hora", "s.id_sesion", cursor)
+            condiciones.append(despues)
+            params = params + params_cursor
+        filtro = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+        sesiones = cls._cargar(
+            f"{filtro} ORDER BY s.fecha_hora DESC, s.id_sesion DESC LIMIT %s", params + (tamano + 1,), perezoso
+        )
+        return Pagina.desde_filas(sesiones, tamano, lambda s: (s.fecha_hora, s.id))
+
+    @classmethod
+    def _cargar(cls, filtro, params=(), perezoso=False, preparada=False):
+        """Cargar sesiones con sus relaciones (perezoso=False) o solo con las claves foráneas"""
+        if not perezoso:
+            return cls._cargar_con_relaciones(filtro, params, preparada)
+        with lectura(preparada=preparada) as cursor:
+            cursor.execute(f"{SELECT_SESION} {filtro}", params)
+            return agrupar([cls._desde_fila(row) for row in cursor.fetchall()])
+
+    @classmethod
+    def _desde_fila(cls, row):
+        """Construir (o reutilizar del mapa de identidad) una sesión con sus relaciones sin cargar"""
+        sesion = identidad.registrar(
+            cls(row['id_sesion'], row['fecha_hora'], row['id_cliente'], row['id_entrenador'], row['id_plan']),
+            row['id_sesion']
+        )
+        sesion.estado = row['estado']
+        sesion.calificacion = row['calificacion']
+        return sesion
+
+    @classmethod
+    def _cargar_con_relaciones(cls, filtro, params=(), preparada=False):
+        """Cargar sesiones con cliente, entrenador y plan en una sola consulta.
+
+        Los ejercicios de todos los planes se cargan después en una consulta
+        adicional, así que el número de consultas no depende de las filas.
+        """
+        from plan_entrenamiento import PlanEntrenamiento
+        
+        with lectura(preparada=preparada) as cursor:
+            cursor.execute(f"{SELECT_CON_RELACIONES} {filtro}", params)
+            sesiones, planes = cls._armar(cursor.fetchall())
+            PlanEntrenamiento.cargar_ejercicios_lote(planes)
+        
+        return sesiones
+
+    @classmethod
+    def _armar(cls, rows):
+        """Construir las sesiones de filas de SELECT_CON_RELACIONES; retorna (sesiones, planes)"""
         from cliente import Cliente
         from entrenador import Entrenador
         from plan_entrenamiento import PlanEntrenamiento
         
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT id_sesion, fecha_hora, id_cliente, id_entrenador, id_plan, estado, calificacion
-                FROM sesion_entrenamiento ORDER BY fecha_hora DESC
-            """)
-            rows = cursor.fetchall()
+        # El mapa de identidad hace que cada cliente, entrenador y plan se construya una sola vez
+        planes = {}
+        sesiones = []
+        for row in rows:
+            cliente = None
+            if row['cliente_nombre'] is not None:
+                cliente = identidad.obtener(Cliente, row['id_cliente']) or identidad.registrar(
+                    Cliente(row['id_cliente'], row['cliente_nombre'],
+                            row['cliente_email'], row['nivel_fitness']), row['id_cliente'])
+            
+            entrenador = None
+            if row['entrenador_nombre'] is not None:
+                entrenador = identidad.obtener(Entrenador, row['id_entrenador']) or identidad.registrar(
+                    Entrenador(row['id_entrenador'], row['entrenador_nombre'],
+                               row['entrenador_email'], row['especialidad'],
+                               row['anos_experiencia']), row['id_entrenador'])
             
-            sesiones = []
-            for row in rows:
-                cliente = Cliente.buscar_por_id(row['id_cliente'])
-                entrenador = Entrenador.buscar_por_id(row['id_entrenador'])
-                plan = PlanEntrenamiento.buscar_por_id(row['id_plan'])
-                
-                sesion = cls(row['id_sesion'], row['fecha_hora'], cliente, entrenador, plan)
-                sesion.estado = row['estado']
-                sesion.calificacion = row['calificacion']
-                sesiones.append(sesion)
+            plan = None
+            if row['plan_nombre'] is not None:
+                plan = identidad.obtener(PlanEntrenamiento, row['id_plan']) or identidad.registrar(
+                    PlanEntrenamiento(row['id_plan'], row['plan_nombre'],
+                                      row['plan_objetivo'], row['plan_id_entrenador']), row['id_plan'])
+                planes[plan.id_plan] = plan
             
-            return sesiones
-        finally:
-            cursor.close()
-            conn.close()
+            sesion = cls._desde_fila(row)
+            if cliente is not None:
+                sesion.cliente = cliente
+            if entrenador is not None:
+                sesion.entrenador = entrenador
+            if plan is not None:
+                sesion.plan = plan
+            sesiones.append(sesion)
+        return sesiones, list(planes.values())
+
+    # --- Versiones asíncronas (db_async) ---
+
+    @classmethod
+    async def alistar_todas(cls):
+        """Listar todas las sesiones (async)"""
+        return await cls._acargar("ORDER BY s.fecha_hora DESC")
+
+    @classmethod
+    async def abuscar_por_id(cls, id_sesion):
+        """Buscar sesión por ID (async)"""
+        existente = identidad.obtener(cls, id_sesion)
+        if existente is not None:
+            return existente
+        sesiones = await cls._acargar("WHERE s.id_sesion = %s", (id_sesion,))
+        return sesiones[0] if sesiones else None
+
+    @classmethod
+    async def abuscar_por_cliente(cls, id_cliente):
+        """Buscar sesiones por cliente (async)"""
+        return await cls._acargar("WHERE s.id_cliente = %s ORDER BY s.fecha_hora DESC", (id_cliente,))
+
+    @classmethod
+    async def abuscar_por_entrenador(cls, id_entrenador):
+        """Buscar sesiones por entrenador (async)"""
+        return await cls._acargar("WHERE s.id_entrenador = %s ORDER BY s.fecha_hora DESC", (id_entrenador,))
+
+    @classmethod
+    async def _acargar(cls, filtro, params=()):
+        """Como _cargar_con_relaciones: las relaciones no pueden quedar perezosas (su carga es síncrona)"""
+        from plan_entrenamiento import PlanEntrenamiento
+        rows = await db_async.consultar(f"{SELECT_CON_RELACIONES} {filtro}", params)
+        sesiones, planes = cls._armar(rows)
+        await PlanEntrenamiento.acargar_ejercicios_lote(planes)
+        return sesiones
+
+    @classmethod
+    async def acrear(cls, fecha_hora, id_cliente, id_entrenador, id_plan):
+        """Crear una nueva sesión de entrenamiento (async)"""
+        async with db_async.transaccion() as cursor:
+            await cursor.execute(
+                """INSERT INTO sesion_entrenamiento 
+                (fecha_hora, id_cliente, id_entrenador, id_plan, estado, calificacion) 
+                VALUES (%s, %s, %s, %s, 'PROGRAMADA', 0)""",
+                (fecha_hora, id_cliente, id_entrenador, id_plan)
+            )
+            sesion_id = cursor.lastrowid
+        return identidad.registrar(cls(sesion_id, fecha_hora, id_cliente, id_entrenador, id_plan), sesion_id)
+
+    async def acambiar_estado(self, nuevo_estado):
+        """Cambiar estado de la sesión (async)"""
+        async with db_async.transaccion() as cursor:
+            await cursor.execute(
+                "UPDATE sesion_entrenamiento SET estado = %s WHERE id_sesion = %s",
+                (nuevo_estado, self.id)
+            )
+            if nuevo_estado == "FINALIZADA":
+                from historial_sesiones import HistorialSesiones
+                await HistorialSesiones.aagregar(self.id_cliente, self.id)
+        self.estado = nuevo_estado
+
+    async def acalificar(self, calificacion):
+        """Calificar la sesión (async)"""
+        if not 1 <= calificacion <= 5:
+            raise ValueError("La calificación debe ser entre 1 y 5")
+        async with db_async.transaccion() as cursor:
+            await cursor.execute(
+                "UPDATE sesion_entrenamiento SET calificacion = %s WHERE id_sesion = %s",
+                (calificacion, self.id)
+            )
+        self.calificacion = calificacion
 
     def cambiar_estado(self, nuevo_estado):
         """Cambiar estado de la sesión"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "UPDATE sesion_entrenamiento SET estado = %s WHERE id_sesion = %s",
                 (nuevo_estado, self.id)
             )
-            conn.commit()
-            self.estado = nuevo_estado
             
-            # Si se finaliza, agregar al historial
+            # Si se finaliza, agregar al historial (misma transacción)
             if nuevo_estado == "FINALIZADA":
                 from historial_sesiones import HistorialSesiones
-                HistorialSesiones.agregar(self.cliente.id, self.id)
-                
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+                HistorialSesiones.agregar(self.id_cliente, self.id)
+        self.estado = nuevo_estado
+
+    @classmethod
+    def cambiar_estado_lote(cls, ids, nuevo_estado):
+        """Cambiar el estado de varias sesiones; retorna los ids que realmente cambiaron"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        marcadores = ", ".join(["%s"] * len(ids))
+        return cls._transicion(f"s.id_sesion IN ({marcadores})", tuple(ids), nuevo_estado)
+
+    @classmethod
+    def cambiar_estado_anteriores(cls, limite, nuevo_estado="FINALIZADA", estado_actual="PROGRAMADA", lote=None):
+        """Pasar a `nuevo_estado` las sesiones en `estado_actual` con fecha_hora anterior a `limite`.
+
+        Con `lote` solo se toman las `lote` más antiguas. Retorna los ids cambiados.
+        """
+        filtro = "s.estado = %s AND s.fecha_hora < %s ORDER BY s.fecha_hora, s.id_sesion"
+        params = (estado_actual, limite)
+        if lote is not None:
+            filtro += " LIMIT %s"
+            params += (lote,)
+        return cls._transicion(filtro, params, nuevo_estado)
+
+    @classmethod
+    def _transicion(cls, filtro, params, nuevo_estado):
+        """Bloquear las sesiones que cumplen `filtro` (condición y orden), cambiarles el estado con un solo UPDATE
+        y, si se finalizan, registrarlas en el historial; todo en una transacción.
+        """
+        if nuevo_estado not in ESTADOS:
+            raise ValueError(f"Estado inválido. Debe ser uno de: {', '.join(ESTADOS)}")
+        with transaccion() as cursor:
+            # Las que ya tienen el estado nuevo se excluyen: no se duplica el historial
+            cursor.execute(f"""
+                SELECT s.id_sesion FROM sesion_entrenamiento s
+                WHERE s.estado <> %s AND {filtro}
+                FOR UPDATE
+            """, (nuevo_estado,) + params)
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return []
+            marcadores = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"UPDATE sesion_entrenamiento SET estado = %s WHERE id_sesion IN ({marcadores})",
+                (nuevo_estado, *ids)
+            )
+            if nuevo_estado == "FINALIZADA":
+                from historial_sesiones import HistorialSesiones
+                HistorialSesiones.agregar_sesiones(ids)
+
+        # Las sesiones ya cargadas en este ámbito reflejan el cambio
+        for id_sesion in ids:
+            sesion = identidad.obtener(cls, id_sesion)
+            if sesion is not None:
+                sesion.estado = nuevo_estado
+        return ids
 
     def calificar(self, calificacion):
         """Calificar la sesión"""
         if 1 <= calificacion <= 5:
-            conn = create_connection()
-            try:
-                cursor = conn.cursor()
+            with transaccion() as cursor:
                 cursor.execute(
                     "UPDATE sesion_entrenamiento SET calificacion = %s WHERE id_sesion = %s",
                     (calificacion, self.id)
                 )
-                conn.commit()
-                self.calificacion = calificacion
-            except Exception as e:
-                conn.rollback()
-                raise e
-            finally:
-                cursor.close()
-                conn.close()
+            self.calificacion = calificacion
         else:
             raise ValueError("La calificación debe ser entre 1 y 5")
 
@@ -221,14 +476,5 @@ class SesionEntrenamiento:
 
     def eliminar(self):
         """Eliminar sesión"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM sesion_entrenamiento WHERE id_sesion = %s", (self.id,))
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
\ No newline at end of file
+        with transaccion() as cursor:
+            cursor.execute("DELETE FROM sesion_entrenamiento WHERE id_sesion = %s", (self.id,))
\ No newline at end of file
@@ -1,6 +1,14 @@
-from db_connection import create_connection
+from db_connection import transaccion, lectura, leer_en_lotes
+import identidad
+from cache import invalidar
+from cambios import Columna, ConCambios
+
+class Usuario(ConCambios):
+    nombre = Columna("usuario")
+    email = Columna("usuario")
+    _claves_tabla = {"usuario": "id_usuario"}
+    _espacios_cache = ("entrenadores",)
 
-class Usuario:
     def __init__(self, id_usuario, nombre, email, tipo):
         self.id = id_usuario
         self.nombre = nombre
@@ -10,100 +18,129 @@ class Usuario:
     @classmethod
     def crear(cls, nombre, email, tipo):
         """Crear un nuevo usuario en la base de datos"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute(
                 "INSERT INTO usuario (nombre, email, tipo) VALUES (%s, %s, %s)",
                 (nombre, email, tipo)
             )
             user_id = cursor.lastrowid
-            conn.commit()
-            return cls(user_id, nombre, email, tipo)
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        return identidad.registrar(cls(user_id, nombre, email, tipo), user_id)
 
     @classmethod
     def buscar_por_id(cls, id_usuario):
         """Buscar usuario por ID"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        existente = identidad.obtener(cls, id_usuario)
+        if existente is not None:
+            return existente
+        with lectura(preparada=True) as cursor:
             cursor.execute(
                 "SELECT id_usuario, nombre, email, tipo FROM usuario WHERE id_usuario = %s",
                 (id_usuario,)
             )
             row = cursor.fetchone()
-            return cls(row['id_usuario'], row['nombre'], row['email'], row['tipo']) if row else None
-        finally:
-            cursor.close()
-            conn.close()
+            return cls._desde_fila(row) if row else None
 
     @classmethod
     def buscar_por_email(cls, email):
         """Buscar usuario por email"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute(
                 "SELECT id_usuario, nombre, email, tipo FROM usuario WHERE email = %s",
                 (email,)
             )
             row = cursor.fetchone()
-            return cls(row['id_usuario'], row['nombre'], row['email'], row['tipo']) if row else None
-        finally:
-            cursor.close()
-            conn.close()
+            return cls._desde_fila(row) if row else None
 
     @classmethod
     def listar_todos(cls):
         """Listar todos los usuarios"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor(dictionary=True)
+        with lectura() as cursor:
             cursor.execute("SELECT id_usuario, nombre, email, tipo FROM usuario ORDER BY nombre")
             rows = cursor.fetchall()
-            return [cls(row['id_usuario'], row['nombre'], row['email'], row['tipo']) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+            return [cls._desde_fila(row) for row in rows]
+
+    @classmethod
+    def iterar_todos(cls, lote=None):
+        """Como listar_todos, pero generando los usuarios de a lotes (memoria constante)"""
+        for rows in leer_en_lotes("SELECT id_usuario, nombre, email, tipo FROM usuario ORDER BY nombre", lote=lote):
+            yield from (cls._desde_fila(row) for row in rows)
+
+    @classmethod
+    def resumen_usuarios(cls, id_usuario=None):
+        """Resumen por usuario (tipo, sesiones activas/finalizadas y planes) en una sola consulta.
+
+        Retorna una lista de diccionarios ordenada por nombre; con `id_usuario`
+        solo incluye a ese usuario. Las sesiones y los planes se agrupan en tablas
+        derivadas, así que no se construye ningún objeto Sesion ni Plan.
+        """
+        if id_usuario is not None:
+            # El filtro va también dentro de las tablas derivadas: MySQL no lo empuja
+            # y sin él agruparía todas las sesiones (así usa los índices por cliente/entrenador)
+            por_cliente, por_entrenador, filtro = (
+                "WHERE id_cliente = %s", "WHERE id_entrenador = %s", "WHERE u.id_usuario = %s"
+            )
+            params = (id_usuario,) * 4
+        else:
+            por_cliente = por_entrenador = filtro = ""
+            params = ()
+        with lectura() as cursor:
+            cursor.execute(f"""
+                SELECT u.id_usuario, u.nombre, u.email, u.tipo, c.nivel_fitness, e.especialidad,
+                       COALESCE(sc.activas, se.activas, 0) AS sesiones_activas,
+                       COALESCE(sc.finalizadas, se.finalizadas, 0) AS sesiones_finalizadas,
+                       COALESCE(p.planes, 0) AS planes
+                FROM usuario u
+                LEFT JOIN cliente c ON c.id_usuario = u.id_usuario
+                LEFT JOIN entrenador e ON e.id_usuario = u.id_usuario
+                LEFT JOIN (
+                    SELECT id_cliente,
+                           COUNT(CASE WHEN estado <> 'FINALIZADA' THEN 1 END) AS activas,
+                           COUNT(CASE WHEN estado = 'FINALIZADA' THEN 1 END) AS finalizadas
+                    FROM sesion_entrenamiento {por_cliente} GROUP BY id_cliente
+                ) sc ON u.tipo = 'CLIENTE' AND sc.id_cliente = u.id_usuario
+                LEFT JOIN (
+                    SELECT id_entrenador,
+                           COUNT(CASE WHEN estado <> 'FINALIZADA' THEN 1 END) AS activas,
+                           COUNT(CASE WHEN estado = 'FINALIZADA' THEN 1 END) AS finalizadas
+                    FROM sesion_entrenamiento {por_entrenador} GROUP BY id_entrenador
+                ) se ON u.tipo = 'ENTRENADOR' AND se.id_entrenador = u.id_usuario
+                LEFT JOIN (
+                    SELECT id_entrenador, COUNT(*) AS planes
+                    FROM plan_entrenamiento {por_entrenador} GROUP BY id_entrenador
+                ) p ON p.id_entrenador = u.id_usuario
+                {filtro}
+                ORDER BY u.nombre
+            """, params)
+            return [{
+                'id': row['id_usuario'],
+                'nombre': row['nombre'],
+                'email': row['email'],
+                'tipo': row['tipo'],
+                'nivel_fitness': row['nivel_fitness'],
+                'especialidad': row['especialidad'],
+                'sesiones_activas': row['sesiones_activas'],
+                'sesiones_finalizadas': row['sesiones_finalizadas'],
+                'planes': row['planes'],
+            } for row in cursor.fetchall()]
+
+    @classmethod
+    def _desde_fila(cls, row):
+        """Construir (o reutilizar del mapa de identidad) un usuario a partir de una fila"""
+        return identidad.registrar(cls(row['id_usuario'], row['nombre'], row['email'], row['tipo']), row['id_usuario'])
 
     def actualizar(self, nombre=None, email=None):
-        """Actualizar información del usuario"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
-            if nombre:
-                cursor.execute("UPDATE usuario SET nombre = %s WHERE id_usuario = %s", (nombre, self.id))
-                self.nombre = nombre
-            if email:
-                cursor.execute("UPDATE usuario SET email = %s WHERE id_usuario = %s", (email, self.id))
-                self.email = email
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        """Actualizar información del usuario (un solo UPDATE con los campos que cambian)"""
+        if nombre:
+            self.nombre = nombre
+        if email:
+            self.email = email
+        self.guardar()
 
     def eliminar(self):
         """Eliminar usuario de la base de datos"""
-        conn = create_connection()
-        try:
-            cursor = conn.cursor()
+        with transaccion() as cursor:
             cursor.execute("DELETE FROM usuario WHERE id_usuario = %s", (self.id,))
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+        invalidar("entrenadores", "planes")
 
     def __str__(self):
-        return f"{self.nombre} ({self.email}) - {self.tipo}"
\ No newline at end of file
+        return f"{self.nombre} ({self.email}) - {self.tipo}"
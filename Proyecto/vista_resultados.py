@@ -0,0 +1,211 @@
+from bisect import bisect_right
+import tkinter as tk
+from tkinter import font as tkfont
+
+# Lista de resultados virtualizada: las líneas viven en un almacén compacto
+# (elementos del modelo + función que los formatea) y el Listbox solo contiene
+# la ventana visible más un margen. Así mostrar 100k sesiones no crea 400k
+# cadenas en el widget de Tk.
+
+SOBRANTE = 100     # líneas renderizadas de más arriba y abajo de la ventana visible
+LOTE_RENDER = 500  # líneas por llamada a insert cuando se renderiza en tandas
+
+
+class _Bloque:
+    """Tramo del almacén: `elementos` que ocupan `lineas` líneas cada uno"""
+    __slots__ = ("inicio", "elementos", "formatear", "lineas")
+
+    def __init__(self, inicio, elementos, formatear=None, lineas=1):
+        self.inicio = inicio
+        self.elementos = elementos
+        self.formatear = formatear  # None: los elementos ya son el texto de una línea
+        self.lineas = lineas
+
+    def total(self):
+        return len(self.elementos) * self.lineas
+
+
+class VistaResultados:
+    """Listbox virtualizado con la parte de la interfaz de tk.Listbox que usa la GUI"""
+    def __init__(self, master, scrollbar, al_desplazar=None, sobrante=SOBRANTE, **opciones):
+        self.lista = tk.Listbox(master, **opciones)
+        self.scrollbar = scrollbar
+        self.al_desplazar = al_desplazar  # como un yscrollcommand, pero sobre todo el almacén
+        self.sobrante = sobrante
+        self._bloques = []
+        self._inicios = []
+        self._total = 0
+        self._primera = 0            # primera línea visible (índice en el almacén)
+        self._desde = self._hasta = 0  # tramo del almacén renderizado en el Listbox
+        self._refresco_pendiente = False
+        self._tanda = None           # after_idle de un render en tandas
+
+        self._alto_linea = tkfont.Font(font=self.lista.cget("font")).metrics("linespace") + 1
+        scrollbar.config(command=self.yview)
+        self.lista.config(yscrollcommand=self._al_mover_lista)
+        self.lista.bind("<Configure>", lambda _: self._programar_refresco())
+        self.lista.bind("<MouseWheel>", self._rueda)
+        self.lista.bind("<Button-4>", lambda _: self._desplazar_lineas(-3))
+        self.lista.bind("<Button-5>", lambda _: self._desplazar_lineas(3))
+
+    # --- Interfaz compatible con tk.Listbox ---
+
+    def pack(self, **opciones):
+        self.lista.pack(**opciones)
+
+    def insert(self, indice, *textos):
+        """Agregar líneas de texto; con tk.END no se toca el widget hasta el próximo refresco"""
+        if indice == tk.END or indice == self._total:
+            self._agregar(list(textos), None, 1)
+        else:
+            lineas = self._materializar()
+            lineas[indice:indice] = textos
+            self._reemplazar(lineas)
+
+    def delete(self, primero, ultimo=None):
+        """Borrar líneas del almacén (delete(0, tk.END) lo vacía)"""
+        if primero == 0 and ultimo == tk.END:
+            self._reemplazar([])
+            return
+        lineas = self._materializar()
+        ultimo = primero if ultimo is None else (len(lineas) - 1 if ultimo == tk.END else ultimo)
+        del lineas[primero:ultimo + 1]
+        self._reemplazar(lineas)
+
+    def size(self):
+        return self._total
+
+    def get(self, indice):
+        return self._linea(self._total - 1 if indice == tk.END else indice)
+
+    def yview(self, *args):
+        """Comando de la scrollbar: 'moveto' fracción o 'scroll' n unidades/páginas"""
+        if not args:
+            return self._fracciones()
+        if args[0] == "moveto":
+            self._mover_a(int(float(args[1]) * self._total))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self._desplazar_lineas(n * self._visibles() if args[2] == "pages" else n)
+
+    # --- Elementos del modelo ---
+
+    def agregar(self, elementos, formatear, lineas=1):
+        """Agregar elementos del modelo; `formatear(e)` da sus `lineas` líneas al hacerse visibles"""
+        self._agregar(list(elementos), formatear, lineas)
+
+    # --- Almacén ---
+
+    def _agregar(self, elementos, formatear, lineas):
+        if not elementos:
+            return
+        ultimo = self._bloques[-1] if self._bloques else None
+        if ultimo is not None and ultimo.formatear is formatear and ultimo.lineas == lineas:
+            ultimo.elementos.extend(elementos)
+        else:
+            self._bloques.append(_Bloque(self._total, elementos, formatear, lineas))
+            self._inicios.append(self._total)
+        self._total += len(elementos) * lineas
+        self._programar_refresco()
+
+    def _reemplazar(self, lineas):
+        self._bloques, self._inicios, self._total = [], [], 0
+        self._primera = self._desde = self._hasta = 0
+        self.lista.delete(0, tk.END)
+        self._agregar(lineas, None, 1)
+        self._programar_refresco()
+
+    def _materializar(self):
+        return [self._linea(i) for i in range(self._total)]
+
+    def _lineas(self, desde, hasta):
+        """Texto de las líneas [desde, hasta) formateando cada elemento una sola vez"""
+        resultado = []
+        i = desde
+        while i < hasta:
+            bloque = self._bloques[bisect_right(self._inicios, i) - 1]
+            indice, k = divmod(i - bloque.inicio, bloque.lineas)
+            if bloque.formatear is None:
+                fin = min(hasta, bloque.inicio + bloque.total())
+                resultado.extend(bloque.elementos[indice:indice + fin - i])
+                i = fin
+            else:
+                lineas = list(bloque.formatear(bloque.elementos[indice]))
+                lineas += [""] * (bloque.lineas - len(lineas))  # siempre exactamente `lineas` líneas
+                lineas = lineas[k:bloque.lineas][:hasta - i]
+                resultado.extend(lineas)
+                i += len(lineas)
+        return resultado
+
+    def _linea(self, i):
+        return self._lineas(i, i + 1)[0]
+
+    # --- Ventana visible ---
+
+    def _visibles(self):
+        return max(1, self.lista.winfo_height() // self._alto_linea)
+
+    def _fracciones(self):
+        if not self._total:
+            return 0.0, 1.0
+        return self._primera / self._total, min(1.0, (self._primera + self._visibles()) / self._total)
+
+    def _programar_refresco(self):
+        # Varios insert seguidos (p. ej. una página entera) se renderizan una sola vez
+        if not self._refresco_pendiente:
+            self._refresco_pendiente = True
+            self.lista.after_idle(self._refrescar)
+
+    def _refrescar(self):
+        self._refresco_pendiente = False
+        self._mover_a(self._primera, forzar=True)
+
+    def _desplazar_lineas(self, n):
+        self._mover_a(self._primera + n)
+        return "break"
+
+    def _rueda(self, evento):
+        paso = -evento.delta // 120 if abs(evento.delta) >= 120 else (-1 if evento.delta > 0 else 1)
+        return self._desplazar_lineas(paso * 3)
+
+    def _mover_a(self, primera, forzar=False):
+        visibles = self._visibles()
+        self._primera = max(0, min(primera, self._total - visibles))
+        fin = min(self._total, self._primera + visibles)
+        if forzar or self._primera < self._desde or fin > self._hasta:
+            self._renderizar(max(0, self._primera - self.sobrante), min(self._total, fin + self.sobrante))
+        self.lista.yview(self._primera - self._desde)
+        self._avisar()
+
+    def _renderizar(self, desde, hasta):
+        """Reemplazar el contenido del Listbox por las líneas [desde, hasta) del almacén"""
+        if self._tanda is not None:
+            self.lista.after_cancel(self._tanda)
+            self._tanda = None
+        self.lista.delete(0, tk.END)
+        self._desde, self._hasta = desde, hasta
+        # Primero lo visible; si la ventana es grande, el resto en tandas cuando Tk esté libre
+        inmediato = min(hasta, max(self._primera + self._visibles(), desde + LOTE_RENDER))
+        self.lista.insert(tk.END, *self._lineas(desde, inmediato))
+        if inmediato < hasta:
+            self._tanda = self.lista.after_idle(self._renderizar_tanda, inmediato)
+
+    def _renderizar_tanda(self, desde):
+        hasta = min(self._hasta, desde + LOTE_RENDER)
+        self.lista.insert(tk.END, *self._lineas(desde, hasta))
+        self._tanda = self.lista.after_idle(self._renderizar_tanda, hasta) if hasta < self._hasta else None
+
+    def _al_mover_lista(self, *_):
+        # El Listbox también se desplaza solo (teclado, arrastrar la selección)
+        if self._hasta > self._desde:
+            primera = self._desde + self.lista.nearest(0)
+            if primera != self._primera:
+                self._mover_a(primera)
+                return
+        self._avisar()
+
+    def _avisar(self):
+        primero, ultimo = self._fracciones()
+        self.scrollbar.set(primero, ultimo)
+        if self.al_desplazar is not None:
+            self.al_desplazar(primero, ultimo)